@@ -0,0 +1,165 @@
+"""
+Alert Snapshot Module
+Overdue and due soon lists for members and lockers, worked out once and shared
+by the dashboard, the payment alerts page and the fees page. Rows are sorted by
+due date and carry their display text. The snapshot is dropped when member,
+payment or locker data changes and when the date changes.
+"""
+import threading
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from events import MEMBER_EVENTS, LOCKER_EVENTS
+
+
+def as_date(value) -> Optional[date]:
+    """A date from a date or an ISO date string (None if it isn't one)"""
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except (TypeError, ValueError):
+        return None
+
+
+def format_date(value) -> str:
+    """YYYY-MM-DD text of a date column, 'N/A' if it's empty"""
+    if not value or value == 'N/A':
+        return 'N/A'
+    parsed = as_date(value)
+    return parsed.strftime('%Y-%m-%d') if parsed else str(value)
+
+
+@dataclass(frozen=True)
+class AlertRow:
+    """One overdue or due soon member (or locker), ready to display"""
+    kind: str  # "overdue" or "due_soon"
+    record: Dict  # Row as read from the database
+    name: str
+    amount: float
+    due_date: date
+    days: int  # Days overdue, or days until due
+    days_text: str
+    summary: str  # "Name - ₹amount (days text)"
+
+    @property
+    def id(self) -> int:
+        return self.record['id']
+
+    def contains(self, search_term: str) -> bool:
+        """Whether the lower-case search term is part of the ID, name or phone number as written"""
+        return any(search_term in str(self.record.get(field) or '').lower() for field in ('id', 'name', 'phone'))
+
+
+@dataclass(frozen=True)
+class AlertSnapshot:
+    day: date  # Date the lists were worked out for
+    overdue: Tuple[AlertRow, ...]
+    due_soon: Tuple[AlertRow, ...]
+    overdue_lockers: Tuple[AlertRow, ...]
+
+    @property
+    def overdue_total(self) -> float:
+        return sum(row.amount for row in self.overdue)
+
+    @property
+    def due_soon_total(self) -> float:
+        return sum(row.amount for row in self.due_soon)
+
+    def members(self, kind: str = "all") -> List[AlertRow]:
+        """Member rows for "overdue", "due_soon" or "all", by due date"""
+        if kind == "overdue":
+            return list(self.overdue)
+        if kind == "due_soon":
+            return list(self.due_soon)
+        # Overdue dates are all before today and due soon dates from today on
+        return list(self.overdue) + list(self.due_soon)
+
+
+def _alert_row(kind: str, record: Dict, name: str, today: date) -> Optional[AlertRow]:
+    due_date = as_date(record.get('next_payment_date'))
+    if due_date is None:
+        return None
+    amount = record.get('fee_amount') or 0
+    if kind == "overdue":
+        days = (today - due_date).days
+        days_text = f"{days} days overdue"
+    else:
+        days = (due_date - today).days
+        days_text = f"Due in {days} days"
+    return AlertRow(kind, record, name, amount, due_date, days, days_text,
+                    f"{name} - ₹{amount:.2f} ({days_text})")
+
+
+class AlertService:
+    """Keeps the current AlertSnapshot of a database"""
+
+    def __init__(self, db):
+        self.db = db
+        self._lock = threading.Lock()  # Pages may ask from worker threads
+        self._snapshot: Optional[AlertSnapshot] = None
+        self._generation = 0  # Bumped by every invalidation
+        db.events.subscribe(MEMBER_EVENTS + LOCKER_EVENTS, self.invalidate)
+
+    def invalidate(self, event=None):
+        """Drop the snapshot; the next caller works it out again"""
+        with self._lock:
+            self._snapshot = None
+            self._generation += 1
+
+    def _current(self, today: date) -> Optional[AlertSnapshot]:
+        """The snapshot if it is still valid for today"""
+        with self._lock:
+            current = self._snapshot
+        return current if current is not None and current.day == today else None
+
+    def snapshot(self) -> AlertSnapshot:
+        """The current alerts (worked out on first use after a change or at a new day)"""
+        today = date.today()
+        with self._lock:
+            current = self._snapshot
+            generation = self._generation
+        if current is not None and current.day == today:
+            return current
+
+        current = self._build(today)
+        with self._lock:
+            if generation == self._generation:  # Nothing changed while it was built
+                self._snapshot = current
+        return current
+
+    def counts(self) -> Dict[str, int]:
+        """Overdue and due soon member counts, without building the lists if there is no snapshot"""
+        current = self._current(date.today())
+        if current is not None:
+            return {"overdue": len(current.overdue), "due_soon": len(current.due_soon)}
+        return self.db.get_alert_counts()
+
+    def page(self, kind: str, offset: int = 0, limit: int = 10) -> List[AlertRow]:
+        """
+        Up to `limit` "overdue" or "due_soon" member rows from `offset`, most urgent
+        first: from the snapshot if there is one, otherwise a LIMITed indexed query
+        """
+        today = date.today()
+        current = self._current(today)
+        if current is not None:
+            return list(getattr(current, kind)[offset:offset + limit])
+        if kind == "overdue":
+            records = self.db.get_overdue_members(limit=limit, offset=offset)
+        else:
+            records = self.db.get_due_soon_members(limit=limit, offset=offset)
+        return [row for row in (_alert_row(kind, r, r.get('name') or 'N/A', today) for r in records) if row]
+
+    def _build(self, today: date) -> AlertSnapshot:
+        def rows(kind, records, name_key):
+            # The queries return rows by due date (then ID) already
+            built = (_alert_row(kind, r, r.get(name_key) or 'N/A', today) for r in records)
+            return tuple(r for r in built if r is not None)
+
+        return AlertSnapshot(
+            day=today,
+            overdue=rows("overdue", self.db.get_overdue_members(), 'name'),
+            due_soon=rows("due_soon", self.db.get_due_soon_members(), 'name'),
+            overdue_lockers=rows("overdue", self.db.get_overdue_locker_payments(), 'member_name'),
+        )
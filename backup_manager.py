@@ -4,16 +4,280 @@ Handles daily database backups to Excel files
 """
 import sqlite3
 import os
+import json
+import hashlib
 from datetime import date, datetime, timedelta
 from pathlib import Path
+from typing import Dict, List, Optional
+
+from importlib.util import find_spec
+
+# pandas is slow to import, so only check it is installed; it is imported on export
+PANDAS_AVAILABLE = find_spec("pandas") is not None
+
+VERIFICATION_INDEX = "verification_index.json"
+# Version of table_fingerprint; manifests recorded by an older one are compared by row count only
+FINGERPRINT_VERSION = 3
+CHECKSUM_MODULUS = 2 ** 64
+
+
+def _open_read_only(path: str) -> sqlite3.Connection:
+    """Open a SQLite file read-only so verification can never modify it"""
+    uri = Path(path).resolve().as_uri() + "?mode=ro"
+    return sqlite3.connect(uri, uri=True, check_same_thread=False)
+
+
+def _user_tables(conn: sqlite3.Connection) -> List[str]:
+    """List user tables (excluding SQLite internal tables)"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT name FROM sqlite_master
+        WHERE type = 'table' AND name NOT LIKE 'sqlite_%'
+        ORDER BY name
+    """)
+    return [row[0] for row in cursor.fetchall()]
+
+
+def table_fingerprint(conn: sqlite3.Connection, table: str) -> Dict:
+    """
+    Get the row count, column names and a content checksum for a table.
+    
+    The checksum is the sum (modulo 2^64) of a blake2b hash of every row, so it
+    doesn't depend on the order rows are read in, but any row being added,
+    removed or edited changes it, including values swapped between rows.
+    """
+    cursor = conn.cursor()
+    cursor.execute(f'PRAGMA table_info("{table}")')
+    columns = [row[1] for row in cursor.fetchall()]
+    cursor.execute(f'SELECT * FROM "{table}"')
+    rows = 0
+    checksum = 0
+    while True:
+        batch = cursor.fetchmany(5000)
+        if not batch:
+            break
+        rows += len(batch)
+        for row in batch:
+            digest = hashlib.blake2b(repr(row).encode("utf-8"), digest_size=8).digest()
+            checksum += int.from_bytes(digest, "big")
+    return {"rows": rows, "columns": columns, "checksum": f"{checksum % CHECKSUM_MODULUS:016x}"}
+
+
+def database_fingerprint(path: str) -> Dict[str, Dict]:
+    """Fingerprint every user table in a database file"""
+    conn = _open_read_only(path)
+    try:
+        return {table: table_fingerprint(conn, table) for table in _user_tables(conn)}
+    finally:
+        conn.close()
+
+
+def verify_snapshot(path: str, live_stats: Dict[str, Dict], expected: Optional[Dict[str, Dict]] = None,
+                    expected_version: int = FINGERPRINT_VERSION) -> Dict:
+    """
+    Verify a single snapshot file.
+    
+    Args:
+        path: Snapshot file to check
+        live_stats: Fingerprints of the live database, used to report drift
+        expected: Fingerprints recorded when the snapshot was taken (if known)
+        expected_version: FINGERPRINT_VERSION the expected fingerprints were made with
+    
+    Returns:
+        A result dict with status 'ok' or 'failed', the quick_check result,
+        per-table row counts/checksums compared against the live database, and
+        schema_drift describing how the live schema has moved on since (for
+        information only: migrations add tables and columns, and older
+        snapshots can still be restored)
+    """
+    result = {
+        "status": "failed",
+        "quick_check": None,
+        "verified_at": datetime.now().isoformat(timespec="seconds"),
+        "size": os.path.getsize(path) if os.path.exists(path) else 0,
+        "mtime": os.path.getmtime(path) if os.path.exists(path) else None,
+        "tables": {},
+        "schema_drift": None,
+        "error": None,
+    }
+    try:
+        conn = _open_read_only(path)
+        try:
+            cursor = conn.cursor()
+            cursor.execute("PRAGMA quick_check")
+            messages = [row[0] for row in cursor.fetchall()]
+            result["quick_check"] = "ok" if messages == ["ok"] else "; ".join(messages)
+            
+            for table in _user_tables(conn):
+                stats = table_fingerprint(conn, table)
+                live = live_stats.get(table)
+                stats["live_rows"] = live["rows"] if live else None
+                stats["matches_live"] = bool(live) and live["checksum"] == stats["checksum"]
+                result["tables"][table] = stats
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        result["error"] = str(e)
+        return result
+    
+    problems = []
+    if result["quick_check"] != "ok":
+        problems.append(f"quick_check: {result['quick_check']}")
+    if expected:
+        # Compared with what the snapshot held when it was taken, not with today's schema
+        missing = sorted(set(expected) - set(result["tables"]))
+        if missing:
+            problems.append(f"missing tables: {', '.join(missing)}")
+        key = "checksum" if expected_version == FINGERPRINT_VERSION else "rows"
+        changed = sorted(
+            table for table, stats in expected.items()
+            if table in result["tables"] and result["tables"][table][key] != stats[key]
+        )
+        if changed:
+            problems.append(f"changed since snapshot was taken: {', '.join(changed)}")
+    
+    drift = []
+    newer_tables = sorted(set(live_stats) - set(result["tables"]))
+    if newer_tables:
+        drift.append(f"tables added since: {', '.join(newer_tables)}")
+    changed_columns = sorted(
+        table for table, stats in result["tables"].items()
+        if table in live_stats and live_stats[table].get("columns") != stats["columns"]
+    )
+    if changed_columns:
+        drift.append(f"columns changed since: {', '.join(changed_columns)}")
+    result["schema_drift"] = "; ".join(drift) or None
+    
+    if problems:
+        result["error"] = "; ".join(problems)
+    else:
+        result["status"] = "ok"
+    return result
+
+
+# Tables whose rows belong to a single member, with the column holding the member ID
+MEMBER_SCOPED_TABLES = {
+    "members": "id",
+    "payments": "member_id",
+    "lockers": "member_id",
+    "locker_payments": "member_id",
+}
+
+
+def _table_columns(conn: sqlite3.Connection, schema: str, table: str) -> List[str]:
+    """Get the column names of a table in an attached schema"""
+    cursor = conn.cursor()
+    cursor.execute(f'PRAGMA "{schema}".table_info("{table}")')
+    return [row[1] for row in cursor.fetchall()]
+
+
+def _schema_tables(conn: sqlite3.Connection, schema: str) -> List[str]:
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT name FROM "{schema}".sqlite_master
+        WHERE type = 'table' AND name NOT LIKE 'sqlite_%'
+        ORDER BY name
+    """)
+    return [row[0] for row in cursor.fetchall()]
+
+
+def restore_snapshot(db_path: str, snapshot_path: str, tables: List[str] = None,
+                     member_ids: List[int] = None, dry_run: bool = False) -> Dict:
+    """
+    Restore rows from a snapshot into the live database.
+    
+    The snapshot is attached to the live connection and each table is
+    replaced with DELETE + INSERT ... SELECT inside a single transaction,
+    so either everything is restored or nothing is.
+    
+    Args:
+        db_path: Live database file
+        snapshot_path: Snapshot to restore from
+        tables: Tables to restore (defaults to every table in both databases,
+                or every member-scoped table when member_ids is given)
+        member_ids: Only restore rows belonging to these members
+        dry_run: Only report what would change, don't modify anything
+    
+    Returns:
+        Report dict: {table: {'added', 'removed', 'changed', 'sample_ids'}}
+        where counts describe the live database after the restore
+    """
+    if not os.path.exists(snapshot_path):
+        raise FileNotFoundError(f"Snapshot not found: {snapshot_path}")
+    
+    # Open with URI support so the snapshot can be attached read-only
+    conn = sqlite3.connect(Path(db_path).resolve().as_uri(), uri=True, isolation_level=None)
+    try:
+        conn.execute("ATTACH DATABASE ? AS snap", (Path(snapshot_path).resolve().as_uri() + "?mode=ro",))
+        common = sorted(set(_schema_tables(conn, "main")) & set(_schema_tables(conn, "snap")))
+        if tables is None:
+            tables = [t for t in common if t in MEMBER_SCOPED_TABLES] if member_ids else common
+        unknown = [t for t in tables if t not in common]
+        if unknown:
+            raise ValueError(f"Tables not present in both databases: {', '.join(unknown)}")
+        if member_ids:
+            not_scoped = [t for t in tables if t not in MEMBER_SCOPED_TABLES]
+            if not_scoped:
+                raise ValueError(f"Cannot restore by member for: {', '.join(not_scoped)}")
+            conn.execute("CREATE TEMP TABLE restore_member_ids (id INTEGER PRIMARY KEY)")
+            conn.executemany("INSERT OR IGNORE INTO restore_member_ids (id) VALUES (?)",
+                             [(int(m),) for m in member_ids])
+        
+        plans = []
+        for table in tables:
+            live_columns = _table_columns(conn, "main", table)
+            snap_columns = set(_table_columns(conn, "snap", table))
+            columns = ", ".join(f'"{c}"' for c in live_columns if c in snap_columns)
+            scope = ""
+            if member_ids:
+                scope = f'WHERE "{MEMBER_SCOPED_TABLES[table]}" IN (SELECT id FROM temp.restore_member_ids)'
+            plans.append((table, columns, scope))
+        
+        report = {table: _diff_table(conn, table, columns, scope) for table, columns, scope in plans}
+        
+        if not dry_run:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for table, columns, scope in plans:
+                    conn.execute(f'DELETE FROM main."{table}" {scope}')
+                    conn.execute(f'INSERT INTO main."{table}" ({columns}) '
+                                 f'SELECT {columns} FROM snap."{table}" {scope}')
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return report
+    finally:
+        conn.close()
+
+
+def _diff_table(conn: sqlite3.Connection, table: str, columns: str, scope: str) -> Dict:
+    """Count rows a restore would add, remove and change (keyed by id)"""
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT COUNT(*) FROM (SELECT id FROM snap."{table}" {scope}
+                              EXCEPT SELECT id FROM main."{table}" {scope})
+    """)
+    added = cursor.fetchone()[0]
+    cursor.execute(f"""
+        SELECT COUNT(*) FROM (SELECT id FROM main."{table}" {scope}
+                              EXCEPT SELECT id FROM snap."{table}" {scope})
+    """)
+    removed = cursor.fetchone()[0]
+    cursor.execute(f"""
+        SELECT d.id FROM (SELECT {columns} FROM snap."{table}" {scope}
+                          EXCEPT SELECT {columns} FROM main."{table}" {scope}) d
+        WHERE d.id IN (SELECT id FROM main."{table}")
+        ORDER BY d.id
+    """)
+    changed_ids = [row[0] for row in cursor.fetchall()]
+    return {
+        "added": added,
+        "removed": removed,
+        "changed": len(changed_ids),
+        "sample_ids": changed_ids[:10],
+    }
 
-# Try to import pandas, but don't fail if it's not installed
-try:
-    import pandas as pd
-    PANDAS_AVAILABLE = True
-except ImportError:
-    PANDAS_AVAILABLE = False
-    pd = None
 
 class BackupManager:
     def __init__(self, db_path: str = "gym_management.db", backup_dir: str = "backups"):
@@ -38,6 +302,8 @@ class BackupManager:
         filepath = os.path.join(self.backup_dir, filename)
         
         try:
+            import pandas as pd
+            
             # Connect to database
             conn = sqlite3.connect(self.db_path)
             
@@ -78,16 +344,193 @@ class BackupManager:
         """Remove backup files older than keep_days"""
         try:
             cutoff_date = date.today() - timedelta(days=keep_days)
-            for file in Path(self.backup_dir).glob("gym_backup_*.xlsx"):
-                try:
-                    # Extract date from filename
-                    date_str = file.stem.split('_')[-1]
-                    file_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-                    if file_date < cutoff_date:
-                        file.unlink()
-                        print(f"Deleted old backup: {file.name}")
-                except:
-                    pass
+            for pattern in ("gym_backup_*.xlsx", "gym_snapshot_*.db", "gym_prerestore_*.db"):
+                for file in Path(self.backup_dir).glob(pattern):
+                    try:
+                        # Extract date from filename (safety copies also carry the time)
+                        date_str = file.stem.split('_')[-1][:10]
+                        file_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+                        if file_date < cutoff_date:
+                            file.unlink()
+                            print(f"Deleted old backup: {file.name}")
+                    except:
+                        pass
+            self._prune_index()
         except Exception as e:
             print(f"Cleanup error: {e}")
+    
+    # SQLite snapshots
+    def snapshot_path(self, snapshot_date: date = None) -> str:
+        """Get the snapshot file path for a date (defaults to today)"""
+        if snapshot_date is None:
+            snapshot_date = date.today()
+        return os.path.join(self.backup_dir, f"gym_snapshot_{snapshot_date.strftime('%Y-%m-%d')}.db")
+    
+    def create_snapshot(self, path: str = None, record_manifest: bool = True) -> Optional[str]:
+        """Copy the live database into a SQLite snapshot using the online backup API"""
+        if path is None:
+            path = self.snapshot_path()
+        tmp_path = path + ".tmp"
+        try:
+            source = sqlite3.connect(self.db_path)
+            dest = sqlite3.connect(tmp_path)
+            try:
+                source.backup(dest)
+            finally:
+                dest.close()
+                source.close()
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Snapshot error: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return None
+        
+        if not record_manifest:
+            return path
+        
+        # Record what the snapshot contained when it was taken, so later
+        # verification can detect a file that changed or rotted on disk
+        try:
+            index = self.load_verification_index()
+            entry = index["snapshots"].setdefault(os.path.basename(path), {})
+            entry["expected"] = database_fingerprint(path)
+            entry["fingerprint_version"] = FINGERPRINT_VERSION
+            self._save_verification_index(index)
+        except Exception as e:
+            print(f"Snapshot manifest warning: {e}")
+        return path
+    
+    def create_daily_snapshot(self) -> Optional[str]:
+        """Create today's SQLite snapshot if it doesn't exist yet"""
+        path = self.snapshot_path()
+        if os.path.exists(path):
+            return path
+        return self.create_snapshot(path)
+    
+    def list_snapshots(self) -> List[str]:
+        """List retained snapshot files, newest first"""
+        files = sorted(Path(self.backup_dir).glob("gym_snapshot_*.db"), reverse=True)
+        return [str(f) for f in files]
+    
+    # Verification
+    def verification_index_path(self) -> str:
+        return os.path.join(self.backup_dir, VERIFICATION_INDEX)
+    
+    def load_verification_index(self) -> Dict:
+        """Load the verification index (empty index if none exists yet)"""
+        try:
+            with open(self.verification_index_path(), "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        index.setdefault("snapshots", {})
+        return index
+    
+    def _save_verification_index(self, index: Dict):
+        """Write the verification index atomically"""
+        path = self.verification_index_path()
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+    
+    def _prune_index(self):
+        """Drop index entries for snapshots that no longer exist"""
+        if not os.path.exists(self.verification_index_path()):
+            return
+        index = self.load_verification_index()
+        existing = {os.path.basename(p) for p in self.list_snapshots()}
+        index["snapshots"] = {name: entry for name, entry in index["snapshots"].items() if name in existing}
+        if index.get("latest_ok") not in existing:
+            index["latest_ok"] = None
+        self._save_verification_index(index)
+    
+    def verify_backups(self) -> Dict:
+        """
+        Verify new or changed snapshots and update the verification index.
+        
+        A snapshot is opened read-only and checked with PRAGMA quick_check, then
+        its per-table fingerprints are compared with the ones recorded when it was
+        taken. Results are kept by file size and modification time, so a snapshot
+        that passed and hasn't changed since isn't read again.
+        """
+        snapshots = self.list_snapshots()
+        index = self.load_verification_index()
+        live_stats = None
+        
+        for path in snapshots:
+            entry = index["snapshots"].setdefault(os.path.basename(path), {})
+            if (entry.get("status") == "ok" and entry.get("size") == os.path.getsize(path)
+                    and entry.get("mtime") == os.path.getmtime(path)):
+                continue  # Unchanged since it passed; failed ones are checked again
+            if live_stats is None:
+                live_stats = database_fingerprint(self.db_path) if os.path.exists(self.db_path) else {}
+            entry.update(verify_snapshot(path, live_stats, entry.get("expected"),
+                                         entry.get("fingerprint_version", 1)))
+        
+        # Snapshots are listed newest first
+        index["latest_ok"] = next(
+            (os.path.basename(p) for p in snapshots
+             if index["snapshots"][os.path.basename(p)].get("status") == "ok"),
+            None
+        )
+        index["newest"] = os.path.basename(snapshots[0]) if snapshots else None
+        index["verified_at"] = datetime.now().isoformat(timespec="seconds")
+        self._save_verification_index(index)
+        return index
+    
+    def get_latest_restorable(self) -> Optional[str]:
+        """Get the path of the newest snapshot that passed verification"""
+        latest = self.load_verification_index().get("latest_ok")
+        if not latest:
+            return None
+        path = os.path.join(self.backup_dir, latest)
+        return path if os.path.exists(path) else None
+    
+    def find_snapshot(self, at_date: date = None) -> Optional[str]:
+        """
+        Find the snapshot to restore for a point in time.
+        
+        Returns the newest snapshot taken on or before at_date (newest overall
+        if no date is given), preferring snapshots that passed verification.
+        """
+        candidates = []
+        for path in self.list_snapshots():
+            try:
+                snap_date = datetime.strptime(Path(path).stem.split('_')[-1], '%Y-%m-%d').date()
+            except ValueError:
+                continue
+            if at_date is None or snap_date <= at_date:
+                candidates.append(path)
+        if not candidates:
+            return None
+        index = self.load_verification_index()["snapshots"]
+        verified = [p for p in candidates if index.get(os.path.basename(p), {}).get("status") == "ok"]
+        return (verified or candidates)[0]
+    
+    def restore(self, snapshot_path: str, tables: List[str] = None,
+                member_ids: List[int] = None, dry_run: bool = False) -> Dict:
+        """Restore from a snapshot, saving a copy of the current database first"""
+        if not dry_run:
+            stamp = datetime.now().strftime('%Y-%m-%d-%H%M%S')
+            safety_path = os.path.join(self.backup_dir, f"gym_prerestore_{stamp}.db")
+            if not self.create_snapshot(safety_path, record_manifest=False):
+                raise RuntimeError("Could not save the current database before restoring")
+            print(f"Current database saved to {safety_path}")
+        return restore_snapshot(self.db_path, snapshot_path, tables, member_ids, dry_run)
+    
+    def get_verification_summary(self) -> str:
+        """One-line status of the newest restorable point for display"""
+        index = self.load_verification_index()
+        latest_ok = index.get("latest_ok")
+        newest = index.get("newest")
+        if not index.get("verified_at"):
+            return "Backups not verified yet"
+        if not latest_ok:
+            return "No verified backup available"
+        label = latest_ok.replace("gym_snapshot_", "").replace(".db", "")
+        if newest and newest != latest_ok:
+            return f"Latest backup failed verification - last good: {label}"
+        return f"Latest backup verified: {label}"
 
@@ -0,0 +1,96 @@
+"""
+Clipboard Module
+Small clipboard abstraction used by the browser driver to paste text instead
+of typing it key by key. SystemClipboard uses pyperclip when it is installed,
+otherwise the platform's clipboard command (pbcopy, PowerShell, xclip/xsel).
+MemoryClipboard is a stand-in for tests.
+"""
+import platform
+import shutil
+import subprocess
+from importlib.util import find_spec
+from typing import List, Optional
+
+
+class Clipboard:
+    """copy() puts text on the clipboard, paste() reads it back"""
+    available = True
+
+    def copy(self, text: str):
+        raise NotImplementedError
+
+    def paste(self) -> str:
+        raise NotImplementedError
+
+
+class MemoryClipboard(Clipboard):
+    """In-memory clipboard for tests; remembers everything copied"""
+
+    def __init__(self, available: bool = True):
+        self.available = available
+        self.text = ""
+        self.copied: List[str] = []
+
+    def copy(self, text: str):
+        if not self.available:
+            raise RuntimeError("Clipboard not available")
+        self.text = text
+        self.copied.append(text)
+
+    def paste(self) -> str:
+        return self.text
+
+
+def _clipboard_commands():
+    """(copy command, paste command) for this platform, or None"""
+    system = platform.system()
+    if system == "Darwin":
+        return ["pbcopy"], ["pbpaste"]
+    if system == "Windows":
+        # clip.exe mangles non-ASCII text such as ₹, so go through PowerShell
+        return (["powershell", "-NoProfile", "-Command", "$input | Set-Clipboard"],
+                ["powershell", "-NoProfile", "-Command", "Get-Clipboard -Raw"])
+    if shutil.which("xclip"):
+        return ["xclip", "-selection", "clipboard"], ["xclip", "-selection", "clipboard", "-o"]
+    if shutil.which("xsel"):
+        return ["xsel", "--clipboard", "--input"], ["xsel", "--clipboard", "--output"]
+    return None
+
+
+class SystemClipboard(Clipboard):
+    def __init__(self):
+        self._pyperclip = None
+        self._commands = None
+        if find_spec("pyperclip") is not None:
+            import pyperclip
+            self._pyperclip = pyperclip
+        else:
+            self._commands = _clipboard_commands()
+        self.available = self._pyperclip is not None or self._commands is not None
+
+    def copy(self, text: str):
+        if self._pyperclip is not None:
+            self._pyperclip.copy(text)
+        elif self._commands is not None:
+            subprocess.run(self._commands[0], input=text.encode("utf-8"), check=True, timeout=5)
+        else:
+            raise RuntimeError("Clipboard not available")
+
+    def paste(self) -> str:
+        if self._pyperclip is not None:
+            return self._pyperclip.paste()
+        if self._commands is not None:
+            result = subprocess.run(self._commands[1], capture_output=True, check=True, timeout=5)
+            return result.stdout.decode("utf-8", "replace")
+        raise RuntimeError("Clipboard not available")
+
+
+_system_clipboard: Optional[SystemClipboard] = None
+
+
+def system_clipboard() -> SystemClipboard:
+    """The shared SystemClipboard (looked up on first use)"""
+    global _system_clipboard
+    if _system_clipboard is None:
+        _system_clipboard = SystemClipboard()
+    return _system_clipboard
@@ -3,18 +3,55 @@ Database module for Gym Management System
 Handles all database operations using SQLite
 """
 import sqlite3
-from datetime import datetime, date
+import threading
+from datetime import datetime, date, timedelta
 from typing import List, Dict, Optional, Tuple
+from events import (EventBus, TableVersions, MemberAdded, MemberUpdated, MemberRemoved, PaymentRecorded,
+                    StaffChanged, LockerAssigned, LockerPaymentRecorded, LockerUpdated)
+from member_index import MemberIndex, StaffIndex
+from alert_snapshot import AlertService
+from message_templates import DEFAULT_TEMPLATES, compile_template
+from phone_numbers import e164_prefix, to_e164
+
+OUTBOX_CLAIM_TIMEOUT = 15 * 60  # Seconds after which a message still 'sending' counts as abandoned
+# Days before its due date that a payment shows as due soon, by payment frequency
+DUE_SOON_DAYS = {"Daily": 0, "Monthly": 7, "Quarterly": 14, "Yearly": 30}
+DEFAULT_DUE_SOON_DAYS = 7
 
 class Database:
     def __init__(self, db_path: str = "gym_management.db"):
         """Initialize database connection and create tables if they don't exist"""
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
-        self.conn.row_factory = sqlite3.Row  # Return rows as dictionaries
+        self._main_thread = threading.get_ident()
+        self._main_conn = sqlite3.connect(db_path)
+        self._main_conn.row_factory = sqlite3.Row  # Return rows as dictionaries
+        self._local = threading.local()  # Connections for worker threads
+        self.events = EventBus()  # Mutators publish what changed (see events.py)
+        self.table_versions = TableVersions(self.events)  # Which tables changed, for cached views
+        # In-memory lookup for pickers, built on first use and kept current by events
+        self.member_index = MemberIndex(self)
+        self.staff_index = StaffIndex(self)
+        # Overdue / due soon lists shared by the pages that show alerts
+        self.alerts = AlertService(self)
         self.create_tables()
         self.migrate_database()  # Run migrations for existing databases
     
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """
+        Connection for the calling thread. The UI thread uses the main connection;
+        worker threads (e.g. background searches) get their own, since SQLite
+        connections can't be shared between threads.
+        """
+        if threading.get_ident() == self._main_thread:
+            return self._main_conn
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+    
     def create_tables(self):
         """Create all necessary tables"""
         cursor = self.conn.cursor()
@@ -26,6 +63,7 @@ class Database:
                 name TEXT NOT NULL,
                 email TEXT,
                 phone TEXT,
+                phone_norm TEXT,
                 join_date DATE NOT NULL,
                 membership_type TEXT NOT NULL,
                 fee_amount REAL NOT NULL,
@@ -110,6 +148,64 @@ class Database:
             )
         """)
         
+        # WhatsApp messages waiting to be sent, and what happened to them (see outbox.py)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                member_id INTEGER,
+                phone TEXT,
+                message TEXT NOT NULL,
+                kind TEXT NOT NULL DEFAULT 'custom',
+                status TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                next_attempt_at TIMESTAMP NOT NULL,
+                created_at TIMESTAMP NOT NULL,
+                sent_at TIMESTAMP,
+                claimed_by TEXT,
+                claimed_at TIMESTAMP,
+                FOREIGN KEY (member_id) REFERENCES members(id)
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_outbox_status_due ON outbox(status, next_attempt_at, id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_outbox_member ON outbox(member_id, id)")
+        
+        # Reminders already queued, one per member, kind, subject and due date (stops repeat reminders).
+        # subject_id tells apart what the reminder is about: the locker ID for locker fees, 0 otherwise
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS message_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                member_id INTEGER NOT NULL,
+                kind TEXT NOT NULL,
+                subject_id INTEGER NOT NULL DEFAULT 0,
+                due_date DATE NOT NULL,
+                outbox_id INTEGER,
+                created_at TIMESTAMP NOT NULL,
+                FOREIGN KEY (member_id) REFERENCES members(id),
+                FOREIGN KEY (outbox_id) REFERENCES outbox(id)
+            )
+        """)
+        # Named message templates with {placeholders} (see message_templates.py)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS message_templates (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL UNIQUE,
+                body TEXT NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        cursor.executemany("INSERT OR IGNORE INTO message_templates (name, body) VALUES (?, ?)",
+                           DEFAULT_TEMPLATES.items())
+        
+        # Indexes for the paged payment history (see query_payments)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_payments_date ON payments(payment_date, id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_payments_member_date ON payments(member_id, payment_date, id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_members_name_nocase ON members(name COLLATE NOCASE)")
+        
+        # Indexes for the overdue / due soon lists (read in due date order, see alert_snapshot.py)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_members_status_due ON members(status, next_payment_date)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_lockers_status_due ON lockers(status, next_payment_date)")
+        
         self.conn.commit()
     
     def migrate_database(self):
@@ -127,6 +223,31 @@ class Database:
             except sqlite3.OperationalError as e:
                 print(f"Migration warning: {e}")
         
+        # Migration: E.164 phone numbers for messaging and phone lookups
+        if 'phone_norm' not in columns:
+            cursor.execute("ALTER TABLE members ADD COLUMN phone_norm TEXT")
+            print("Database migrated: Added phone_norm column to members table")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_members_phone_norm ON members(phone_norm)")
+        self.backfill_phone_norm()
+        
+        # Migration: who is sending an outbox message, so another process doesn't requeue it
+        cursor.execute("PRAGMA table_info(outbox)")
+        outbox_columns = [row[1] for row in cursor.fetchall()]
+        for column in ('claimed_by', 'claimed_at'):
+            if column not in outbox_columns:
+                cursor.execute(f"ALTER TABLE outbox ADD COLUMN {column} {'TEXT' if column == 'claimed_by' else 'TIMESTAMP'}")
+                print(f"Database migrated: Added {column} column to outbox table")
+        
+        # Migration: a member with two lockers due on the same day gets a reminder for each
+        cursor.execute("PRAGMA table_info(message_log)")
+        if 'subject_id' not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute("ALTER TABLE message_log ADD COLUMN subject_id INTEGER NOT NULL DEFAULT 0")
+            cursor.execute("DROP INDEX IF EXISTS idx_message_log_key")
+            print("Database migrated: Added subject_id column to message_log table")
+        cursor.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_message_log_key ON message_log(member_id, kind, subject_id, due_date)
+        """)
+        
         # Migration: Reset SQLite sequence for ID reuse
         # If the table was created with AUTOINCREMENT, SQLite maintains a sequence table
         # We need to reset it to allow ID reuse
@@ -205,12 +326,14 @@ class Database:
         next_payment = self._calculate_next_payment_date(join_date, payment_frequency, billing_day=join_date.day)
         
         cursor.execute("""
-            INSERT INTO members (id, name, email, phone, join_date, membership_type,
+            INSERT INTO members (id, name, email, phone, phone_norm, join_date, membership_type,
                                fee_amount, payment_frequency, next_payment_date, trainer_id)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (member_id, name, email, phone, join_date, membership_type, fee_amount, payment_frequency, next_payment, trainer_id))
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (member_id, name, email, phone, to_e164(phone), join_date, membership_type, fee_amount,
+              payment_frequency, next_payment, trainer_id))
         
         self.conn.commit()
+        self.events.publish(MemberAdded(member_id))
         return member_id
     
     def update_member(self, member_id: int, **kwargs):
@@ -224,6 +347,9 @@ class Database:
             if key in allowed_fields:
                 updates.append(f"{key} = ?")
                 values.append(value)
+        if 'phone' in kwargs:
+            updates.append("phone_norm = ?")
+            values.append(to_e164(kwargs['phone']))
         
         if updates:
             values.append(member_id)
@@ -231,6 +357,7 @@ class Database:
                 UPDATE members SET {', '.join(updates)} WHERE id = ?
             """, values)
             self.conn.commit()
+            self.events.publish(MemberUpdated((member_id,)))
     
     def get_all_members(self, active_only: bool = True) -> List[Dict]:
         """Get all members"""
@@ -248,6 +375,107 @@ class Database:
         row = cursor.fetchone()
         return dict(row) if row else None
     
+    def backfill_phone_norm(self) -> int:
+        """
+        Fill in phone_norm where it is missing (old databases, restored rows) or was
+        normalized by older rules (8-9 digit local numbers got a bare "+" in front);
+        returns rows updated
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT id, phone, phone_norm FROM members
+            WHERE phone_norm IS NULL OR (length(phone_norm) < 13 AND phone_norm != '' AND TRIM(phone) NOT LIKE '+%')
+        """)
+        rows = [(to_e164(phone), member_id) for member_id, phone, phone_norm in cursor.fetchall()
+                if phone_norm is None or to_e164(phone) != phone_norm]
+        if rows:
+            cursor.executemany("UPDATE members SET phone_norm = ? WHERE id = ?", rows)
+            self.conn.commit()
+            print(f"Database migrated: Normalized {len(rows)} phone number(s)")
+        return len(rows)
+    
+    def find_members_by_phone(self, phone: str, prefix: bool = False, limit: int = 20) -> List[Dict]:
+        """
+        Members with this phone number, however it is written (uses the phone_norm index).
+        prefix=True matches a partly typed number: "98765" finds +919876543210.
+        """
+        cursor = self.conn.cursor()
+        if prefix:
+            start = e164_prefix(phone)
+            if not start:
+                return []
+            # Digits sort before ':', so this range holds exactly the numbers starting with start
+            cursor.execute("SELECT * FROM members WHERE phone_norm >= ? AND phone_norm < ? ORDER BY phone_norm, id LIMIT ?",
+                           (start, start + ":", limit))
+        else:
+            normalized = to_e164(phone)
+            if not normalized:
+                return []
+            cursor.execute("SELECT * FROM members WHERE phone_norm = ? ORDER BY id LIMIT ?", (normalized, limit))
+        return [dict(row) for row in cursor.fetchall()]
+    
+    def phone_in_use(self, phone: str, exclude_id: int = None) -> Optional[Dict]:
+        """Another member with the same phone number, if any"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT * FROM members WHERE phone_norm = ? AND phone_norm != '' AND id != ? LIMIT 1",
+                       (to_e164(phone), exclude_id or 0))
+        row = cursor.fetchone()
+        return dict(row) if row else None
+    
+    def search_members(self, query: str, limit: int = 20, active_only: bool = False) -> List[Dict]:
+        """Best matches for a member picker (ID, name, phone or email), served from the member index"""
+        return self.member_index.search(query, limit=limit, active_only=active_only)
+    
+    def _member_filter(self, status_filter: str = "All Members", search_term: str = "") -> Tuple[str, list]:
+        """WHERE clause for the member list's status filter and name/ID/phone search"""
+        clauses = []
+        params = []
+        if status_filter == "Active Only":
+            clauses.append("status = 'active'")
+        elif status_filter == "Inactive Only":
+            clauses.append("LOWER(status) = 'inactive'")
+        
+        if search_term:
+            # Name contains the search term (case-insensitive), or exact ID if numeric
+            pattern = search_term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            search_clause = "name LIKE ? ESCAPE '\\'"
+            params.append(f"%{pattern}%")
+            if search_term.strip().isdigit():
+                search_clause = f"({search_clause} OR id = ?)"
+                params.append(int(search_term.strip()))
+            # Phone numbers (5+ digits, written any way) match by the start of the number
+            phone_start = e164_prefix(search_term)
+            if len(phone_start) >= 8:
+                search_clause = f"({search_clause} OR (phone_norm >= ? AND phone_norm < ?))"
+                params += [phone_start, phone_start + ":"]
+            clauses.append(search_clause)
+        
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+    
+    def count_members(self, status_filter: str = "All Members", search_term: str = "") -> int:
+        """Number of members matching the member list filter"""
+        where, params = self._member_filter(status_filter, search_term)
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM members {where}", params)
+        return cursor.fetchone()[0]
+    
+    def get_members_page(self, status_filter: str = "All Members", search_term: str = "",
+                         offset: int = 0, limit: int = 100) -> List[Dict]:
+        """One page of members matching the member list filter, ordered by ID"""
+        where, params = self._member_filter(status_filter, search_term)
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT * FROM members {where} ORDER BY id ASC LIMIT ? OFFSET ?",
+                       params + [limit, offset])
+        return [dict(row) for row in cursor.fetchall()]
+    
+    def get_member_ids(self, status_filter: str = "All Members", search_term: str = "") -> List[int]:
+        """IDs of all members matching the member list filter"""
+        where, params = self._member_filter(status_filter, search_term)
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT id FROM members {where} ORDER BY id ASC", params)
+        return [row[0] for row in cursor.fetchall()]
+    
     def remove_member(self, member_id: int):
         """Hard delete a member (permanently remove from database to allow ID reuse)"""
         cursor = self.conn.cursor()
@@ -256,6 +484,7 @@ class Database:
         # Delete the member (this frees up the ID for reuse)
         cursor.execute("DELETE FROM members WHERE id = ?", (member_id,))
         self.conn.commit()
+        self.events.publish(MemberRemoved(member_id))
     
     def update_member_payment(self, member_id: int, payment_date: date):
         """Update member's payment and calculate next payment date"""
@@ -301,6 +530,7 @@ class Database:
                 WHERE id = ?
             """, (payment_date, next_payment, member_id))
             self.conn.commit()
+            self.events.publish(MemberUpdated((member_id,)))
     
     def fix_payment_dates(self) -> int:
         """
@@ -315,6 +545,7 @@ class Database:
         cursor = self.conn.cursor()
         today = date.today()
         fixed_count = 0
+        fixed_ids = []
         
         # Get all active members
         cursor.execute("""
@@ -406,71 +637,100 @@ class Database:
                     WHERE id = ?
                 """, (fixed_next_payment, member_id))
                 fixed_count += 1
+                fixed_ids.append(member_id)
         
         if fixed_count > 0:
             self.conn.commit()
+            self.events.publish(MemberUpdated(tuple(fixed_ids)))
         
         return fixed_count
     
-    def get_overdue_members(self) -> List[Dict]:
-        """Get members with overdue payments"""
+    def get_overdue_members(self, limit: int = None, offset: int = 0) -> List[Dict]:
+        """Get members with overdue payments, most overdue first (limit/offset read one page)"""
         cursor = self.conn.cursor()
-        today = date.today()
         cursor.execute("""
             SELECT * FROM members 
             WHERE status = 'active' 
             AND next_payment_date < ?
-            ORDER BY next_payment_date
-        """, (today,))
+            ORDER BY next_payment_date, id
+            LIMIT ? OFFSET ?
+        """, (date.today().isoformat(), -1 if limit is None else limit, offset))
         return [dict(row) for row in cursor.fetchall()]
     
-    def get_due_soon_members(self, days: int = None) -> List[Dict]:
-        """Get members with payments due soon, frequency-aware"""
-        cursor = self.conn.cursor()
+    def _due_soon_window(self, days: int = None) -> Tuple[str, int]:
+        """
+        SQL for the days before its due date that a member counts as due soon
+        (by payment frequency unless days is given), and the longest such window
+        """
+        if days is not None:
+            return str(int(days)), int(days)
+        cases = " ".join(f"WHEN '{frequency}' THEN {window}" for frequency, window in DUE_SOON_DAYS.items())
+        return (f"CASE payment_frequency {cases} ELSE {DEFAULT_DUE_SOON_DAYS} END",
+                max(DEFAULT_DUE_SOON_DAYS, *DUE_SOON_DAYS.values()))
+    
+    def get_due_soon_members(self, days: int = None, limit: int = None, offset: int = 0) -> List[Dict]:
+        """
+        Get members with payments due soon, frequency-aware, soonest first.
+        Reads the (status, next_payment_date) index over the longest window only;
+        limit/offset read one page.
+        """
+        window, longest = self._due_soon_window(days)
         today = date.today()
-        
-        # Get all active members
-        cursor.execute("""
+        cursor = self.conn.cursor()
+        cursor.execute(f"""
             SELECT * FROM members 
             WHERE status = 'active' 
-            AND next_payment_date >= ?
-            ORDER BY next_payment_date
-        """, (today,))
-        all_members = [dict(row) for row in cursor.fetchall()]
-        
-        # Filter based on payment frequency
-        due_soon = []
-        for member in all_members:
-            # Handle date conversion (could be string or date object)
-            next_payment_str = member['next_payment_date']
-            if isinstance(next_payment_str, str):
-                next_payment = date.fromisoformat(next_payment_str)
-            else:
-                next_payment = next_payment_str
-            frequency = member.get('payment_frequency', 'Monthly')
-            
-            # Calculate reminder period based on frequency
-            if days is None:
-                # Auto-calculate based on frequency
-                if frequency == "Daily":
-                    reminder_days = 0  # Alert same day
-                elif frequency == "Monthly":
-                    reminder_days = 7  # 7 days before monthly payment
-                elif frequency == "Quarterly":
-                    reminder_days = 14  # 2 weeks before quarterly payment
-                elif frequency == "Yearly":
-                    reminder_days = 30  # 1 month before yearly payment
-                else:
-                    reminder_days = 7  # Default
-            else:
-                reminder_days = days
-            
-            # Check if payment is due within reminder period
-            days_until = (next_payment - today).days
-            if 0 <= days_until <= reminder_days:
-                due_soon.append(member)
-        
-        return due_soon
+            AND next_payment_date >= :today AND next_payment_date <= :last
+            AND julianday(next_payment_date) - julianday(:today) <= {window}
+            ORDER BY next_payment_date, id
+            LIMIT :limit OFFSET :offset
+        """, {'today': today.isoformat(), 'last': (today + timedelta(days=longest)).isoformat(),
+              'limit': -1 if limit is None else limit, 'offset': offset})
+        return [dict(row) for row in cursor.fetchall()]
+    
+    def get_alert_counts(self) -> Dict[str, int]:
+        """Number of overdue and due soon members (the totals of the two lists above), in one query"""
+        window, longest = self._due_soon_window()
+        today = date.today()
+        cursor = self.conn.cursor()
+        cursor.execute(f"""
+            SELECT COALESCE(SUM(next_payment_date < :today), 0),
+                   COALESCE(SUM(next_payment_date >= :today
+                                AND julianday(next_payment_date) - julianday(:today) <= {window}), 0)
+            FROM members
+            WHERE status = 'active' AND next_payment_date <= :last
+        """, {'today': today.isoformat(), 'last': (today + timedelta(days=longest)).isoformat()})
+        overdue, due_soon = cursor.fetchone()
+        return {'overdue': overdue, 'due_soon': due_soon}
+    
+    def get_due_on(self, day: date, kinds: Tuple[str, ...] = ('membership', 'locker')) -> List[Dict]:
+        """
+        Active memberships and lockers with a payment due on day, in one query
+        (uses the status/next_payment_date indexes). Each row has kind, member_id,
+        name, phone (E.164), fee_amount, next_payment_date, and locker_id / locker_number
+        for lockers.
+        """
+        parts = []
+        if 'membership' in kinds:
+            parts.append("""
+                SELECT 'membership' AS kind, id AS member_id, name, phone_norm AS phone, fee_amount, next_payment_date,
+                       NULL AS locker_id, NULL AS locker_number
+                FROM members
+                WHERE status = 'active' AND next_payment_date = :day
+            """)
+        if 'locker' in kinds:
+            parts.append("""
+                SELECT 'locker' AS kind, l.member_id, m.name, m.phone_norm AS phone, l.fee_amount, l.next_payment_date,
+                       l.id AS locker_id, l.locker_number
+                FROM lockers l
+                JOIN members m ON l.member_id = m.id
+                WHERE l.status = 'active' AND l.next_payment_date = :day
+            """)
+        if not parts:
+            return []
+        cursor = self.conn.cursor()
+        cursor.execute(" UNION ALL ".join(parts) + " ORDER BY name, kind", {'day': day.isoformat()})
+        return [dict(row) for row in cursor.fetchall()]
     
     # Staff operations
     def add_staff(self, name: str, email: str, phone: str, position: str, hire_date: date) -> int:
@@ -481,6 +741,7 @@ class Database:
             VALUES (?, ?, ?, ?, ?)
         """, (name, email, phone, position, hire_date))
         self.conn.commit()
+        self.events.publish(StaffChanged(cursor.lastrowid))
         return cursor.lastrowid
     
     def get_all_staff(self, active_only: bool = True) -> List[Dict]:
@@ -492,6 +753,15 @@ class Database:
             cursor.execute("SELECT * FROM staff ORDER BY name")
         return [dict(row) for row in cursor.fetchall()]
     
+    def count_staff(self, active_only: bool = True) -> int:
+        """Number of staff members"""
+        cursor = self.conn.cursor()
+        if active_only:
+            cursor.execute("SELECT COUNT(*) FROM staff WHERE status = 'active'")
+        else:
+            cursor.execute("SELECT COUNT(*) FROM staff")
+        return cursor.fetchone()[0]
+    
     def get_trainers(self, active_only: bool = True) -> List[Dict]:
         """Get all trainers (staff with position = 'Trainer')"""
         cursor = self.conn.cursor()
@@ -508,11 +778,16 @@ class Database:
         row = cursor.fetchone()
         return dict(row) if row else None
     
+    def search_staff(self, query: str, limit: int = 20, active_only: bool = True) -> List[Dict]:
+        """Best matches for a staff picker, served from the staff index"""
+        return self.staff_index.search(query, limit=limit, active_only=active_only)
+    
     def remove_staff(self, staff_id: int):
         """Soft delete a staff member"""
         cursor = self.conn.cursor()
         cursor.execute("UPDATE staff SET status = 'inactive' WHERE id = ?", (staff_id,))
         self.conn.commit()
+        self.events.publish(StaffChanged(staff_id))
     
     # Holiday operations
     def add_holiday(self, staff_id: int, start_date: date, end_date: date, reason: str = "") -> int:
@@ -568,6 +843,7 @@ class Database:
         self.conn.commit()
         # Update member's payment dates
         self.update_member_payment(member_id, payment_date)
+        self.events.publish(PaymentRecorded(member_id, amount))
     
     def get_member_payments(self, member_id: int) -> List[Dict]:
         """Get payment history for a member"""
@@ -590,6 +866,50 @@ class Database:
         """)
         return [dict(row) for row in cursor.fetchall()]
     
+    def query_payments(self, name_prefix: str = "", member_id: Optional[int] = None,
+                       date_from: Optional[date] = None, date_to: Optional[date] = None,
+                       limit: int = 50, after: Optional[Tuple[str, int]] = None) -> List[Dict]:
+        """
+        One page of payments with member names, newest first, filtered in SQL.
+        
+        Args:
+            name_prefix: member name starts with this (case-insensitive)
+            member_id: only this member's payments
+            date_from, date_to: inclusive payment date range
+            limit: page size
+            after: (payment_date, id) of the last row of the previous page
+        """
+        clauses = []
+        params = []
+        if name_prefix:
+            # Range on the NOCASE name index instead of LIKE, so the index is used
+            clauses.append("m.name >= ? COLLATE NOCASE AND m.name < ? COLLATE NOCASE")
+            params += [name_prefix, name_prefix + "\U0010ffff"]
+        if member_id is not None:
+            clauses.append("p.member_id = ?")
+            params.append(member_id)
+        if date_from is not None:
+            clauses.append("p.payment_date >= ?")
+            params.append(str(date_from))
+        if date_to is not None:
+            clauses.append("p.payment_date <= ?")
+            params.append(str(date_to))
+        if after is not None:
+            clauses.append("(p.payment_date, p.id) < (?, ?)")
+            params += [str(after[0]), after[1]]
+        
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        cursor = self.conn.cursor()
+        cursor.execute(f"""
+            SELECT p.*, m.name as member_name
+            FROM payments p
+            JOIN members m ON p.member_id = m.id
+            {where}
+            ORDER BY p.payment_date DESC, p.id DESC
+            LIMIT ?
+        """, params + [limit])
+        return [dict(row) for row in cursor.fetchall()]
+    
     def record_payment(self, member_id: int, amount: float, payment_date: date, notes: str = ""):
         """Record a payment (alias for add_payment)"""
         return self.add_payment(member_id, amount, payment_date, notes)
@@ -787,6 +1107,7 @@ class Database:
         """, (locker_id, member_id, fee_amount, start_date, f"Initial locker assignment payment"))
         
         self.conn.commit()
+        self.events.publish(LockerAssigned(locker_id, member_id))
         return locker_id
     
     def record_locker_payment(self, locker_id: int, payment_date: date, amount: float, notes: str = ""):
@@ -846,6 +1167,7 @@ class Database:
         """, (payment_date, next_payment, locker_id))
         
         self.conn.commit()
+        self.events.publish(LockerPaymentRecorded(locker_id, amount))
     
     def get_all_lockers(self, active_only: bool = False) -> List[Dict]:
         """Get all lockers with member information"""
@@ -889,8 +1211,8 @@ class Database:
             JOIN members m ON l.member_id = m.id
             WHERE l.status = 'active' 
             AND l.next_payment_date < ?
-            ORDER BY l.next_payment_date ASC
-        """, (today,))
+            ORDER BY l.next_payment_date, l.id
+        """, (today.isoformat(),))
         return [dict(row) for row in cursor.fetchall()]
     
     def search_lockers(self, search_term: str) -> List[Dict]:
@@ -902,14 +1224,20 @@ class Database:
         is_numeric = search_term.strip().isdigit()
         
         if is_numeric:
-            # Search by ID or locker number
-            cursor.execute("""
+            # Search by ID, locker number or (5+ digits) the start of the phone number
+            where = "l.member_id = ? OR l.locker_number LIKE ?"
+            params = [int(search_term), search_pattern]
+            phone_start = e164_prefix(search_term)
+            if len(phone_start) >= 8:
+                where += " OR (m.phone_norm >= ? AND m.phone_norm < ?)"
+                params += [phone_start, phone_start + ":"]
+            cursor.execute(f"""
                 SELECT l.*, m.name as member_name, m.phone as member_phone, m.email as member_email
                 FROM lockers l
                 JOIN members m ON l.member_id = m.id
-                WHERE l.member_id = ? OR l.locker_number LIKE ?
+                WHERE {where}
                 ORDER BY l.id DESC
-            """, (int(search_term), search_pattern))
+            """, params)
         else:
             # Search by name, phone, email, or locker number
             cursor.execute("""
@@ -937,12 +1265,14 @@ class Database:
         cursor = self.conn.cursor()
         cursor.execute("UPDATE lockers SET status = ? WHERE id = ?", (status, locker_id))
         self.conn.commit()
+        self.events.publish(LockerUpdated(locker_id))
     
     def remove_locker(self, locker_id: int):
         """Remove/unassign a locker (set status to inactive)"""
         cursor = self.conn.cursor()
         cursor.execute("UPDATE lockers SET status = 'inactive' WHERE id = ?", (locker_id,))
         self.conn.commit()
+        self.events.publish(LockerUpdated(locker_id))
     
     # Locker Revenue Analytics Methods
     def get_daily_locker_revenue(self) -> float:
@@ -994,7 +1324,208 @@ class Database:
         result = cursor.fetchone()
         return float(result[0]) if result and result[0] else 0.0
     
+    # WhatsApp outbox
+    # Message status: queued (waiting, possibly for a retry), sending, sent or failed (gave up).
+    # Times are local "YYYY-MM-DD HH:MM:SS" text so they compare as strings.
+    
+    @staticmethod
+    def _now_text(moment: datetime = None) -> str:
+        return (moment or datetime.now()).strftime('%Y-%m-%d %H:%M:%S')
+    
+    def enqueue_messages(self, messages: List[Dict]) -> int:
+        """
+        Add messages to the outbox in one transaction.
+        Each message has phone, message and optionally member_id, kind ('membership_reminder',
+        'custom', ...), due_date and subject_id. Messages with a due_date are reminders: one per
+        member, kind, subject (the locker for locker reminders) and due date is queued, repeats
+        are skipped (see message_log).
+        Phone numbers are normalized to E.164 here, once; messages without a valid
+        one are recorded as failed straight away.
+        Returns the number of messages queued for sending.
+        """
+        insert_sql = """
+            INSERT INTO outbox (member_id, phone, message, kind, status, last_error, next_attempt_at, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """
+        now = self._now_text()
+        cursor = self.conn.cursor()
+        rows = []
+        queued = 0
+        for m in messages:
+            phone = to_e164(m.get('phone'))
+            if phone:
+                status, error = 'queued', None
+            else:
+                status, error = 'failed', 'Invalid phone number' if m.get('phone') else 'No phone number'
+            kind = m.get('kind', 'custom')
+            row = (m.get('member_id'), phone, m['message'], kind, status, error, now, now)
+            if status == 'queued' and m.get('due_date'):
+                cursor.execute("""
+                    INSERT OR IGNORE INTO message_log (member_id, kind, subject_id, due_date, created_at)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (m['member_id'], kind, m.get('subject_id') or 0, str(m['due_date']), now))
+                if not cursor.rowcount:
+                    continue  # Already reminded about this due date
+                log_id = cursor.lastrowid
+                cursor.execute(insert_sql, row)
+                cursor.execute("UPDATE message_log SET outbox_id = ? WHERE id = ?", (cursor.lastrowid, log_id))
+                queued += 1
+            else:
+                rows.append(row)
+                queued += status == 'queued'
+        cursor.executemany(insert_sql, rows)
+        self.conn.commit()
+        return queued
+    
+    def filter_unsent_reminders(self, messages: List[Dict]) -> List[Dict]:
+        """The reminders (member_id, kind, subject_id, due_date) that haven't been queued before"""
+        sent = set()
+        cursor = self.conn.cursor()
+        member_ids = sorted({m['member_id'] for m in messages})
+        for start in range(0, len(member_ids), 500):  # Stay under SQLite's parameter limit
+            chunk = member_ids[start:start + 500]
+            cursor.execute(f"""
+                SELECT member_id, kind, subject_id, due_date FROM message_log
+                WHERE member_id IN ({",".join("?" * len(chunk))})
+            """, chunk)
+            sent.update(tuple(row) for row in cursor.fetchall())
+        return [m for m in messages
+                if (m['member_id'], m['kind'], m.get('subject_id') or 0, str(m['due_date'])) not in sent]
+    
+    def get_message_templates(self) -> List[Dict]:
+        """All message templates, by name"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT * FROM message_templates ORDER BY name")
+        return [dict(row) for row in cursor.fetchall()]
+    
+    def get_template_text(self, name: str) -> Optional[str]:
+        """Body of the named template (None if there is no such template)"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT body FROM message_templates WHERE name = ?", (name,))
+        row = cursor.fetchone()
+        return row['body'] if row else None
+    
+    def save_message_template(self, name: str, body: str):
+        """Add or replace a template; raises ValueError if body has unknown placeholders"""
+        compile_template(body)
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            INSERT INTO message_templates (name, body) VALUES (?, ?)
+            ON CONFLICT(name) DO UPDATE SET body = excluded.body, updated_at = CURRENT_TIMESTAMP
+        """, (name, body))
+        self.conn.commit()
+    
+    def delete_message_template(self, name: str):
+        cursor = self.conn.cursor()
+        cursor.execute("DELETE FROM message_templates WHERE name = ?", (name,))
+        self.conn.commit()
+    
+    def get_message_history(self, member_id: int, limit: int = 100) -> List[Dict]:
+        """Messages queued for a member, newest first"""
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT id, kind, status, message, attempts, last_error, created_at, sent_at
+            FROM outbox
+            WHERE member_id = ?
+            ORDER BY id DESC
+            LIMIT ?
+        """, (member_id, limit))
+        return [dict(row) for row in cursor.fetchall()]
+    
+    def claim_next_message(self, owner: str = None) -> Optional[Dict]:
+        """
+        Oldest queued message that is due, marked as sending by owner (attempts already
+        counted). The claim time lets requeue_interrupted_messages tell abandoned sends
+        from ones another process is still making.
+        """
+        cursor = self.conn.cursor()
+        while True:
+            cursor.execute("""
+                SELECT * FROM outbox
+                WHERE status = 'queued' AND next_attempt_at <= ?
+                ORDER BY next_attempt_at, id
+                LIMIT 1
+            """, (self._now_text(),))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            cursor.execute("""
+                UPDATE outbox SET status = 'sending', attempts = attempts + 1, claimed_by = ?, claimed_at = ?
+                WHERE id = ? AND status = 'queued'
+            """, (owner, self._now_text(), row['id']))
+            self.conn.commit()
+            if cursor.rowcount:
+                break  # Otherwise another process (e.g. send_reminders.py) claimed it first
+        message = dict(row)
+        message['status'] = 'sending'
+        message['attempts'] += 1
+        return message
+    
+    def next_message_due(self) -> Optional[str]:
+        """When the next queued message is due (None if nothing is queued)"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT MIN(next_attempt_at) FROM outbox WHERE status = 'queued'")
+        return cursor.fetchone()[0]
+    
+    def mark_message_sent(self, message_id: int):
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            UPDATE outbox SET status = 'sent', last_error = NULL, sent_at = ? WHERE id = ?
+        """, (self._now_text(), message_id))
+        self.conn.commit()
+    
+    def mark_message_failed(self, message_id: int, error: str, retry_at: datetime = None):
+        """Record a failed attempt: queue it again for retry_at, or give up if retry_at is None"""
+        cursor = self.conn.cursor()
+        if retry_at is None:
+            cursor.execute("UPDATE outbox SET status = 'failed', last_error = ? WHERE id = ?", (error, message_id))
+        else:
+            cursor.execute("""
+                UPDATE outbox SET status = 'queued', last_error = ?, next_attempt_at = ? WHERE id = ?
+            """, (error, self._now_text(retry_at), message_id))
+        self.conn.commit()
+    
+    def release_message(self, message_id: int):
+        """Put a claimed message back in the queue without counting the attempt"""
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            UPDATE outbox SET status = 'queued', attempts = attempts - 1 WHERE id = ? AND status = 'sending'
+        """, (message_id,))
+        self.conn.commit()
+    
+    def requeue_interrupted_messages(self, owner: str = None, stale_after: float = OUTBOX_CLAIM_TIMEOUT) -> int:
+        """
+        Queue again messages left 'sending' by a send that was cut off: ones claimed
+        by owner, or claimed more than stale_after seconds ago (the process that
+        claimed them is gone). Sends another running process is making are left alone.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            UPDATE outbox SET status = 'queued', claimed_by = NULL, claimed_at = NULL
+            WHERE status = 'sending' AND (claimed_by = ? OR claimed_at IS NULL OR claimed_at < ?)
+        """, (owner, self._now_text(datetime.now() - timedelta(seconds=stale_after))))
+        self.conn.commit()
+        return cursor.rowcount
+    
+    def retry_failed_messages(self) -> int:
+        """Queue every failed message (that has a phone number) again with a fresh attempt count"""
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            UPDATE outbox SET status = 'queued', attempts = 0, next_attempt_at = ?
+            WHERE status = 'failed' AND phone != ''
+        """, (self._now_text(),))
+        self.conn.commit()
+        return cursor.rowcount
+    
+    def get_outbox_counts(self) -> Dict[str, int]:
+        """Number of outbox messages per status"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status")
+        counts = {'queued': 0, 'sending': 0, 'sent': 0, 'failed': 0}
+        counts.update({status: count for status, count in cursor.fetchall()})
+        return counts
+    
     def close(self):
         """Close database connection"""
-        self.conn.close()
+        self._main_conn.close()
 
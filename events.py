@@ -0,0 +1,187 @@
+"""
+Data Change Events Module
+Publish/subscribe bus used by Database to tell open pages what changed,
+so they can patch the affected rows instead of re-reading whole tables
+"""
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Tuple
+
+
+@dataclass(frozen=True)
+class DataEvent:
+    """Base class for all data change events"""
+
+
+@dataclass(frozen=True)
+class MemberAdded(DataEvent):
+    member_id: int
+
+
+@dataclass(frozen=True)
+class MemberUpdated(DataEvent):
+    ids: Tuple[int, ...]
+
+
+@dataclass(frozen=True)
+class MemberRemoved(DataEvent):
+    member_id: int
+
+
+@dataclass(frozen=True)
+class PaymentRecorded(DataEvent):
+    member_id: int
+    amount: float = 0.0
+
+
+@dataclass(frozen=True)
+class StaffChanged(DataEvent):
+    staff_id: int
+
+
+@dataclass(frozen=True)
+class LockerAssigned(DataEvent):
+    locker_id: int
+    member_id: int
+
+
+@dataclass(frozen=True)
+class LockerPaymentRecorded(DataEvent):
+    locker_id: int
+    amount: float = 0.0
+
+
+@dataclass(frozen=True)
+class LockerUpdated(DataEvent):
+    """A locker's status changed or it was removed"""
+    locker_id: int
+
+
+# Events that change what a member row shows
+MEMBER_EVENTS = (MemberAdded, MemberUpdated, MemberRemoved, PaymentRecorded)
+LOCKER_EVENTS = (LockerAssigned, LockerPaymentRecorded, LockerUpdated)
+
+
+# Tables each event writes to
+EVENT_TABLES = {
+    MemberAdded: ("members",),
+    MemberUpdated: ("members",),
+    MemberRemoved: ("members", "payments"),
+    PaymentRecorded: ("payments", "members"),
+    StaffChanged: ("staff",),
+    LockerAssigned: ("lockers",),
+    LockerPaymentRecorded: ("locker_payments", "lockers"),
+    LockerUpdated: ("lockers",),
+}
+
+
+def affected_member_ids(events: Iterable[DataEvent]) -> set:
+    """Member IDs touched by a batch of events"""
+    ids = set()
+    for event in events:
+        if isinstance(event, MemberUpdated):
+            ids.update(event.ids)
+        elif isinstance(event, (MemberAdded, MemberRemoved, PaymentRecorded, LockerAssigned)):
+            ids.add(event.member_id)
+    return ids
+
+
+class EventBus:
+    def __init__(self):
+        self._subscribers: List[Tuple[tuple, Callable]] = []
+
+    def subscribe(self, event_types, handler: Callable) -> Callable:
+        """
+        Call handler(event) for every published event of the given type(s).
+        Subscribe to DataEvent to receive everything. Returns an unsubscribe function.
+        """
+        if not isinstance(event_types, tuple):
+            event_types = (event_types,)
+        entry = (event_types, handler)
+        self._subscribers.append(entry)
+
+        def unsubscribe():
+            if entry in self._subscribers:
+                self._subscribers.remove(entry)
+        return unsubscribe
+
+    def publish(self, event: DataEvent):
+        """Deliver an event to its subscribers; a failing subscriber doesn't stop the others"""
+        for event_types, handler in list(self._subscribers):
+            if isinstance(event, event_types):
+                try:
+                    handler(event)
+                except Exception as e:
+                    print(f"Event handler error ({type(event).__name__}): {e}")
+
+
+class TableVersions:
+    """Per-table change counters, bumped by the events that write to each table"""
+
+    def __init__(self, bus: EventBus):
+        self.versions: Dict[str, int] = {}
+        bus.subscribe(DataEvent, self.on_event)
+
+    def on_event(self, event: DataEvent):
+        for table in EVENT_TABLES.get(type(event), ()):
+            self.versions[table] = self.versions.get(table, 0) + 1
+
+    def snapshot(self, tables: Iterable[str]) -> tuple:
+        """Current versions of the given tables (compare snapshots to see if any changed)"""
+        return tuple(self.versions.get(table, 0) for table in tables)
+
+
+class Coalescer:
+    """Collects events and hands them to the callback as one batch on the Tk event loop"""
+
+    def __init__(self, widget, callback: Callable[[List[DataEvent]], None], delay_ms: int = 50):
+        self.widget = widget
+        self.callback = callback
+        self.delay_ms = delay_ms
+        self.pending: List[DataEvent] = []
+        self._scheduled = None
+
+    def __call__(self, event: DataEvent):
+        self.pending.append(event)
+        if self._scheduled is None:
+            self._scheduled = self.widget.after(self.delay_ms, self.flush)
+
+    def flush(self):
+        """Deliver everything collected so far"""
+        self._scheduled = None
+        batch, self.pending = self.pending, []
+        if batch and self.widget.winfo_exists():
+            self.callback(batch)
+
+    def discard(self):
+        """Drop pending events, e.g. after a full reload already picked them up"""
+        if self._scheduled is not None:
+            try:
+                self.widget.after_cancel(self._scheduled)
+            except Exception:
+                pass
+            self._scheduled = None
+        self.pending = []
+
+
+def subscribe_widget(bus: EventBus, widget, event_types, callback: Callable[[List[DataEvent]], None],
+                     delay_ms: int = 50) -> Coalescer:
+    """
+    Subscribe a widget to events, delivering bursts as a single batch.
+    The subscription ends automatically when the widget is destroyed.
+    Returns the Coalescer so a full reload can discard() events it already covers.
+    """
+    coalescer = Coalescer(widget, callback, delay_ms)
+    unsubscribe = bus.subscribe(event_types, coalescer)
+
+    def on_destroy(event):
+        # Toplevel widgets also receive <Destroy> for each of their children
+        if event.widget is widget:
+            coalescer.discard()
+            unsubscribe()
+
+    # Imported here so the database (and headless tools such as send_reminders.py) don't need Tkinter
+    import tkinter as tk
+
+    # Bind on the Tk widget itself; CustomTkinter's bind() redirects to an inner canvas
+    tk.Misc.bind(widget, "<Destroy>", on_destroy, "+")
+    return coalescer
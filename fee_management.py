@@ -4,15 +4,24 @@ Handles payment recording and fee tracking
 """
 import customtkinter as ctk
 from tkinter import ttk, messagebox
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
+from tree_sync import sync_treeview
+from search_controller import SearchController
+from typeahead import TypeaheadEntry
+from events import MEMBER_EVENTS, PaymentRecorded, affected_member_ids, subscribe_widget
 
 class FeeManagement(ctk.CTkFrame):
+    follows_events = True  # Kept up to date by data change events while hidden
+    tables = ("members", "payments")  # Tables it shows
+    PAYMENT_PAGE_SIZE = 50  # Payments fetched per page of history
+    
     def __init__(self, parent, db):
         super().__init__(parent, fg_color="#ffffff")
         self.db = db
         self.setup_ui()
         self.refresh_payment_list()
         self.update_alerts()
+        self.data_events = subscribe_widget(self.db.events, self, MEMBER_EVENTS, self.on_data_changed)
     
     def setup_ui(self):
         """Create the fee management UI"""
@@ -65,28 +74,18 @@ class FeeManagement(ctk.CTkFrame):
         )
         member_label.pack(anchor="w", padx=20, pady=(10, 5))
         
-        self.member_search = ctk.CTkEntry(
-            scrollable_form,
-            height=35,
-            font=ctk.CTkFont(size=14),
-            border_width=1,
-            border_color="#cbd5e1",
-            placeholder_text="Type to search..."
-        )
-        self.member_search.pack(fill="x", padx=20, pady=(0, 5))
-        self.member_search.bind("<KeyRelease>", self.on_search_member)
-        
-        # Member selection dropdown (filtered results)
-        self.member_combo = ctk.CTkComboBox(
+        # Suggests the best matches while typing
+        self.member_picker = TypeaheadEntry(
             scrollable_form,
+            search=lambda query, limit: self.db.search_members(query, limit),
+            format_item=lambda m: f"{m['name']} (ID: {m['id']})",
+            command=self.on_member_selected,
             height=35,
             font=ctk.CTkFont(size=14),
             border_width=1,
-            border_color="#cbd5e1",
-            command=self.on_member_selected
+            border_color="#cbd5e1"
         )
-        self.member_combo.pack(fill="x", padx=20, pady=(0, 10))
-        self.update_member_list()
+        self.member_picker.pack(fill="x", padx=20, pady=(0, 10))
         
         # Amount
         amount_label = ctk.CTkLabel(
@@ -247,13 +246,15 @@ class FeeManagement(ctk.CTkFrame):
         
         self.filter_name = ctk.CTkEntry(
             filter_inputs_frame,
-            placeholder_text="Filter by name...",
+            placeholder_text="Name starts with...",
             width=150,
             height=30,
             font=ctk.CTkFont(size=12)
         )
         self.filter_name.pack(side="left", padx=(0, 10))
-        self.filter_name.bind("<KeyRelease>", lambda e: self.refresh_payment_list())
+        self.payment_lookup = SearchController(self, self._fetch_payments, self._show_payments,
+                                               get_query=self._payment_filters)
+        self.filter_name.bind("<KeyRelease>", self.payment_lookup.schedule)
         
         # Member ID filter
         id_label = ctk.CTkLabel(
@@ -273,7 +274,7 @@ class FeeManagement(ctk.CTkFrame):
             font=ctk.CTkFont(size=12)
         )
         self.filter_id.pack(side="left", padx=(0, 10))
-        self.filter_id.bind("<KeyRelease>", lambda e: self.refresh_payment_list())
+        self.filter_id.bind("<KeyRelease>", self.payment_lookup.schedule)
         
         # Date filter
         date_label = ctk.CTkLabel(
@@ -293,7 +294,7 @@ class FeeManagement(ctk.CTkFrame):
             font=ctk.CTkFont(size=12)
         )
         self.filter_date.pack(side="left", padx=(0, 10))
-        self.filter_date.bind("<KeyRelease>", lambda e: self.refresh_payment_list())
+        self.filter_date.bind("<KeyRelease>", self.payment_lookup.schedule)
         
         # Clear filters button
         clear_filters_btn = ctk.CTkButton(
@@ -334,6 +335,32 @@ class FeeManagement(ctk.CTkFrame):
         self.tree.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
         
+        # Paging footer: rows shown so far and their total
+        paging_frame = ctk.CTkFrame(history_frame, fg_color="transparent")
+        paging_frame.pack(fill="x", padx=20, pady=(0, 15))
+        
+        self.payment_summary_label = ctk.CTkLabel(
+            paging_frame,
+            text="",
+            font=ctk.CTkFont(size=12),
+            text_color="#64748b"
+        )
+        self.payment_summary_label.pack(side="left")
+        
+        self.load_more_btn = ctk.CTkButton(
+            paging_frame,
+            text="Load More",
+            command=self.load_more_payments,
+            fg_color="#64748b",
+            hover_color="#475569",
+            font=ctk.CTkFont(size=11),
+            width=100,
+            height=30
+        )
+        self.load_more_btn.pack(side="right")
+        self.payment_rows = []
+        self.more_payments = False
+        
         # Alerts
         alerts_frame = ctk.CTkFrame(
             right_frame,
@@ -351,68 +378,55 @@ class FeeManagement(ctk.CTkFrame):
         )
         self.alerts_label.pack(pady=10)
     
-    def update_member_list(self, search_term=""):
-        """Update member dropdown with search filtering"""
-        members = self.db.get_all_members(active_only=False)
-        
-        # Filter members based on search term
-        if search_term:
-            search_term = search_term.lower().strip()
-            filtered_members = []
-            for m in members:
-                # Search in name, id, phone, email
-                if (search_term in m['name'].lower() or
-                    search_term in str(m['id']) or
-                    (m.get('phone') and search_term in str(m['phone']).lower()) or
-                    (m.get('email') and search_term in str(m['email']).lower())):
-                    filtered_members.append(m)
-            members = filtered_members
-        
-        member_names = [f"{m['name']} (ID: {m['id']})" for m in members]
-        self.member_combo.configure(values=member_names)
-        if member_names:
-            self.member_combo.set(member_names[0])
-            self.on_member_selected(member_names[0])
+    def reload_member_dropdown(self):
+        """Re-read the picked member, clearing the picker if they were removed"""
+        selected = self.member_picker.get_selected()
+        if not selected:
+            return
+        member = self.db.member_index.get(selected['id'])
+        if member:
+            self.member_picker.set(member)
+            self.on_member_selected(member)
         else:
-            self.member_combo.set("")
-            self.member_info_label.configure(text="No members found")
+            self.member_picker.clear()
+            self.member_info_label.configure(text="Select a member to view payment details")
     
-    def on_search_member(self, event=None):
-        """Handle member search input"""
-        search_term = self.member_search.get()
-        self.update_member_list(search_term)
+    def refresh(self):
+        """Reload members, payments and alerts after data changed elsewhere"""
+        self.reload_member_dropdown()
+        self.refresh_payment_list()
+        self.update_alerts()
+    
+    def on_data_changed(self, events):
+        """Update only the parts affected by a batch of data changes"""
+        # Refresh the picker and info panel if the picked member changed
+        selected = self.member_picker.get_selected()
+        if selected and selected['id'] in affected_member_ids(events):
+            self.reload_member_dropdown()
+        
+        if any(isinstance(e, PaymentRecorded) for e in events):
+            self.refresh_payment_list()
+        self.update_alerts()
     
-    def on_member_selected(self, value):
+    def on_member_selected(self, member):
         """Handle member selection"""
-        try:
-            member_id = int(value.split("(ID: ")[1].rstrip(")"))
-            members = self.db.get_all_members()
-            member = next((m for m in members if m['id'] == member_id), None)
-            
-            if member:
-                info = f"""Name: {member['name']}
+        info = f"""Name: {member['name']}
 Membership: {member['membership_type']}
 Fee: ₹{member['fee_amount']:.2f} ({member['payment_frequency']})
 Next Payment: {member.get('next_payment_date', 'N/A')}"""
-                self.member_info_label.configure(text=info)
-                
-                # Auto-fill amount
-                if not self.amount_input.get():
-                    self.amount_input.insert(0, str(member['fee_amount']))
-        except:
-            pass
+        self.member_info_label.configure(text=info)
+        
+        # Auto-fill amount
+        if not self.amount_input.get():
+            self.amount_input.insert(0, str(member['fee_amount']))
     
     def record_payment(self):
         """Record a payment"""
-        if not self.member_combo.get():
+        member = self.member_picker.get_selected()
+        if not member:
             messagebox.showwarning("Error", "Please select a member!")
             return
-        
-        try:
-            member_id = int(self.member_combo.get().split("(ID: ")[1].rstrip(")"))
-        except:
-            messagebox.showerror("Error", "Invalid member selection!")
-            return
+        member_id = member['id']
         
         try:
             amount = float(self.amount_input.get())
@@ -434,88 +448,89 @@ Next Payment: {member.get('next_payment_date', 'N/A')}"""
             self.db.record_payment(member_id, amount, payment_date, notes)
             messagebox.showinfo("Success", "Payment recorded successfully!")
             self.clear_form()
-            self.refresh_payment_list()
-            self.update_alerts()
-            self.update_member_list()
+            # Payment list and alerts update from the PaymentRecorded event
         except Exception as e:
             messagebox.showerror("Error", f"Failed to record payment: {str(e)}")
     
     def clear_form(self):
         """Clear the form"""
-        self.member_search.delete(0, "end")
-        self.update_member_list()
+        self.member_picker.clear()
+        self.member_info_label.configure(text="Select a member to view payment details")
         self.amount_input.delete(0, "end")
         self.payment_date.delete(0, "end")
         self.payment_date.insert(0, date.today().strftime('%Y-%m-%d'))
         self.notes_input.delete(0, "end")
     
     def refresh_payment_list(self):
-        """Refresh payment history with filters"""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # Get all payments
-        payments = self.db.get_all_payments()
-        
-        # Apply filters
-        filtered_payments = self.apply_filters(payments)
-        
-        # Populate table
-        for p in filtered_payments:
-            self.tree.insert('', 'end', values=(
+        """Refresh payment history with filters (as many rows as are loaded, at least one page)"""
+        limit = max(self.PAYMENT_PAGE_SIZE, len(self.payment_rows))
+        self._show_payments(self._fetch_payments(self._payment_filters(), limit))
+    
+    def _payment_filters(self):
+        """Current filter inputs (name, member ID, date), read on the UI thread"""
+        return self.filter_name.get().strip(), self.filter_id.get().strip(), self.filter_date.get().strip()
+    
+    def _payment_query(self, filters):
+        """Database.query_payments arguments for the filter inputs"""
+        name_filter, id_filter, date_filter = filters
+        query = {'name_prefix': name_filter}
+        if id_filter.isdigit():
+            query['member_id'] = int(id_filter)
+        query['date_from'], query['date_to'] = self._date_range(date_filter)
+        return query
+    
+    def _date_range(self, text):
+        """Inclusive date range for YYYY, YYYY-MM or YYYY-MM-DD (anything else doesn't filter)"""
+        for fmt, unit in (('%Y-%m-%d', 'day'), ('%Y-%m', 'month'), ('%Y', 'year')):
+            try:
+                start = datetime.strptime(text, fmt).date()
+            except ValueError:
+                continue
+            if unit == 'day':
+                return start, start
+            if unit == 'month':
+                next_month = date(start.year + start.month // 12, start.month % 12 + 1, 1)
+                return start, next_month - timedelta(days=1)
+            return start, date(start.year, 12, 31)
+        return None, None
+    
+    def _fetch_payments(self, filters, limit=None, after=None):
+        """One page of payments for the filters (safe to call from a worker thread)"""
+        limit = limit or self.PAYMENT_PAGE_SIZE
+        rows = self.db.query_payments(**self._payment_query(filters), limit=limit, after=after)
+        return filters, rows, len(rows) == limit
+    
+    def _show_payments(self, result, append=False):
+        """Show fetched payments in the history table"""
+        filters, rows, more = result
+        self.payment_rows = self.payment_rows + rows if append else rows
+        self.more_payments = more
+        
+        # Update the table in place (only new or changed rows are touched)
+        sync_treeview(self.tree, [
+            (p['id'], (
                 p.get('member_id', 'N/A'),  # Member ID
                 p.get('member_name', 'N/A'),  # Member Name
                 f"₹{p['amount']:.2f}",
                 p['payment_date'],
                 p.get('notes', '')
-            ))
-    
-    def apply_filters(self, payments):
-        """Apply filters to payment list"""
-        filtered = payments
-        
-        # Filter by member name
-        name_filter = self.filter_name.get().strip().lower()
-        if name_filter:
-            filtered = [p for p in filtered if name_filter in p.get('member_name', '').lower()]
-        
-        # Filter by member ID
-        id_filter = self.filter_id.get().strip()
-        if id_filter:
-            try:
-                # Try to match exact ID
-                target_id = int(id_filter)
-                filtered = [p for p in filtered if p.get('member_id') == target_id]
-            except ValueError:
-                # If not a number, try string match
-                filtered = [p for p in filtered if id_filter in str(p.get('member_id', ''))]
-        
-        # Filter by date
-        date_filter = self.filter_date.get().strip()
-        if date_filter:
-            try:
-                # Try to parse as date
-                filter_date = datetime.strptime(date_filter, '%Y-%m-%d').date()
-                filtered = [p for p in filtered if self._matches_date(p.get('payment_date'), filter_date)]
-            except ValueError:
-                # If invalid date format, try string match
-                filtered = [p for p in filtered if date_filter in str(p.get('payment_date', ''))]
-        
-        return filtered
+            ), ())
+            for p in self.payment_rows
+        ])
+        
+        total = sum(p['amount'] for p in self.payment_rows)
+        suffix = "" if more else " (all)"
+        self.payment_summary_label.configure(
+            text=f"Showing {len(self.payment_rows)} payment(s){suffix}  •  Total ₹{total:,.2f}")
+        self.load_more_btn.configure(state="normal" if more else "disabled")
     
-    def _matches_date(self, payment_date, filter_date):
-        """Check if payment date matches filter date"""
-        if not payment_date:
-            return False
-        
-        # Convert payment_date to date object if it's a string
-        if isinstance(payment_date, str):
-            try:
-                payment_date = datetime.strptime(payment_date, '%Y-%m-%d').date()
-            except ValueError:
-                return False
-        
-        return payment_date == filter_date
+    def load_more_payments(self):
+        """Append the next page of payments"""
+        if not self.payment_rows or not self.more_payments:
+            return
+        last = self.payment_rows[-1]
+        self._show_payments(self._fetch_payments(self._payment_filters(), after=(last['payment_date'], last['id'])),
+                            append=True)
     
     def clear_filters(self):
         """Clear all filters"""
@@ -526,14 +541,13 @@ Next Payment: {member.get('next_payment_date', 'N/A')}"""
     
     def update_alerts(self):
         """Update payment alerts"""
-        overdue = self.db.get_overdue_members()
-        due_soon = self.db.get_due_soon_members()  # Frequency-aware reminders
+        snapshot = self.db.alerts.snapshot()  # Frequency-aware, shared with the alert pages
         
         alerts = []
-        if overdue:
-            alerts.append(f"⚠️ {len(overdue)} Overdue Payment(s)")
-        if due_soon:
-            alerts.append(f"🔔 {len(due_soon)} Payment(s) Due Soon")
+        if snapshot.overdue:
+            alerts.append(f"⚠️ {len(snapshot.overdue)} Overdue Payment(s)")
+        if snapshot.due_soon:
+            alerts.append(f"🔔 {len(snapshot.due_soon)} Payment(s) Due Soon")
         
         if alerts:
             self.alerts_label.configure(text="\n".join(alerts), text_color="#dc2626")
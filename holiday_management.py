@@ -5,6 +5,8 @@ Handles staff holiday/leave recording and viewing
 import customtkinter as ctk
 from tkinter import ttk, messagebox
 from datetime import date, datetime
+from tree_sync import sync_treeview
+from typeahead import TypeaheadEntry
 
 class HolidayManagement(ctk.CTkFrame):
     def __init__(self, parent, db):
@@ -55,15 +57,18 @@ class HolidayManagement(ctk.CTkFrame):
         )
         staff_label.pack(anchor="w", padx=20, pady=(10, 5))
         
-        self.staff_combo = ctk.CTkComboBox(
+        # Suggests the best matching active staff while typing
+        self.staff_picker = TypeaheadEntry(
             form_frame,
+            search=lambda query, limit: self.db.search_staff(query, limit),
+            format_item=lambda s: f"{s['name']} (ID: {s['id']})",
+            placeholder_text="Type a name or ID...",
             height=35,
             font=ctk.CTkFont(size=14),
             border_width=1,
             border_color="#cbd5e1"
         )
-        self.staff_combo.pack(fill="x", padx=20, pady=(0, 10))
-        self.update_staff_list()
+        self.staff_picker.pack(fill="x", padx=20, pady=(0, 10))
         
         # Start date
         start_label = ctk.CTkLabel(
@@ -198,25 +203,29 @@ class HolidayManagement(ctk.CTkFrame):
         refresh_btn.pack(fill="x")
     
     def update_staff_list(self):
-        """Update staff dropdown"""
-        staff = self.db.get_all_staff()
-        staff_names = [f"{s['name']} (ID: {s['id']})" for s in staff]
-        self.staff_combo.configure(values=staff_names)
-        if staff_names:
-            self.staff_combo.set(staff_names[0])
+        """Re-read the picked staff member, clearing the picker if they are no longer active"""
+        selected = self.staff_picker.get_selected()
+        if not selected:
+            return
+        staff = self.db.staff_index.get(selected['id'])
+        if staff and staff.get('status') == 'active':
+            self.staff_picker.set(staff)
+        else:
+            self.staff_picker.clear()
+    
+    def refresh(self):
+        """Re-read the picked staff member and the holiday list after data changed elsewhere"""
+        self.update_staff_list()
+        self.refresh_holiday_list()
     
     def record_holiday(self):
         """Record a holiday"""
-        if not self.staff_combo.get():
+        staff = self.staff_picker.get_selected()
+        if not staff:
             messagebox.showwarning("Error", "Please select a staff member!")
             return
-        
-        try:
-            staff_name = self.staff_combo.get().split(" (ID: ")[0]
-            staff_id = int(self.staff_combo.get().split("(ID: ")[1].rstrip(")"))
-        except:
-            messagebox.showerror("Error", "Invalid staff selection!")
-            return
+        staff_name = staff['name']
+        staff_id = staff['id']
         
         try:
             start_date = datetime.strptime(self.start_date.get(), '%Y-%m-%d').date()
@@ -241,23 +250,21 @@ class HolidayManagement(ctk.CTkFrame):
     
     def clear_form(self):
         """Clear the form"""
-        self.update_staff_list()
+        self.staff_picker.clear()
         self.start_date.delete(0, "end")
         self.end_date.delete(0, "end")
         self.reason_input.delete(0, "end")
     
     def refresh_holiday_list(self):
         """Refresh the holiday list"""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
         holidays = self.db.get_all_holidays()
+        rows = []
         for h in holidays:
             start = datetime.strptime(h['start_date'], '%Y-%m-%d').date()
             end = datetime.strptime(h['end_date'], '%Y-%m-%d').date()
             days = (end - start).days + 1
             
-            self.tree.insert('', 'end', values=(
+            rows.append((h['id'], (
                 h['id'],
                 h['staff_name'],
                 h['start_date'],
@@ -265,4 +272,7 @@ class HolidayManagement(ctk.CTkFrame):
                 days,
                 h.get('reason', ''),
                 h.get('status', 'approved').title()
-            ))
+            ), ()))
+        
+        # Update the table in place (only new or changed rows are touched)
+        sync_treeview(self.tree, rows)
@@ -6,13 +6,23 @@ import customtkinter as ctk
 from tkinter import ttk, messagebox
 from datetime import date, datetime
 from typing import Optional
+from tree_sync import sync_treeview
+from search_controller import SearchController
+from typeahead import TypeaheadEntry
+from events import LOCKER_EVENTS, MemberAdded, MemberRemoved, MemberUpdated, subscribe_widget
 
 class LockerManagement(ctk.CTkFrame):
+    follows_events = True  # Kept up to date by data change events while hidden
+    tables = ("lockers", "locker_payments", "members")  # Tables it shows
+    
     def __init__(self, parent, db):
         super().__init__(parent, fg_color="#ffffff")
         self.db = db
         self.setup_ui()
         self.refresh_locker_list()
+        self.data_events = subscribe_widget(
+            self.db.events, self, LOCKER_EVENTS + (MemberAdded, MemberRemoved, MemberUpdated), self.on_data_changed
+        )
     
     def setup_ui(self):
         """Create the locker management UI"""
@@ -92,7 +102,10 @@ class LockerManagement(ctk.CTkFrame):
             width=300
         )
         self.search_entry.pack(side="left", padx=(0, 10))
-        self.search_entry.bind("<KeyRelease>", self.on_search)
+        # Searches run once typing pauses, on a worker thread
+        self.search = SearchController(self, self.find_lockers, self.populate_locker_list,
+                                       get_query=self.search_entry.get)
+        self.search_entry.bind("<KeyRelease>", self.search.schedule)
         
         # Overdue Payments Button
         overdue_btn = ctk.CTkButton(
@@ -138,17 +151,16 @@ class LockerManagement(ctk.CTkFrame):
         )
         member_id_label.pack(anchor="w", padx=20, pady=(0, 5))
         
-        # Get all active members for dropdown
-        members = self.db.get_all_members(active_only=True)
-        member_options = [f"{m['id']} - {m['name']}" for m in members]
-        
-        self.member_combo = ctk.CTkComboBox(
+        # Suggests the best matching active members while typing
+        self.member_picker = TypeaheadEntry(
             parent,
-            values=member_options if member_options else ["No active members"],
-            width=350,
-            command=self.on_member_selected
+            search=lambda query, limit: self.db.search_members(query, limit, active_only=True),
+            format_item=lambda m: f"{m['id']} - {m['name']}",
+            command=self.on_member_selected,
+            placeholder_text="Type a name, ID or phone...",
+            width=350
         )
-        self.member_combo.pack(fill="x", padx=20, pady=(0, 15))
+        self.member_picker.pack(fill="x", padx=20, pady=(0, 15))
         self.selected_member_id = None
         
         # Locker Number
@@ -371,28 +383,18 @@ class LockerManagement(ctk.CTkFrame):
         
         self.tree.grid(row=0, column=0, sticky="nsew")
     
-    def on_member_selected(self, choice):
-        """Handle member selection from dropdown"""
-        if choice and " - " in choice:
-            member_id = int(choice.split(" - ")[0])
-            self.selected_member_id = member_id
+    def on_member_selected(self, member):
+        """Handle member selection from the picker"""
+        self.selected_member_id = member['id']
     
     def assign_locker(self):
         """Assign a locker to a member"""
         try:
             # Get member ID from dropdown
-            if not self.selected_member_id:
-                selected = self.member_combo.get()
-                if not selected or selected == "No active members":
-                    messagebox.showerror("Error", "Please select a member")
-                    return
-                if " - " in selected:
-                    member_id = int(selected.split(" - ")[0])
-                else:
-                    messagebox.showerror("Error", "Please select a valid member")
-                    return
-            else:
-                member_id = self.selected_member_id
+            if not self.member_picker.get_selected():
+                messagebox.showerror("Error", "Please select a member")
+                return
+            member_id = self.selected_member_id
             
             locker_number = self.locker_num_entry.get().strip() or None
             fee_amount = float(self.fee_entry.get().strip())
@@ -419,18 +421,14 @@ class LockerManagement(ctk.CTkFrame):
             messagebox.showinfo("Success", f"Locker assigned successfully!\nLocker ID: {locker_id}")
             
             # Clear form
-            self.member_combo.set("")
+            self.member_picker.clear()
             self.selected_member_id = None
             self.locker_num_entry.delete(0, "end")
             self.fee_entry.delete(0, "end")
             self.frequency_combo.set("Monthly")
             self.start_date_entry.delete(0, "end")
             
-            # Refresh member list in case new members were added
-            self.refresh_member_dropdown()
-            
-            # Refresh list
-            self.refresh_locker_list()
+            # The locker list updates from the LockerAssigned event
             
         except ValueError as e:
             messagebox.showerror("Error", f"Invalid input: {str(e)}")
@@ -438,10 +436,16 @@ class LockerManagement(ctk.CTkFrame):
             messagebox.showerror("Error", f"Failed to assign locker: {str(e)}")
     
     def refresh_member_dropdown(self):
-        """Refresh the member dropdown with latest members"""
-        members = self.db.get_all_members(active_only=True)
-        member_options = [f"{m['id']} - {m['name']}" for m in members]
-        self.member_combo.configure(values=member_options if member_options else ["No active members"])
+        """Re-read the picked member, clearing the picker if they are no longer active"""
+        selected = self.member_picker.get_selected()
+        if not selected:
+            return
+        member = self.db.member_index.get(selected['id'])
+        if member and member.get('status') == 'active':
+            self.member_picker.set(member)
+        else:
+            self.member_picker.clear()
+            self.selected_member_id = None
     
     def record_payment(self):
         """Record a locker payment"""
@@ -467,9 +471,7 @@ class LockerManagement(ctk.CTkFrame):
             self.payment_amount_entry.delete(0, "end")
             self.payment_date_entry.delete(0, "end")
             self.payment_notes_entry.delete(0, "end")
-            
-            # Refresh list
-            self.refresh_locker_list()
+            # The locker list updates from the LockerPaymentRecorded event
             
         except ValueError as e:
             messagebox.showerror("Error", f"Invalid input: {str(e)}")
@@ -478,7 +480,7 @@ class LockerManagement(ctk.CTkFrame):
     
     def show_overdue_payments(self):
         """Show members with overdue locker payments"""
-        overdue = self.db.get_overdue_locker_payments()
+        overdue = self.db.alerts.snapshot().overdue_lockers
         
         if not overdue:
             messagebox.showinfo("No Overdue Payments", "All locker payments are up to date!")
@@ -533,35 +535,29 @@ class LockerManagement(ctk.CTkFrame):
         
         overdue_tree.grid(row=0, column=0, sticky="nsew")
         
-        # Populate tree
-        today = date.today()
-        for locker in overdue:
-            next_payment = locker.get('next_payment_date')
-            if isinstance(next_payment, str):
-                next_payment = datetime.strptime(next_payment, "%Y-%m-%d").date()
-            
-            days_overdue = (today - next_payment).days
-            
+        # Populate tree (rows come sorted with the days worked out)
+        for row in overdue:
+            locker = row.record
             overdue_tree.insert('', 'end', values=(
                 locker['id'],
-                locker.get('member_name', 'N/A'),
+                row.name,
                 locker.get('locker_number', 'N/A'),
-                f"₹{locker['fee_amount']:.2f}",
+                f"₹{row.amount:.2f}",
                 locker['payment_frequency'],
                 locker.get('last_payment_date', 'N/A'),
                 locker.get('next_payment_date', 'N/A'),
-                f"{days_overdue} days"
+                f"{row.days} days"
             ))
     
     def on_search(self, event=None):
         """Handle search input"""
-        search_term = self.search_entry.get()
+        self.populate_locker_list(self.find_lockers(self.search_entry.get()))
+    
+    def find_lockers(self, search_term):
+        """Lockers matching the search term (safe to call from a worker thread)"""
         if search_term.strip():
-            lockers = self.db.search_lockers(search_term)
-        else:
-            lockers = self.db.get_all_lockers()
-        
-        self.populate_locker_list(lockers)
+            return self.db.search_lockers(search_term)
+        return self.db.get_all_lockers()
     
     def refresh_locker_list(self, search_term=""):
         """Refresh the locker list"""
@@ -572,6 +568,18 @@ class LockerManagement(ctk.CTkFrame):
         
         self.populate_locker_list(lockers)
     
+    def refresh(self):
+        """Reload members and lockers after data changed elsewhere, keeping the search"""
+        self.refresh_member_dropdown()
+        self.on_search()
+    
+    def on_data_changed(self, events):
+        """Reload the member dropdown or locker list, whichever a batch of changes affects"""
+        if any(isinstance(e, (MemberAdded, MemberRemoved, MemberUpdated)) for e in events):
+            self.refresh_member_dropdown()
+        # Member names are shown in the locker list too
+        self.on_search()
+    
     def remove_locker(self):
         """Remove/unassign a locker"""
         # Get selected item from treeview
@@ -599,20 +607,15 @@ class LockerManagement(ctk.CTkFrame):
             try:
                 self.db.remove_locker(locker_id)
                 messagebox.showinfo("Success", f"Locker {locker_id} has been removed/unassigned successfully!")
-                # Refresh list
-                self.refresh_locker_list()
+                # The locker list updates from the LockerUpdated event
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to remove locker: {str(e)}")
     
     def populate_locker_list(self, lockers):
         """Populate the locker list treeview"""
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # Populate with locker data
-        for locker in lockers:
-            self.tree.insert('', 'end', values=(
+        # Update the table in place (only new or changed rows are touched)
+        sync_treeview(self.tree, [
+            (locker['id'], (
                 locker['id'],
                 locker.get('member_name', 'N/A'),
                 locker.get('locker_number', 'N/A'),
@@ -621,5 +624,7 @@ class LockerManagement(ctk.CTkFrame):
                 locker.get('last_payment_date', 'N/A'),
                 locker.get('next_payment_date', 'N/A'),
                 locker.get('status', 'active').title()
-            ))
+            ), ())
+            for locker in lockers
+        ])
 
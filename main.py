@@ -1,24 +1,30 @@
 """
 Gym Management System - Main Application
 Modern UI using CustomTkinter (much simpler than PySide6!)
+Page modules and heavy libraries (PIL, pandas, pyautogui) are imported on first use.
+Run with --profile-startup to print a startup timing breakdown.
 """
+import os
+import sys
+import threading
+from startup_profiler import profiler
+
+# Enable before the remaining imports so they are included in the report
+if "--profile-startup" in sys.argv:
+    profiler.enable()
+
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import ttk, messagebox
-import os
-import sys
-from datetime import date, datetime
-from PIL import Image, ImageTk
+from datetime import date
 from database import Database
-from member_management import MemberManagement
-from staff_management import StaffManagement
-from fee_management import FeeManagement
 from backup_manager import BackupManager
-from whatsapp_management import WhatsAppManagement
-from owner_dashboard import OwnerDashboard
-from locker_management import LockerManagement
-from payment_alerts import PaymentAlerts
-from trainers import Trainers
+from outbox import OutboxDispatcher
+from whatsapp_transport import BrowserTransport, create_transport
+from reminders import ReminderScheduler, configured_times
+from events import MEMBER_EVENTS, subscribe_widget
+
+ALERT_CARD_ROWS = 10  # Most urgent rows a dashboard alert card shows before "Show more"
 
 # Helper function to get resource path (works with PyInstaller)
 def resource_path(relative_path):
@@ -42,19 +48,12 @@ class GymManagementApp(ctk.CTk):
         self.geometry("1400x900")
         
         # Initialize database
-        self.db = Database()
+        with profiler.phase("Database init"):
+            self.db = Database()
         
-        # Initialize backup manager and create daily backup (if pandas is available)
+        # Initialize backup manager (backups themselves run in the background)
         try:
             self.backup_manager = BackupManager()
-            backup_path = self.backup_manager.create_daily_backup()
-            if backup_path:
-                print(f"Daily backup created: {backup_path}")
-            # Cleanup old backups (keep last 30 days)
-            self.backup_manager.cleanup_old_backups(keep_days=30)
-        except ImportError:
-            print("Note: pandas not installed. Backup functionality disabled. Install with: pip install pandas openpyxl")
-            self.backup_manager = None
         except Exception as e:
             print(f"Backup warning: {e}")
             self.backup_manager = None
@@ -63,10 +62,36 @@ class GymManagementApp(ctk.CTk):
         self.current_active = 0
         
         # Create main UI
-        self.create_main_ui()
+        with profiler.phase("Main UI"):
+            self.create_main_ui()
         
         # Load dashboard
-        self.show_dashboard()
+        with profiler.phase("Dashboard"):
+            self.show_dashboard()
+        
+        # Daily backups, snapshot and verification in the background
+        self.start_backup_verification()
+        
+        # Build the member/staff lookup index before the first picker needs it
+        threading.Thread(target=self.db.member_index.warm, daemon=True).start()
+        threading.Thread(target=self.db.staff_index.warm, daemon=True).start()
+        
+        # WhatsApp messages are sent from the outbox; finish a run the last session didn't
+        try:
+            transport = create_transport(self)
+        except ValueError as e:
+            # HTTP API half configured: say so and send through WhatsApp Web meanwhile
+            messagebox.showerror("WhatsApp API", f"{e}\n\nMessages will be sent through WhatsApp Web.")
+            transport = BrowserTransport(self)
+        self.outbox = OutboxDispatcher(self.db, transport)
+        if self.outbox.transport.available:
+            self.after(5000, self.outbox.resume)
+        
+        # Payment reminders at the times in REMINDER_TIMES (off unless set)
+        self.reminders = None
+        if self.outbox.transport.available and configured_times():
+            self.reminders = ReminderScheduler(self.db, self.outbox, configured_times())
+            self.after(10000, self.reminders.start)
     
     def create_main_ui(self):
         """Create the main UI structure"""
@@ -88,8 +113,14 @@ class GymManagementApp(ctk.CTk):
         self.content_frame = ctk.CTkFrame(content_wrapper, fg_color="#ffffff")
         self.content_frame.pack(side="right", fill="both", expand=True, padx=0, pady=0)
         
+        # Pages are built on first visit and kept (hidden) afterwards
+        self.pages = {}
+        self.page_versions = {}
+        self.current_page = None
+        self.current_page_name = None
+        
         # Create page frames
-        self.dashboard_frame = ctk.CTkFrame(self.content_frame, fg_color="#ffffff")
+        self.dashboard_frame = None
         self.member_frame = None
         self.staff_frame = None
         self.fee_frame = None
@@ -114,6 +145,7 @@ class GymManagementApp(ctk.CTk):
         logo_path = resource_path(os.path.join('icon', 'luwang_logo.jpeg'))
         if os.path.exists(logo_path):
             try:
+                from PIL import Image, ImageTk
                 img = Image.open(logo_path)
                 img = img.resize((70, 70), Image.Resampling.LANCZOS)
                 self.logo_image = ImageTk.PhotoImage(img)
@@ -155,7 +187,58 @@ class GymManagementApp(ctk.CTk):
             font=ctk.CTkFont(size=12),
             text_color="#64748b"
         )
-        copyright_label.pack(anchor="center", pady=10)
+        copyright_label.pack(side="left", expand=True, pady=10)
+        
+        self.backup_status_label = ctk.CTkLabel(
+            footer,
+            text="Verifying backups...",
+            font=ctk.CTkFont(size=12),
+            text_color="#64748b"
+        )
+        self.backup_status_label.pack(side="right", padx=20, pady=10)
+    
+    def start_backup_verification(self):
+        """Create today's backups and verify all snapshots on a worker thread"""
+        if not self.backup_manager:
+            self.backup_status_label.configure(text="Backups disabled")
+            return
+        
+        self._backup_status = None
+        
+        def verify_thread():
+            # Excel backup needs pandas; a missing install shouldn't stop snapshots
+            try:
+                backup_path = self.backup_manager.create_daily_backup()
+                if backup_path:
+                    print(f"Daily backup created: {backup_path}")
+            except ImportError:
+                print("Note: pandas not installed. Excel backup disabled. Install with: pip install pandas openpyxl")
+            except Exception as e:
+                print(f"Backup warning: {e}")
+            
+            try:
+                self.backup_manager.create_daily_snapshot()
+                self.backup_manager.verify_backups()
+                # Cleanup old backups (keep last 30 days)
+                self.backup_manager.cleanup_old_backups(keep_days=30)
+                self._backup_status = self.backup_manager.get_verification_summary()
+            except Exception as e:
+                print(f"Backup verification warning: {e}")
+                self._backup_status = "Backup verification failed"
+        
+        threading.Thread(target=verify_thread, daemon=True).start()
+        self.after(500, self._poll_backup_status)
+    
+    def _poll_backup_status(self):
+        """Show the verification result once the worker thread has finished"""
+        if self._backup_status is None:
+            self.after(500, self._poll_backup_status)
+            return
+        ok = self._backup_status.startswith("Latest backup verified")
+        self.backup_status_label.configure(
+            text=self._backup_status,
+            text_color="#166534" if ok else "#dc2626"
+        )
     
     def create_sidebar(self, parent):
         """Create professional sidebar navigation"""
@@ -216,14 +299,68 @@ class GymManagementApp(ctk.CTk):
             else:
                 btn.configure(fg_color="#0f172a", font=ctk.CTkFont(size=15))
     
+    def data_version(self, page):
+        """Versions of the tables a page reads (its `tables`), plus today's date (due dates depend on it)"""
+        return (self.db.table_versions.snapshot(page.tables), date.today())
+    
+    def show_page(self, index, name, factory, refresh=None):
+        """Show a cached page, building it on first visit and refreshing it only if data changed"""
+        self.set_active_button(index)
+        
+        # Hide the current page; it is up to date with the changes made while it was shown.
+        # Pages that aren't cached are destroyed instead.
+        if self.current_page is not None and self.current_page.winfo_exists():
+            if self.current_page_name in self.pages:
+                self.current_page.pack_forget()
+                self.page_versions[self.current_page_name] = self.data_version(self.current_page)
+            else:
+                self.current_page.destroy()
+        
+        page = self.pages.get(name)
+        if page is None or not page.winfo_exists():
+            page = factory()
+            self.pages[name] = page
+        else:
+            seen = self.page_versions.get(name)
+            if getattr(page, "follows_events", False):
+                # Data changes were already applied from events; only a new day needs a reload
+                stale = seen[1] != date.today()
+            else:
+                stale = seen != self.data_version(page)
+            if stale:
+                (refresh or page.refresh)()
+        self.page_versions[name] = self.data_version(page)
+        
+        page.pack(fill="both", expand=True, padx=35, pady=35)
+        self.current_page = page
+        self.current_page_name = name
+        return page
+    
     def show_dashboard(self):
         """Show dashboard with overview and alerts"""
-        self.set_active_button(0)
-        self.clear_content()
-        
-        # Dashboard content
+        self.dashboard_frame = self.show_page(
+            0, "dashboard", self.create_dashboard,
+            refresh=lambda: self.build_dashboard(self.pages["dashboard"])
+        )
+    
+    def create_dashboard(self):
+        """Create the dashboard page and keep its numbers current while it is on screen"""
         content = ctk.CTkFrame(self.content_frame, fg_color="#ffffff")
-        content.pack(fill="both", expand=True, padx=35, pady=35)
+        content.tables = ("members", "staff", "payments")  # Read by build_dashboard
+        self.build_dashboard(content)
+        subscribe_widget(self.db.events, content, MEMBER_EVENTS, self.on_dashboard_data_changed)
+        return content
+    
+    def on_dashboard_data_changed(self, events):
+        """Rebuild the visible dashboard once per burst of member and payment changes"""
+        if self.current_page_name == "dashboard":
+            self.build_dashboard(self.pages["dashboard"])
+            self.page_versions["dashboard"] = self.data_version(self.pages["dashboard"])
+    
+    def build_dashboard(self, content):
+        """Fill the dashboard frame with statistics and alerts"""
+        for widget in content.winfo_children():
+            widget.destroy()
         
         # Title
         title = ctk.CTkLabel(
@@ -238,16 +375,18 @@ class GymManagementApp(ctk.CTk):
         stats_frame = ctk.CTkFrame(content, fg_color="transparent")
         stats_frame.pack(fill="x", pady=(0, 30))
         
-        members = self.db.get_all_members()
-        staff = self.db.get_all_staff()
-        overdue = self.db.get_overdue_members()
-        due_soon = self.db.get_due_soon_members()  # Frequency-aware reminders
+        member_count = self.db.count_members("Active Only")
+        staff_count = self.db.count_staff()
+        # Counts only; the alert cards read their rows a page at a time (see create_alert_card)
+        alert_counts = self.db.alerts.counts()
+        overdue = alert_counts['overdue']
+        due_soon = alert_counts['due_soon']
         
         stats = [
-            ("Total Members", len(members), '#3b82f6', None),
-            ("Total Staff", len(staff), '#10b981', None),
-            ("Overdue Payments", len(overdue), '#ef4444', None),
-            ("Due Soon", len(due_soon), '#f59e0b', None),
+            ("Total Members", member_count, '#3b82f6', None),
+            ("Total Staff", staff_count, '#10b981', None),
+            ("Overdue Payments", overdue, '#ef4444', None),
+            ("Due Soon", due_soon, '#f59e0b', None),
         ]
         
         for label, value, color, command in stats:
@@ -282,7 +421,8 @@ class GymManagementApp(ctk.CTk):
         if overdue:
             overdue_card = self.create_alert_card(
                 content,
-                f"OVERDUE PAYMENTS ({len(overdue)})",
+                f"OVERDUE PAYMENTS ({overdue})",
+                "overdue",
                 overdue,
                 '#fef2f2',
                 '#dc2626'
@@ -293,7 +433,8 @@ class GymManagementApp(ctk.CTk):
         if due_soon:
             due_soon_card = self.create_alert_card(
                 content,
-                f"PAYMENTS DUE SOON ({len(due_soon)})",
+                f"PAYMENTS DUE SOON ({due_soon})",
+                "due_soon",
                 due_soon,
                 '#fffbeb',
                 '#d97706'
@@ -318,7 +459,7 @@ class GymManagementApp(ctk.CTk):
             )
             success_label.pack(pady=20)
         
-        self.dashboard_frame = content
+        return content
     
     def create_stat_card(self, parent, label, value, color, command=None):
         """Create a professional statistics card"""
@@ -367,8 +508,12 @@ class GymManagementApp(ctk.CTk):
         
         return card
     
-    def create_alert_card(self, parent, title, items, bg_color, title_color):
-        """Create an alert card with scrollable content"""
+    def create_alert_card(self, parent, title, kind, total, bg_color, title_color):
+        """
+        Create an alert card listing the most urgent "overdue" or "due_soon" rows first.
+        Only the first ALERT_CARD_ROWS of the `total` rows are read (a LIMITed query
+        unless the alert snapshot is already built); "Show more" reads the next batch.
+        """
         card = ctk.CTkFrame(
             parent,
             fg_color=bg_color,
@@ -388,8 +533,8 @@ class GymManagementApp(ctk.CTk):
         title_label.grid(row=0, column=0, sticky="w", padx=15, pady=(15, 10))
         
         # Scrollable frame for items
-        # Calculate height based on number of items (max 300px, min 150px)
-        max_height = min(300, max(150, len(items) * 30 + 20))
+        # Calculate height based on the first batch of rows (max 300px, min 150px)
+        max_height = min(300, max(150, min(total, ALERT_CARD_ROWS) * 30 + 20))
         scrollable_frame = ctk.CTkScrollableFrame(
             card,
             fg_color="transparent",
@@ -397,98 +542,91 @@ class GymManagementApp(ctk.CTk):
         )
         scrollable_frame.grid(row=1, column=0, sticky="nsew", padx=15, pady=(0, 15))
         
-        for item in items:
-            if isinstance(item, dict):
-                if 'next_payment_date' in item:
-                    days_overdue = (date.today() - datetime.strptime(item['next_payment_date'], '%Y-%m-%d').date()).days
-                    text = f"{item['name']} - ₹{item['fee_amount']:.2f} ({days_overdue} days overdue)"
-                else:
-                    due_date = datetime.strptime(item['next_payment_date'], '%Y-%m-%d').date()
-                    days_until = (due_date - date.today()).days
-                    text = f"{item['name']} - ₹{item['fee_amount']:.2f} (Due in {days_until} days)"
-                
+        more_btn = ctk.CTkButton(
+            scrollable_frame,
+            text="",
+            height=26,
+            fg_color="transparent",
+            hover_color="#e2e8f0",
+            text_color=title_color,
+            font=ctk.CTkFont(size=12, weight="bold")
+        )
+        shown = 0
+        
+        def show_more():
+            nonlocal shown
+            more_btn.pack_forget()
+            items = self.db.alerts.page(kind, shown, ALERT_CARD_ROWS)  # AlertRows, sorted and worded
+            for item in items:
                 item_label = ctk.CTkLabel(
                     scrollable_frame,
-                    text=text,
+                    text=item.summary,
                     font=ctk.CTkFont(size=13),
                     text_color="#1e293b",
                     anchor="w"
                 )
                 item_label.pack(fill="x", padx=(10, 0), pady=2)
+            shown += len(items)
+            
+            remaining = max(0, total - shown) if len(items) == ALERT_CARD_ROWS else 0
+            if remaining:
+                more_btn.configure(text=f"Show {min(remaining, ALERT_CARD_ROWS)} more ({remaining} not shown)")
+                more_btn.pack(anchor="w", padx=(4, 0), pady=(6, 2))
+        
+        more_btn.configure(command=show_more)
+        show_more()
         
         return card
     
-    def clear_content(self):
-        """Clear the content area"""
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
-    
     def show_payment_alerts(self):
         """Show payment alerts page"""
-        self.set_active_button(1)
-        self.clear_content()
-        payment_alerts = PaymentAlerts(self.content_frame, self.db)
-        payment_alerts.pack(fill="both", expand=True, padx=35, pady=35)
-        self.payment_alerts_frame = payment_alerts
+        from payment_alerts import PaymentAlerts
+        self.payment_alerts_frame = self.show_page(1, "payment_alerts", lambda: PaymentAlerts(self.content_frame, self.db))
     
     def show_members(self):
         """Show member management page"""
-        self.set_active_button(2)
-        self.clear_content()
-        member_mgmt = MemberManagement(self.content_frame, self.db)
-        member_mgmt.pack(fill="both", expand=True, padx=35, pady=35)
-        self.member_frame = member_mgmt
+        from member_management import MemberManagement
+        self.member_frame = self.show_page(2, "members", lambda: MemberManagement(self.content_frame, self.db))
     
     def show_staff(self):
         """Show staff management page"""
-        self.set_active_button(3)
-        self.clear_content()
-        staff_mgmt = StaffManagement(self.content_frame, self.db)
-        staff_mgmt.pack(fill="both", expand=True, padx=35, pady=35)
-        self.staff_frame = staff_mgmt
+        from staff_management import StaffManagement
+        self.staff_frame = self.show_page(3, "staff", lambda: StaffManagement(self.content_frame, self.db))
     
     def show_trainers(self):
         """Show trainers page"""
-        self.set_active_button(4)
-        self.clear_content()
-        trainers_view = Trainers(self.content_frame, self.db)
-        trainers_view.pack(fill="both", expand=True, padx=35, pady=35)
-        self.trainers_frame = trainers_view
+        from trainers import Trainers
+        self.trainers_frame = self.show_page(4, "trainers", lambda: Trainers(self.content_frame, self.db))
     
     def show_fees(self):
         """Show fee management page"""
-        self.set_active_button(5)
-        self.clear_content()
-        fee_mgmt = FeeManagement(self.content_frame, self.db)
-        fee_mgmt.pack(fill="both", expand=True, padx=35, pady=35)
-        self.fee_frame = fee_mgmt
+        from fee_management import FeeManagement
+        self.fee_frame = self.show_page(5, "fees", lambda: FeeManagement(self.content_frame, self.db))
     
     def show_whatsapp(self):
         """Show WhatsApp management page"""
-        self.set_active_button(6)
-        self.clear_content()
-        whatsapp_mgmt = WhatsAppManagement(self.content_frame, self.db)
-        whatsapp_mgmt.pack(fill="both", expand=True, padx=35, pady=35)
-        self.whatsapp_frame = whatsapp_mgmt
+        from whatsapp_management import WhatsAppManagement
+        self.whatsapp_frame = self.show_page(6, "whatsapp", lambda: WhatsAppManagement(self.content_frame, self.db, self.outbox))
     
     def show_locker_management(self):
         """Show locker management page"""
-        self.set_active_button(7)
-        self.clear_content()
-        locker_mgmt = LockerManagement(self.content_frame, self.db)
-        locker_mgmt.pack(fill="both", expand=True, padx=35, pady=35)
-        self.locker_frame = locker_mgmt
+        from locker_management import LockerManagement
+        self.locker_frame = self.show_page(7, "lockers", lambda: LockerManagement(self.content_frame, self.db))
     
     def show_owner_dashboard(self):
-        """Show financial dashboard page (password protected)"""
-        self.set_active_button(8)
-        self.clear_content()
-        owner_dashboard = OwnerDashboard(self.content_frame, self.db)
-        owner_dashboard.pack(fill="both", expand=True, padx=35, pady=35)
-        self.owner_frame = owner_dashboard
+        """Show financial dashboard page (password protected, so rebuilt on every visit)"""
+        from owner_dashboard import OwnerDashboard
+        self.owner_frame = self.show_page(8, "owner", lambda: OwnerDashboard(self.content_frame, self.db))
+        # Not cached, so the password is asked again next time
+        self.pages.pop("owner", None)
 
 def main():
-    app = GymManagementApp()
+    with profiler.phase("App window (includes the above)"):
+        app = GymManagementApp()
+    if profiler.enabled:
+        # Render the first frame so the total covers time to first paint
+        app.update()
+        profiler.print_report()
     app.mainloop()
 
 if __name__ == "__main__":
@@ -0,0 +1,231 @@
+"""
+Member Index Module
+In-memory lookup index for member and staff pickers: by ID, name prefix,
+trigrams (substring search over name, email and phone) and E.164 phone number.
+Built on first use and kept current by the database's data change events.
+"""
+import bisect
+import re
+import threading
+from typing import Callable, Dict, List, Optional
+
+from events import MemberAdded, MemberRemoved, MemberUpdated, PaymentRecorded, StaffChanged
+from phone_numbers import to_e164
+
+
+def _trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class RecordIndex:
+    def __init__(self, load_all: Callable[[], List[Dict]], load_one: Callable[[int], Optional[Dict]]):
+        """
+        Args:
+            load_all: returns every record (used for the initial build)
+            load_one: load_one(record_id) returns the current record or None if it's gone
+        """
+        self.load_all = load_all
+        self.load_one = load_one
+        self._lock = threading.RLock()  # Searches may run on worker threads
+        self._built = False
+        self._records: Dict[int, Dict] = {}
+        self._names: List[tuple] = []  # sorted (name, id) for prefix search
+        self._words: List[tuple] = []  # sorted (word of a name, id)
+        self._trigrams: Dict[str, set] = {}
+        self._phones: Dict[str, set] = {}
+        self._indexed: Dict[int, tuple] = {}  # id -> (name, words, trigrams, phone, text) it was indexed under
+
+    # Maintenance
+
+    def _ensure_built(self):
+        if not self._built:
+            with self._lock:
+                if not self._built:
+                    for record in self.load_all():
+                        self._add(record, keep_sorted=False)
+                    # One sort instead of an insort per record
+                    self._names.sort()
+                    self._words.sort()
+                    self._built = True
+
+    def warm(self):
+        """Build the index now (e.g. on a background thread at startup)"""
+        self._ensure_built()
+
+    def invalidate(self):
+        """Drop everything; the index is rebuilt on next use"""
+        with self._lock:
+            self._built = False
+            self._records.clear()
+            self._names.clear()
+            self._words.clear()
+            self._trigrams.clear()
+            self._phones.clear()
+            self._indexed.clear()
+
+    def refresh(self, record_ids):
+        """Re-read the given records from the database (removes the ones that are gone)"""
+        with self._lock:
+            if not self._built:
+                return  # Read fresh when first used
+            for record_id in record_ids:
+                self._remove(record_id)
+                record = self.load_one(record_id)
+                if record is not None:
+                    self._add(record)
+
+    def _add(self, record: Dict, keep_sorted: bool = True):
+        record_id = record['id']
+        name = (record.get('name') or '').lower().strip()
+        words = set(name.split())
+        text = "\n".join([name, (record.get('email') or '').lower(), re.sub(r"\D", "", str(record.get('phone') or '')),
+                          str(record_id)])
+        grams = _trigrams(text)
+        # Members carry it from the database; staff numbers are normalized here
+        phone = record.get('phone_norm') or to_e164(record.get('phone'))
+
+        self._records[record_id] = record
+        add = bisect.insort if keep_sorted else list.append
+        add(self._names, (name, record_id))
+        for word in words:
+            add(self._words, (word, record_id))
+        trigrams = self._trigrams
+        for gram in grams:
+            ids = trigrams.get(gram)
+            if ids is None:
+                trigrams[gram] = {record_id}
+            else:
+                ids.add(record_id)
+        if phone:
+            self._phones.setdefault(phone, set()).add(record_id)
+        self._indexed[record_id] = (name, words, grams, phone, text)
+
+    def _remove(self, record_id: int):
+        indexed = self._indexed.pop(record_id, None)
+        if indexed is None:
+            return
+        name, words, grams, phone, _ = indexed
+        del self._records[record_id]
+        self._discard(self._names, (name, record_id))
+        for word in words:
+            self._discard(self._words, (word, record_id))
+        for gram in grams:
+            ids = self._trigrams.get(gram)
+            if ids is not None:
+                ids.discard(record_id)
+                if not ids:
+                    del self._trigrams[gram]
+        if phone:
+            ids = self._phones.get(phone)
+            if ids is not None:
+                ids.discard(record_id)
+                if not ids:
+                    del self._phones[phone]
+
+    @staticmethod
+    def _discard(entries: List[tuple], entry: tuple):
+        i = bisect.bisect_left(entries, entry)
+        if i < len(entries) and entries[i] == entry:
+            del entries[i]
+
+    # Queries
+
+    def get(self, record_id: int) -> Optional[Dict]:
+        """Record by ID"""
+        self._ensure_built()
+        return self._records.get(record_id)
+
+    def all(self, active_only: bool = False) -> List[Dict]:
+        """Every record, ordered by ID"""
+        self._ensure_built()
+        with self._lock:
+            records = [self._records[i] for i in sorted(self._records)]
+        if active_only:
+            records = [r for r in records if r.get('status') == 'active']
+        return records
+
+    def search(self, query: str, limit: Optional[int] = 20, active_only: bool = False) -> List[Dict]:
+        """
+        Best matches for a typeahead query, in this order: exact ID, names starting
+        with the query, names with a word starting with it, same phone number, then
+        any record containing it in its name, email, phone or ID (3+ characters).
+        An empty query returns the first records by ID.
+        """
+        self._ensure_built()
+        query = query.lower().strip()
+        if not query:
+            return self.all(active_only)[:limit]
+
+        results: List[Dict] = []
+        seen = set()
+
+        def take(record_id) -> bool:
+            """Add a match; True once the limit is reached"""
+            if record_id in seen:
+                return False
+            record = self._records.get(record_id)
+            if record is None or (active_only and record.get('status') != 'active'):
+                return False
+            seen.add(record_id)
+            results.append(record)
+            return limit is not None and len(results) >= limit
+
+        with self._lock:
+            if query.isdigit() and take(int(query)):
+                return results
+
+            # Prefix matches: whole name first, then any word of it (alphabetical)
+            for entries in (self._names, self._words):
+                i = bisect.bisect_left(entries, (query,))
+                while i < len(entries) and entries[i][0].startswith(query):
+                    if take(entries[i][1]):
+                        return results
+                    i += 1
+
+            phone = to_e164(query)
+            if phone:
+                for record_id in sorted(self._phones.get(phone, ())):
+                    if take(record_id):
+                        return results
+
+            # Substring matches via trigrams, verified against the indexed text
+            if len(query) >= 3:
+                grams = _trigrams(query)
+                candidates = None
+                for gram in sorted(grams, key=lambda g: len(self._trigrams.get(g, ()))):
+                    ids = self._trigrams.get(gram)
+                    if not ids:
+                        candidates = set()
+                        break
+                    candidates = set(ids) if candidates is None else candidates & ids
+                    if len(candidates) <= 1:
+                        break
+                for record_id in sorted(candidates or ()):
+                    if query in self._indexed[record_id][4] and take(record_id):
+                        return results
+        return results
+
+
+class MemberIndex(RecordIndex):
+    """Index over all members, following member events"""
+
+    def __init__(self, db):
+        super().__init__(lambda: db.get_all_members(active_only=False), db.get_member)
+        db.events.subscribe((MemberAdded, MemberUpdated, MemberRemoved, PaymentRecorded), self.on_event)
+
+    def on_event(self, event):
+        if isinstance(event, MemberUpdated):
+            self.refresh(event.ids)
+        else:
+            self.refresh((event.member_id,))
+
+
+class StaffIndex(RecordIndex):
+    """Index over all staff, following staff events"""
+
+    def __init__(self, db):
+        super().__init__(lambda: db.get_all_staff(active_only=False), db.get_staff)
+        db.events.subscribe(StaffChanged, self.on_event)
+
+    def on_event(self, event):
+        self.refresh((event.staff_id,))
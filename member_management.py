@@ -7,18 +7,26 @@ from tkinter import ttk, messagebox, Entry, simpledialog
 from datetime import date, datetime
 import sqlite3
 import os
+from events import MEMBER_EVENTS, StaffChanged, subscribe_widget
+from phone_numbers import to_e164
+from virtual_table import VirtualTreeview
+from search_controller import SearchController
 
 class MemberManagement(ctk.CTkFrame):
     # Password for protected operations
     PROTECTED_PASSWORD = "1234"
     _editing_item = None  # Track currently editing item to prevent multiple password prompts
+    follows_events = True  # Kept up to date by data change events while hidden
+    tables = ("members", "payments", "staff")  # Tables it shows
     
     def __init__(self, parent, db):
         super().__init__(parent, fg_color="#ffffff")
         self.db = db
         self.selected_members = set()  # Track selected member IDs
+        self.trainer_names = {}  # Trainer ID -> name for the Trainer column
         self.setup_ui()
         self.refresh_member_list()
+        self.data_events = subscribe_widget(self.db.events, self, MEMBER_EVENTS + (StaffChanged,), self.on_data_changed)
     
     def verify_password(self) -> bool:
         """Verify password for protected operations"""
@@ -233,7 +241,11 @@ class MemberManagement(ctk.CTkFrame):
             placeholder_text="Search by name..."
         )
         self.search_entry.pack(side="left", fill="x", expand=True, padx=(0, 10))
-        self.search_entry.bind("<KeyRelease>", self.on_search)
+        # Searches run once typing pauses, on a worker thread
+        self.search = SearchController(self, self._search_members, self._show_search_results,
+                                       get_query=self._search_query)
+        self.search_entry.bind("<KeyRelease>", self.search.schedule)
+        self.search_entry.bind("<Return>", self.search.search_now)
         
         # Status filter
         filter_label = ctk.CTkLabel(
@@ -286,7 +298,16 @@ class MemberManagement(ctk.CTkFrame):
         table_frame.grid(row=3, column=0, sticky="nsew", padx=20, pady=(0, 10))
         
         columns = ('Select', 'ID', 'Name', 'Email', 'Phone', 'Join Date', 'Type', 'Frequency', 'Trainer', 'Fee', 'Next Payment', 'Status')
-        self.tree = ttk.Treeview(table_frame, columns=columns, show='headings', height=15)
+        # Only the visible rows exist in the Treeview; pages are fetched as the list scrolls
+        self.tree = VirtualTreeview(
+            table_frame,
+            count_rows=self._count_members,
+            fetch_rows=self._fetch_members,
+            row_key=lambda member: member['id'],
+            row_values=self._member_row_values,
+            untracked_columns=(0,),  # Checkbox clicks aren't edits
+            columns=columns, show='headings', height=15
+        )
         
         # Configure style for Excel-like appearance
         style = ttk.Style()
@@ -361,11 +382,12 @@ class MemberManagement(ctk.CTkFrame):
         
         # Make table editable (but not on Select column)
         self.tree.bind("<Double-1>", self.on_double_click)
+        self.tree.bind("<<VirtualTreeviewScroll>>", self.cancel_inline_edit)
         self.editing_item = None
         
-        # Vertical scrollbar
+        # Vertical scrollbar (driven by the virtual row position)
         v_scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=v_scrollbar.set)
+        self.tree.attach_scrollbar(v_scrollbar)
         
         # Horizontal scrollbar
         h_scrollbar = ttk.Scrollbar(table_frame, orient="horizontal", command=self.tree.xview)
@@ -528,6 +550,21 @@ class MemberManagement(ctk.CTkFrame):
             messagebox.showerror("Error", "Please enter a valid join date in YYYY-MM-DD format!")
             return
         
+        # Same number already registered (however it was written)?
+        existing = self.db.phone_in_use(phone) if phone else None
+        if existing and not messagebox.askyesno(
+                "Duplicate Phone",
+                f"Member '{existing['name']}' (ID: {existing['id']}) already has this phone number.\n\n"
+                "Register this member anyway?"):
+            return
+        
+        # A number WhatsApp reminders can't go to (digits missing, no country code)?
+        if phone and not to_e164(phone) and not messagebox.askyesno(
+                "Check Phone Number",
+                f"'{phone}' doesn't look like a full phone number (10 digits, or + and the country code), "
+                "so payment reminders can't be sent to it.\n\nSave it anyway?"):
+            return
+        
         try:
             # Get trainer_id if Personal Training
             trainer_id = None
@@ -577,89 +614,105 @@ class MemberManagement(ctk.CTkFrame):
         self.trainer_label.pack_forget()
         self.trainer_combo.pack_forget()
     
-    def refresh_member_list(self, search_term=""):
-        """Refresh the member list"""
-        # Clear existing items and preserve selected members
+    def refresh_member_list(self, search_term="", prefetched=None):
+        """Refresh the member list (prefetched: (count, first rows) from a background search)"""
+        # A full reload covers any pending change events
+        if hasattr(self, 'data_events'):
+            self.data_events.discard()
+        
+        # Filter used by the virtual table when it fetches rows
         # (selected_members set persists across refreshes)
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # Get filter selection
-        filter_value = self.status_filter.get() if hasattr(self, 'status_filter') else "Active Only"
-        
-        # Get members based on filter
-        if filter_value == "Active Only":
-            members = self.db.get_all_members(active_only=True)
-        elif filter_value == "Inactive Only":
-            all_members = self.db.get_all_members(active_only=False)
-            members = [m for m in all_members if m.get('status', 'active').lower() == 'inactive']
-        else:  # All Members
-            members = self.db.get_all_members(active_only=False)
-        
-        # Filter by search term if provided
-        if search_term:
-            search_term_lower = search_term.lower()
-            # Check if search term is numeric (could be an ID)
-            is_numeric = search_term.strip().isdigit()
-            filtered_members = []
-            for m in members:
-                # Search by name (case-insensitive)
-                if search_term_lower in m['name'].lower():
-                    filtered_members.append(m)
-                # Search by ID if search term is numeric
-                elif is_numeric and str(m['id']) == search_term.strip():
-                    filtered_members.append(m)
-            members = filtered_members
+        self.list_filter = self.status_filter.get() if hasattr(self, 'status_filter') else "Active Only"
+        self.list_search = search_term
         
         # Get all trainers for name lookup
         trainers = self.db.get_trainers()
-        trainer_dict = {t['id']: t['name'] for t in trainers}
+        self.trainer_names = {t['id']: t['name'] for t in trainers}
         
-        for idx, member in enumerate(members):
-            next_payment = member.get('next_payment_date', 'N/A')
-            status = member.get('status', 'active').title()
-            
-            # Get trainer name
-            trainer_id = member.get('trainer_id')
-            trainer_name = trainer_dict.get(trainer_id, 'N/A') if trainer_id else 'N/A'
-            # Only show trainer if membership type is Personal Training
-            if member.get('membership_type') != 'Personal Training':
-                trainer_name = 'N/A'
-            
-            # Alternate row colors for Excel-like appearance
-            tag = "evenrow" if idx % 2 == 0 else "oddrow"
-            
-            join_date = member.get('join_date', 'N/A')
-            
-            # Check if member is selected
-            is_selected = member['id'] in self.selected_members
-            select_text = "☑" if is_selected else "☐"
-            
-            self.tree.insert('', 'end', values=(
-                select_text,  # Select column (index 0)
-                member['id'],  # ID column (index 1)
-                member['name'],  # Name column (index 2)
-                member.get('email', ''),  # Email column (index 3)
-                member.get('phone', ''),  # Phone column (index 4)
-                join_date,  # Join Date column (index 5)
-                member['membership_type'],  # Type column (index 6)
-                member.get('payment_frequency', 'Monthly'),  # Frequency column (index 7)
-                trainer_name,  # Trainer column (index 8)
-                f"₹{member['fee_amount']:.2f}",  # Fee column (index 9)
-                next_payment,  # Next Payment column (index 10)
-                status  # Status column (index 11)
-            ), tags=(tag, str(member['id'])))
+        # Unsaved table edits are discarded, as before
+        self.tree.clear_edits()
+        self.tree.reload(keep_position=False, prefetched=prefetched)
+    
+    def _count_members(self):
+        """Row count for the virtual table"""
+        return self.db.count_members(self.list_filter, self.list_search)
+    
+    def _fetch_members(self, offset, limit):
+        """One page of rows for the virtual table"""
+        return self.db.get_members_page(self.list_filter, self.list_search, offset, limit)
+    
+    def _member_row_values(self, member):
+        """Table values for one member row"""
+        next_payment = member.get('next_payment_date', 'N/A')
+        status = member.get('status', 'active').title()
+        
+        # Get trainer name
+        trainer_id = member.get('trainer_id')
+        trainer_name = self.trainer_names.get(trainer_id, 'N/A') if trainer_id else 'N/A'
+        # Only show trainer if membership type is Personal Training
+        if member.get('membership_type') != 'Personal Training':
+            trainer_name = 'N/A'
+        
+        join_date = member.get('join_date', 'N/A')
+        
+        # Check if member is selected
+        is_selected = member['id'] in self.selected_members
+        select_text = "☑" if is_selected else "☐"
+        
+        return (
+            select_text,  # Select column (index 0)
+            member['id'],  # ID column (index 1)
+            member['name'],  # Name column (index 2)
+            member.get('email', ''),  # Email column (index 3)
+            member.get('phone', ''),  # Phone column (index 4)
+            join_date,  # Join Date column (index 5)
+            member['membership_type'],  # Type column (index 6)
+            member.get('payment_frequency', 'Monthly'),  # Frequency column (index 7)
+            trainer_name,  # Trainer column (index 8)
+            f"₹{member['fee_amount']:.2f}",  # Fee column (index 9)
+            next_payment,  # Next Payment column (index 10)
+            status  # Status column (index 11)
+        )
+    
+    def on_data_changed(self, events):
+        """Re-fetch the visible window, keeping scroll position, selection and unsaved edits"""
+        if any(isinstance(e, StaffChanged) for e in events):
+            self.trainer_names = {t['id']: t['name'] for t in self.db.get_trainers()}
+        self.tree.reload()
     
     def on_search(self, event=None):
         """Handle search input"""
         search_term = self.search_entry.get()
         self.refresh_member_list(search_term)
     
+    def _search_query(self):
+        """Current search input and filter, read on the UI thread"""
+        return self.status_filter.get(), self.search_entry.get(), self.tree.first_page_size()
+    
+    def _search_members(self, query):
+        """Background search: count and first page of matching members"""
+        status_filter, search_term, page_size = query
+        total = self.db.count_members(status_filter, search_term)
+        rows = self.db.get_members_page(status_filter, search_term, 0, page_size)
+        return query, total, rows
+    
+    def _show_search_results(self, result):
+        """Show a finished background search (UI thread)"""
+        (status_filter, search_term, _), total, rows = result
+        if status_filter != self.status_filter.get():
+            # The filter changed meanwhile and already reloaded the list
+            return
+        self.refresh_member_list(search_term, prefetched=(total, rows))
+    
     def on_filter_change(self, value=None):
         """Handle status filter change"""
         search_term = self.search_entry.get() if hasattr(self, 'search_entry') else ""
         self.refresh_member_list(search_term)
     
+    def refresh(self):
+        """Reload the list after data changed elsewhere, keeping search and filter"""
+        self.on_filter_change()
+    
     def on_double_click(self, event):
         """Handle double-click to edit cell"""
         region = self.tree.identify_region(event.x, event.y)
@@ -868,6 +921,12 @@ class MemberManagement(ctk.CTkFrame):
                 edit_entry.bind("<FocusOut>", save_edit)
                 edit_entry.place(x=bbox[0], y=bbox[1], width=bbox[2], height=bbox[3])
     
+    def cancel_inline_edit(self, event=None):
+        """Close any open cell editor (rows are about to scroll under it)"""
+        for widget in self.tree.place_slaves():
+            widget.destroy()
+        self._editing_item = None
+    
     def _recalculate_payment_date_for_item(self, item):
         """Recalculate next payment date for a table item based on current values"""
         values = list(self.tree.item(item, 'values'))
@@ -899,8 +958,8 @@ class MemberManagement(ctk.CTkFrame):
             return
         
         updated_count = 0
-        for item in self.tree.get_children():
-            values = self.tree.item(item, 'values')
+        # Only rows edited in the table, including rows scrolled out of view
+        for values in self.tree.edited_rows().values():
             if len(values) >= 12:  # 12 columns: Select, ID, Name, Email, Phone, Join Date, Type, Frequency, Trainer, Fee, Next Payment, Status
                 try:
                     member_id = int(values[1])  # ID is second column (after Select)
@@ -1050,52 +1109,14 @@ Status: {member.get('status', 'active').title()}"""
                 self.tree.item(item, values=values)
     
     def select_all_members(self):
-        """Select all visible members"""
-        for item in self.tree.get_children():
-            values = list(self.tree.item(item, 'values'))
-            if len(values) < 2:
-                continue
-            # Check if first value is Select checkbox (☐ or ☑)
-            if values[0] in ("☐", "☑"):
-                # Select column is present, ID is at index 1
-                try:
-                    member_id = int(values[1])
-                except (ValueError, IndexError):
-                    continue
-            else:
-                # Select column is missing, ID is at index 0
-                try:
-                    member_id = int(values[0])
-                    values.insert(0, "☑")  # Add Select column
-                except (ValueError, IndexError):
-                    continue
-            self.selected_members.add(member_id)
-            values[0] = "☑"
-            self.tree.item(item, values=values)
+        """Select all members in the list (including rows scrolled out of view)"""
+        self.selected_members.update(self.db.get_member_ids(self.list_filter, self.list_search))
+        self.tree.redraw()
     
     def deselect_all_members(self):
-        """Deselect all visible members"""
-        for item in self.tree.get_children():
-            values = list(self.tree.item(item, 'values'))
-            if len(values) < 2:
-                continue
-            # Check if first value is Select checkbox (☐ or ☑)
-            if values[0] in ("☐", "☑"):
-                # Select column is present, ID is at index 1
-                try:
-                    member_id = int(values[1])
-                except (ValueError, IndexError):
-                    continue
-            else:
-                # Select column is missing, ID is at index 0
-                try:
-                    member_id = int(values[0])
-                    values.insert(0, "☐")  # Add Select column
-                except (ValueError, IndexError):
-                    continue
-            self.selected_members.discard(member_id)
-            values[0] = "☐"
-            self.tree.item(item, values=values)
+        """Deselect all members in the list"""
+        self.selected_members.difference_update(self.db.get_member_ids(self.list_filter, self.list_search))
+        self.tree.redraw()
     
     def toggle_member_status(self):
         """Toggle member active/inactive status for selected members"""
@@ -0,0 +1,107 @@
+"""
+Message Templates Module
+WhatsApp message templates with placeholders such as {name}, {amount},
+{due_date} and {locker_number}. A template is parsed once (compile_template
+caches it by text) and then rendered for a whole list of members or due
+payments, producing outbox messages in one pass.
+"""
+from functools import lru_cache
+from string import Formatter
+from typing import Dict, Iterable, List
+
+# Placeholder -> what it is filled with
+PLACEHOLDERS = {
+    "name": "Member name",
+    "member_id": "Member ID",
+    "amount": "Fee amount, e.g. 500.00",
+    "due_date": "Next payment date",
+    "locker_number": "Locker number (locker reminders)",
+}
+
+# Built-in templates, added to the database when it is created
+DEFAULT_TEMPLATES = {
+    "membership_reminder": (
+        "Hello {name}! This is a reminder from Luwang Fitness. "
+        "Your membership fee of ₹{amount} is due on {due_date}. "
+        "Please make the payment to avoid any inconvenience. Thank you!"
+    ),
+    "locker_reminder": (
+        "Hello {name}! This is a reminder from Luwang Fitness. "
+        "Your locker #{locker_number} fee of ₹{amount} is due on {due_date}. "
+        "Please make the payment to avoid any inconvenience. Thank you!"
+    ),
+}
+
+
+def template_fields(record: Dict) -> Dict[str, str]:
+    """
+    Placeholder values for a member record or a Database.get_due_on row
+    (missing values become empty text)
+    """
+    amount = record.get("fee_amount")
+    locker = record.get("locker_number") or record.get("locker_id")
+    return {
+        "name": record.get("name") or record.get("member_name") or "Member",
+        "member_id": str(record.get("member_id") or record.get("id") or ""),
+        "amount": f"{amount:.2f}" if amount is not None else "",
+        "due_date": str(record.get("next_payment_date") or ""),
+        "locker_number": str(locker) if locker else "",
+    }
+
+
+class MessageTemplate:
+    def __init__(self, text: str):
+        """Parse text; raises ValueError for unknown placeholders, formatting or stray braces"""
+        self.text = text
+        self._literals: List[str] = []
+        self._fields: List[str] = []  # Placeholder after each literal
+        try:
+            parsed = list(Formatter().parse(text))
+        except ValueError as e:
+            raise ValueError(f"Invalid template: {e} (use {{{{ and }}}} for literal braces)")
+        for literal, field, spec, conversion in parsed:
+            self._literals.append(literal)
+            if field is None:
+                continue
+            if conversion:
+                raise ValueError(f"Conversions like !{conversion} are not supported in {{{field}}}")
+            if field not in PLACEHOLDERS:
+                raise ValueError(f"Unknown placeholder {{{field}}}. Available: "
+                                 + ", ".join(f"{{{name}}}" for name in PLACEHOLDERS))
+            if spec:
+                # Values are filled in as ready-made text (e.g. amount is already 500.00)
+                raise ValueError(f"Formatting like {{{field}:{spec}}} is not supported; use {{{field}}}")
+            self._fields.append(field)
+        self.placeholders = set(self._fields)
+
+    def render(self, fields: Dict[str, str]) -> str:
+        """Text with the placeholders filled in from template_fields()"""
+        parts = []
+        for literal, field in zip(self._literals, self._fields):
+            parts.append(literal)
+            parts.append(fields[field])
+        parts.extend(self._literals[len(self._fields):])
+        return "".join(parts)
+
+    def messages(self, records: Iterable[Dict], kind: str, due_date: bool = False) -> List[Dict]:
+        """
+        Outbox messages (see Database.enqueue_messages) for members or due payments.
+        due_date=True records each record's due date (and locker, for locker fees) so the
+        reminder is only sent once.
+        """
+        messages = []
+        for record in records:
+            message = {"member_id": record.get("member_id") or record["id"],
+                       "phone": record.get("phone_norm") or record.get("phone") or record.get("member_phone"),
+                       "message": self.render(template_fields(record)), "kind": kind}
+            if due_date:
+                message["due_date"] = record["next_payment_date"]
+                message["subject_id"] = record.get("locker_id") or 0
+            messages.append(message)
+        return messages
+
+
+@lru_cache(maxsize=64)
+def compile_template(text: str) -> MessageTemplate:
+    """Parsed template for text (parsed once, then reused)"""
+    return MessageTemplate(text)
@@ -0,0 +1,126 @@
+"""
+Outbox Module
+Delivers WhatsApp messages queued in the outbox table on background threads
+(as many as the transport can use at once). Failed sends are retried with
+exponential backoff. Messages still waiting (or cut off mid-send) when the
+app closed are picked up again on the next start.
+"""
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from rate_limiter import AdaptiveRateLimiter
+
+
+class OutboxDispatcher:
+    def __init__(self, db, transport, max_attempts: int = 5, retry_delay: float = 30.0,
+                 max_retry_delay: float = 1800.0, limiter: AdaptiveRateLimiter = None):
+        """
+        Args:
+            transport: a whatsapp_transport.Transport
+            limiter: paces the sends (default: the transport's own pacing limits)
+            max_attempts: attempts per message before it is marked failed
+            retry_delay: wait before the first retry, doubled for each further one
+            max_retry_delay: longest wait between retries
+        """
+        self.db = db
+        self.transport = transport
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.limiter = limiter or AdaptiveRateLimiter.for_transport(transport)
+        self._wake = threading.Event()  # Set when new messages are queued
+        self._lock = threading.Lock()
+        self._claim_lock = threading.Lock()  # One worker claims a message at a time
+        self._workers = 0
+        self._stopped = False
+        # Marks the messages this dispatcher is sending (the app and send_reminders.py share the outbox)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    @property
+    def running(self) -> bool:
+        return self._workers > 0
+
+    def start(self):
+        """Deliver queued messages (call again after queueing more; it's a no-op while running)"""
+        with self._lock:
+            self._stopped = False
+            self._wake.set()
+            while self._workers < max(1, self.transport.concurrency):
+                self._workers += 1
+                threading.Thread(target=self._run, name=f"outbox-{self._workers}", daemon=True).start()
+
+    def resume(self) -> int:
+        """
+        Queue again messages cut off by the last shutdown (not ones another running
+        process is sending) and deliver everything pending
+        """
+        self.db.requeue_interrupted_messages(self.owner)
+        pending = self.db.get_outbox_counts()['queued']
+        if pending:
+            self.start()
+        return pending
+
+    def stop(self):
+        """Stop after the messages being sent (the rest stays queued)"""
+        self._stopped = True
+        self._wake.set()
+
+    def retry_delay_for(self, attempts: int) -> float:
+        """Seconds to wait after the given number of failed attempts"""
+        return min(self.max_retry_delay, self.retry_delay * 2 ** (attempts - 1))
+
+    def _run(self):
+        exited = False
+        try:
+            while not self._stopped:
+                with self._claim_lock:
+                    self._wake.clear()
+                    message = self.db.claim_next_message(self.owner)
+                if message is not None:
+                    self._deliver(message)
+                    continue
+
+                next_due = self.db.next_message_due()
+                if next_due is None:
+                    with self._lock:
+                        if not self._wake.is_set():  # Nothing was queued meanwhile
+                            self._workers -= 1
+                            exited = True
+                            return
+                    continue
+                # Sleep until the next retry is due (or new messages arrive)
+                wait = (datetime.strptime(next_due, '%Y-%m-%d %H:%M:%S') - datetime.now()).total_seconds()
+                self._wake.wait(min(max(wait, 0.5), 60))
+        except Exception as e:
+            print(f"Outbox error: {e}")
+        finally:
+            with self._lock:
+                if not exited:
+                    self._workers -= 1
+                last = self._workers == 0
+            if last:
+                self.transport.finish()
+
+    def _deliver(self, message):
+        if not self.limiter.acquire(lambda: self._stopped):
+            self.db.release_message(message['id'])  # Stays queued for the next start
+            return
+        started = time.monotonic()
+        try:
+            self.transport.send(message['phone'], message['message'])
+        except Exception as e:
+            self.limiter.record_failure()
+            error = str(e) or type(e).__name__
+            print(f"Failed to send message {message['id']} (attempt {message['attempts']}): {error}")
+            if message['attempts'] >= self.max_attempts:
+                self.db.mark_message_failed(message['id'], error)
+            else:
+                retry_at = datetime.now() + timedelta(seconds=self.retry_delay_for(message['attempts']))
+                self.db.mark_message_failed(message['id'], error, retry_at)
+        else:
+            self.limiter.record_success(time.monotonic() - started)
+            self.db.mark_message_sent(message['id'])
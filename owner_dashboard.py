@@ -4,12 +4,18 @@ Password-protected analytics and financial overview for gym owner
 """
 import customtkinter as ctk
 from tkinter import messagebox, simpledialog
+import queue
+import threading
 from datetime import date, datetime, timedelta
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
 class OwnerDashboard(ctk.CTkFrame):
+    tables = ("payments", "members", "staff", "locker_payments")  # Read by its sections
     # Password for owner access
     OWNER_PASSWORD = "babyrose.1234"
+    # Last data of each section with the table versions it was loaded at, kept
+    # across visits (the page itself is rebuilt each time for the password prompt)
+    _section_cache = {}
     
     def __init__(self, parent, db):
         super().__init__(parent, fg_color="#ffffff")
@@ -73,15 +79,6 @@ class OwnerDashboard(ctk.CTkFrame):
     
     def load_dashboard(self):
         """Load dashboard content after authentication"""
-        self.refresh_dashboard()
-    
-    def refresh_dashboard(self):
-        """Refresh dashboard content with latest data"""
-        # Destroy all widgets except title frame
-        for widget in list(self.winfo_children()):
-            if widget != self.title_frame:
-                widget.destroy()
-        
         # Create scrollable frame for all content
         scrollable_frame = ctk.CTkScrollableFrame(
             self,
@@ -89,55 +86,63 @@ class OwnerDashboard(ctk.CTkFrame):
         )
         scrollable_frame.pack(fill="both", expand=True, padx=0, pady=0)
         
-        # Financial Overview Section
-        self.create_financial_section(scrollable_frame)
-        
-        # Analytics Section
-        self.create_analytics_section(scrollable_frame)
-        
-        # Recent Payments Section
-        self.create_recent_payments_section(scrollable_frame)
-        
-        # Locker Revenue Analytics Section
-        self.create_locker_revenue_section(scrollable_frame)
-    
-    def create_financial_section(self, parent):
-        """Create financial metrics section"""
-        # Section title
-        section_title = ctk.CTkLabel(
-            parent,
-            text="Financial Overview",
-            font=ctk.CTkFont(size=20, weight="bold"),
-            text_color="#0f172a"
-        )
-        section_title.pack(anchor="w", pady=(0, 15), padx=20)
-        
-        # Financial cards container
-        financial_frame = ctk.CTkFrame(parent, fg_color="transparent")
-        financial_frame.pack(fill="x", padx=20, pady=(0, 30))
-        
-        # Get financial data
-        daily_revenue = self.db.get_daily_revenue()
-        monthly_revenue = self.db.get_monthly_revenue()
-        total_revenue = self.db.get_total_revenue()
-        
-        # Calculate today's date for display
-        today = date.today()
-        current_month = today.strftime("%B %Y")
-        
-        # Financial cards
-        financial_cards = [
-            ("Daily Revenue", f"₹{daily_revenue:,.2f}", f"Today ({today.strftime('%d %b %Y')})", "#3b82f6"),
-            ("Monthly Revenue", f"₹{monthly_revenue:,.2f}", current_month, "#10b981"),
-            ("Total Revenue", f"₹{total_revenue:,.2f}", "All Time", "#8b5cf6"),
+        # Sections are built once with placeholders and filled in as their data arrives
+        self.sections = [
+            FinancialSection(self, scrollable_frame),
+            AnalyticsSection(self, scrollable_frame),
+            RecentPaymentsSection(self, scrollable_frame),
+            LockerRevenueSection(self, scrollable_frame),
         ]
-        
-        for label, value, subtitle, color in financial_cards:
-            card = self.create_financial_card(financial_frame, label, value, subtitle, color)
-            card.pack(side="left", padx=7, fill="both", expand=True)
+        self.results = queue.Queue()
+        self.loading = 0
+        self.refresh_dashboard()
+    
+    def refresh_dashboard(self):
+        """Refresh dashboard content with latest data"""
+        if not self.is_authenticated:
+            return
+        
+        # Sections whose tables haven't changed show their cached data; the others
+        # load concurrently on worker threads
+        for section in self.sections:
+            key = section.cache_key()
+            cached = self._section_cache.get(section.name)
+            if cached and cached[0] == key:
+                section.show(key, cached[1])
+                continue
+            self.loading += 1
+            threading.Thread(target=self._load_section, args=(section, key), daemon=True).start()
+        
+        if self.loading:
+            self.after(30, self._poll_sections)
+    
+    def _load_section(self, section, key):
+        """Worker thread: query one section's data"""
+        try:
+            self.results.put((section, key, section.load(), None))
+        except Exception as e:
+            self.results.put((section, key, None, e))
+    
+    def _poll_sections(self):
+        """Show each section as soon as its data arrives"""
+        if not self.winfo_exists():
+            return
+        while True:
+            try:
+                section, key, data, error = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.loading -= 1
+            if error is not None:
+                print(f"Dashboard section error ({section.name}): {error}")
+                continue
+            self._section_cache[section.name] = (key, data)
+            section.show(key, data)
+        if self.loading:
+            self.after(30, self._poll_sections)
     
     def create_financial_card(self, parent, title, value, subtitle, color):
-        """Create a financial metric card"""
+        """Create a financial metric card (returns the card and its value and subtitle labels)"""
         card = ctk.CTkFrame(
             parent,
             fg_color="#f8fafc",
@@ -171,157 +176,20 @@ class OwnerDashboard(ctk.CTkFrame):
         )
         subtitle_label.pack()
         
-        return card
+        return card, value_label, subtitle_label
     
-    def create_analytics_section(self, parent):
-        """Create analytics section with various metrics"""
-        # Section title
+    def create_section_title(self, parent, text):
+        """Section heading"""
         section_title = ctk.CTkLabel(
             parent,
-            text="Analytics & Insights",
+            text=text,
             font=ctk.CTkFont(size=20, weight="bold"),
             text_color="#0f172a"
         )
         section_title.pack(anchor="w", pady=(0, 15), padx=20)
-        
-        # Analytics container (two columns)
-        analytics_container = ctk.CTkFrame(parent, fg_color="transparent")
-        analytics_container.pack(fill="both", expand=True, padx=20, pady=(0, 30))
-        analytics_container.grid_columnconfigure(0, weight=1)
-        analytics_container.grid_columnconfigure(1, weight=1)
-        
-        # Left column - Members by Trainer
-        trainer_frame = ctk.CTkFrame(
-            analytics_container,
-            fg_color="#f8fafc",
-            border_width=1,
-            border_color="#e2e8f0",
-            corner_radius=12
-        )
-        trainer_frame.grid(row=0, column=0, sticky="nsew", padx=(0, 10), pady=(0, 10))
-        
-        trainer_title = ctk.CTkLabel(
-            trainer_frame,
-            text="Members per Trainer",
-            font=ctk.CTkFont(size=16, weight="bold"),
-            text_color="#0f172a"
-        )
-        trainer_title.pack(pady=(20, 15), padx=20, anchor="w")
-        
-        trainers_data = self.db.get_members_by_trainer()
-        if trainers_data:
-            for trainer in trainers_data:
-                trainer_card = self.create_trainer_card(trainer_frame, trainer)
-                trainer_card.pack(fill="x", padx=20, pady=(0, 10))
-        else:
-            no_trainers = ctk.CTkLabel(
-                trainer_frame,
-                text="No active trainers found",
-                font=ctk.CTkFont(size=14),
-                text_color="#64748b"
-            )
-            no_trainers.pack(pady=20)
-        
-        # Right column - Membership Type Distribution
-        membership_frame = ctk.CTkFrame(
-            analytics_container,
-            fg_color="#f8fafc",
-            border_width=1,
-            border_color="#e2e8f0",
-            corner_radius=12
-        )
-        membership_frame.grid(row=0, column=1, sticky="nsew", padx=(10, 0), pady=(0, 10))
-        
-        membership_title = ctk.CTkLabel(
-            membership_frame,
-            text="Membership Type Distribution",
-            font=ctk.CTkFont(size=16, weight="bold"),
-            text_color="#0f172a"
-        )
-        membership_title.pack(pady=(20, 15), padx=20, anchor="w")
-        
-        membership_data = self.db.get_membership_type_distribution()
-        if membership_data:
-            for mem_type in membership_data:
-                type_card = self.create_membership_card(membership_frame, mem_type)
-                type_card.pack(fill="x", padx=20, pady=(0, 10))
-        else:
-            no_members = ctk.CTkLabel(
-                membership_frame,
-                text="No active members found",
-                font=ctk.CTkFont(size=14),
-                text_color="#64748b"
-            )
-            no_members.pack(pady=20)
-        
-        # Payment Frequency Distribution (full width)
-        frequency_frame = ctk.CTkFrame(
-            analytics_container,
-            fg_color="#f8fafc",
-            border_width=1,
-            border_color="#e2e8f0",
-            corner_radius=12
-        )
-        frequency_frame.grid(row=1, column=0, columnspan=2, sticky="ew", pady=(10, 0))
-        
-        frequency_title = ctk.CTkLabel(
-            frequency_frame,
-            text="Payment Frequency Distribution",
-            font=ctk.CTkFont(size=16, weight="bold"),
-            text_color="#0f172a"
-        )
-        frequency_title.pack(pady=(20, 15), padx=20, anchor="w")
-        
-        frequency_data = self.db.get_payment_frequency_distribution()
-        if frequency_data:
-            frequency_container = ctk.CTkFrame(frequency_frame, fg_color="transparent")
-            frequency_container.pack(fill="x", padx=20, pady=(0, 20))
-            
-            for freq in frequency_data:
-                freq_card = self.create_frequency_card(frequency_container, freq)
-                freq_card.pack(side="left", padx=10, fill="x", expand=True)
-        else:
-            no_freq = ctk.CTkLabel(
-                frequency_frame,
-                text="No payment frequency data available",
-                font=ctk.CTkFont(size=14),
-                text_color="#64748b"
-            )
-            no_freq.pack(pady=20)
-    
-    def create_trainer_card(self, parent, trainer_data: Dict):
-        """Create a card showing trainer and member count"""
-        card = ctk.CTkFrame(
-            parent,
-            fg_color="#ffffff",
-            border_width=1,
-            border_color="#cbd5e1",
-            corner_radius=8
-        )
-        
-        content_frame = ctk.CTkFrame(card, fg_color="transparent")
-        content_frame.pack(fill="x", padx=15, pady=12)
-        
-        trainer_name_label = ctk.CTkLabel(
-            content_frame,
-            text=trainer_data['trainer_name'],
-            font=ctk.CTkFont(size=15, weight="bold"),
-            text_color="#0f172a"
-        )
-        trainer_name_label.pack(side="left")
-        
-        count_label = ctk.CTkLabel(
-            content_frame,
-            text=f"{trainer_data['member_count']} members",
-            font=ctk.CTkFont(size=14),
-            text_color="#3b82f6"
-        )
-        count_label.pack(side="right")
-        
-        return card
     
-    def create_membership_card(self, parent, membership_data: Dict):
-        """Create a card showing membership type and count"""
+    def create_count_card(self, parent, color):
+        """Card with a name on the left and a count on the right (trainers, membership types)"""
         card = ctk.CTkFrame(
             parent,
             fg_color="#ffffff",
@@ -333,25 +201,25 @@ class OwnerDashboard(ctk.CTkFrame):
         content_frame = ctk.CTkFrame(card, fg_color="transparent")
         content_frame.pack(fill="x", padx=15, pady=12)
         
-        type_label = ctk.CTkLabel(
+        name_label = ctk.CTkLabel(
             content_frame,
-            text=membership_data['membership_type'],
+            text="",
             font=ctk.CTkFont(size=15, weight="bold"),
             text_color="#0f172a"
         )
-        type_label.pack(side="left")
+        name_label.pack(side="left")
         
         count_label = ctk.CTkLabel(
             content_frame,
-            text=f"{membership_data['count']} members",
+            text="",
             font=ctk.CTkFont(size=14),
-            text_color="#10b981"
+            text_color=color
         )
         count_label.pack(side="right")
         
-        return card
+        return card, [name_label, count_label]
     
-    def create_frequency_card(self, parent, frequency_data: Dict):
+    def create_frequency_card(self, parent):
         """Create a card showing payment frequency and count"""
         card = ctk.CTkFrame(
             parent,
@@ -364,7 +232,7 @@ class OwnerDashboard(ctk.CTkFrame):
         
         freq_label = ctk.CTkLabel(
             card,
-            text=frequency_data['payment_frequency'],
+            text="",
             font=ctk.CTkFont(size=14, weight="bold"),
             text_color="#0f172a"
         )
@@ -372,74 +240,15 @@ class OwnerDashboard(ctk.CTkFrame):
         
         count_label = ctk.CTkLabel(
             card,
-            text=f"{frequency_data['count']}",
+            text="",
             font=ctk.CTkFont(size=24, weight="bold"),
             text_color="#8b5cf6"
         )
         count_label.pack()
         
-        return card
+        return card, [freq_label, count_label]
     
-    def create_recent_payments_section(self, parent):
-        """Create recent payments section"""
-        # Section title
-        section_title = ctk.CTkLabel(
-            parent,
-            text="Recent Payments",
-            font=ctk.CTkFont(size=20, weight="bold"),
-            text_color="#0f172a"
-        )
-        section_title.pack(anchor="w", pady=(0, 15), padx=20)
-        
-        # Recent payments frame
-        payments_frame = ctk.CTkFrame(
-            parent,
-            fg_color="#f8fafc",
-            border_width=1,
-            border_color="#e2e8f0",
-            corner_radius=12
-        )
-        payments_frame.pack(fill="x", padx=20, pady=(0, 20))
-        
-        # Get recent payments
-        recent_payments = self.db.get_recent_payments(limit=10)
-        
-        if recent_payments:
-            # Header row
-            header_frame = ctk.CTkFrame(payments_frame, fg_color="transparent")
-            header_frame.pack(fill="x", padx=20, pady=(20, 10))
-            
-            headers = ["Date", "Member", "Amount", "Notes"]
-            for i, header in enumerate(headers):
-                header_label = ctk.CTkLabel(
-                    header_frame,
-                    text=header,
-                    font=ctk.CTkFont(size=14, weight="bold"),
-                    text_color="#64748b"
-                )
-                if i == 0:
-                    header_label.pack(side="left", padx=(0, 20))
-                elif i == 1:
-                    header_label.pack(side="left", padx=(0, 20), expand=True, fill="x")
-                elif i == 2:
-                    header_label.pack(side="left", padx=(0, 20))
-                else:
-                    header_label.pack(side="left")
-            
-            # Payment rows
-            for payment in recent_payments:
-                payment_row = self.create_payment_row(payments_frame, payment)
-                payment_row.pack(fill="x", padx=20, pady=(0, 8))
-        else:
-            no_payments = ctk.CTkLabel(
-                payments_frame,
-                text="No payments recorded yet",
-                font=ctk.CTkFont(size=14),
-                text_color="#64748b"
-            )
-            no_payments.pack(pady=30)
-    
-    def create_payment_row(self, parent, payment_data: Dict):
+    def create_payment_row(self, parent):
         """Create a row showing payment details"""
         row = ctk.CTkFrame(
             parent,
@@ -453,12 +262,9 @@ class OwnerDashboard(ctk.CTkFrame):
         content_frame.pack(fill="x", padx=15, pady=10)
         
         # Date
-        payment_date = payment_data['payment_date']
-        if isinstance(payment_date, str):
-            payment_date = datetime.strptime(payment_date, '%Y-%m-%d').date()
         date_label = ctk.CTkLabel(
             content_frame,
-            text=payment_date.strftime('%d %b %Y'),
+            text="",
             font=ctk.CTkFont(size=13),
             text_color="#0f172a",
             width=100
@@ -468,7 +274,7 @@ class OwnerDashboard(ctk.CTkFrame):
         # Member name
         member_label = ctk.CTkLabel(
             content_frame,
-            text=payment_data.get('member_name', 'N/A'),
+            text="",
             font=ctk.CTkFont(size=13),
             text_color="#0f172a"
         )
@@ -477,7 +283,7 @@ class OwnerDashboard(ctk.CTkFrame):
         # Amount
         amount_label = ctk.CTkLabel(
             content_frame,
-            text=f"₹{payment_data['amount']:,.2f}",
+            text="",
             font=ctk.CTkFont(size=13, weight="bold"),
             text_color="#10b981",
             width=100
@@ -485,53 +291,289 @@ class OwnerDashboard(ctk.CTkFrame):
         amount_label.pack(side="left", padx=(0, 20))
         
         # Notes
-        notes_text = payment_data.get('notes', '') or 'N/A'
         notes_label = ctk.CTkLabel(
             content_frame,
-            text=notes_text[:30] + ('...' if len(notes_text) > 30 else ''),
+            text="",
             font=ctk.CTkFont(size=12),
             text_color="#64748b",
             width=150
         )
         notes_label.pack(side="left")
         
-        return row
+        return row, [date_label, member_label, amount_label, notes_label]
+
+
+class RowList:
+    """A list of card rows whose labels are updated in place; rows are only added or removed when the count changes"""
     
-    def create_locker_revenue_section(self, parent):
-        """Create locker revenue analytics section"""
-        # Section title
-        section_title = ctk.CTkLabel(
+    def __init__(self, parent, create_row, pack_options: Dict, empty_text: str):
+        self.parent = parent
+        self.create_row = create_row  # create_row(parent) -> (row widget, labels)
+        self.pack_options = pack_options
+        self.rows = []
+        self.empty_label = ctk.CTkLabel(parent, text="Loading...", font=ctk.CTkFont(size=14), text_color="#64748b")
+        self.empty_label.pack(pady=20)
+        self.empty_text = empty_text
+    
+    def update(self, texts: List[tuple]):
+        """Show one row per tuple of label texts"""
+        if texts:
+            self.empty_label.pack_forget()
+        else:
+            self.empty_label.configure(text=self.empty_text)
+            self.empty_label.pack(pady=20)
+        
+        while len(self.rows) < len(texts):
+            row, labels = self.create_row(self.parent)
+            row.pack(**self.pack_options)
+            self.rows.append((row, labels, [None] * len(labels)))
+        while len(self.rows) > len(texts):
+            self.rows.pop()[0].destroy()
+        
+        for (row, labels, shown), row_texts in zip(self.rows, texts):
+            for i, (label, text) in enumerate(zip(labels, row_texts)):
+                if shown[i] != text:
+                    label.configure(text=text)
+                    shown[i] = text
+
+
+class DashboardSection:
+    """One dashboard section: builds its widgets once, loads its data on a worker thread, updates in place"""
+    name = ""
+    tables: Tuple[str, ...] = ()  # Tables the section reads; it reloads only when one of them changed
+    daily = False  # Figures depend on today's date
+    
+    def __init__(self, dashboard, parent):
+        self.dashboard = dashboard
+        self.db = dashboard.db
+        self.shown_key = None
+        self.build(parent)
+    
+    def cache_key(self):
+        """Changes whenever the section's data may have changed"""
+        return self.db.table_versions.snapshot(self.tables), (date.today() if self.daily else None)
+    
+    def show(self, key, data):
+        if key != self.shown_key:
+            self.render(data)
+            self.shown_key = key
+    
+    def build(self, parent):
+        raise NotImplementedError
+    
+    def load(self):
+        """Query the section's data (runs on a worker thread)"""
+        raise NotImplementedError
+    
+    def render(self, data):
+        raise NotImplementedError
+
+
+class FinancialSection(DashboardSection):
+    name = "financial"
+    tables = ("payments",)
+    daily = True
+    
+    def build(self, parent):
+        self.dashboard.create_section_title(parent, "Financial Overview")
+        
+        # Financial cards container
+        financial_frame = ctk.CTkFrame(parent, fg_color="transparent")
+        financial_frame.pack(fill="x", padx=20, pady=(0, 30))
+        
+        self.cards = []
+        for label, color in (("Daily Revenue", "#3b82f6"), ("Monthly Revenue", "#10b981"),
+                             ("Total Revenue", "#8b5cf6")):
+            card, value_label, subtitle_label = self.dashboard.create_financial_card(
+                financial_frame, label, "…", "", color)
+            card.pack(side="left", padx=7, fill="both", expand=True)
+            self.cards.append((value_label, subtitle_label))
+    
+    def load(self):
+        return {
+            'today': date.today(),
+            'daily': self.db.get_daily_revenue(),
+            'monthly': self.db.get_monthly_revenue(),
+            'total': self.db.get_total_revenue(),
+        }
+    
+    def render(self, data):
+        today = data['today']
+        values = [
+            (f"₹{data['daily']:,.2f}", f"Today ({today.strftime('%d %b %Y')})"),
+            (f"₹{data['monthly']:,.2f}", today.strftime("%B %Y")),
+            (f"₹{data['total']:,.2f}", "All Time"),
+        ]
+        for (value_label, subtitle_label), (value, subtitle) in zip(self.cards, values):
+            value_label.configure(text=value)
+            subtitle_label.configure(text=subtitle)
+
+
+class AnalyticsSection(DashboardSection):
+    name = "analytics"
+    tables = ("members", "staff")
+    
+    def build(self, parent):
+        self.dashboard.create_section_title(parent, "Analytics & Insights")
+        
+        # Analytics container (two columns)
+        analytics_container = ctk.CTkFrame(parent, fg_color="transparent")
+        analytics_container.pack(fill="both", expand=True, padx=20, pady=(0, 30))
+        analytics_container.grid_columnconfigure(0, weight=1)
+        analytics_container.grid_columnconfigure(1, weight=1)
+        
+        # Left column - Members by Trainer
+        trainer_frame = self._panel(analytics_container, "Members per Trainer")
+        trainer_frame.grid(row=0, column=0, sticky="nsew", padx=(0, 10), pady=(0, 10))
+        self.trainers = RowList(trainer_frame, lambda p: self.dashboard.create_count_card(p, "#3b82f6"),
+                                {'fill': "x", 'padx': 20, 'pady': (0, 10)}, "No active trainers found")
+        
+        # Right column - Membership Type Distribution
+        membership_frame = self._panel(analytics_container, "Membership Type Distribution")
+        membership_frame.grid(row=0, column=1, sticky="nsew", padx=(10, 0), pady=(0, 10))
+        self.memberships = RowList(membership_frame, lambda p: self.dashboard.create_count_card(p, "#10b981"),
+                                   {'fill': "x", 'padx': 20, 'pady': (0, 10)}, "No active members found")
+        
+        # Payment Frequency Distribution (full width)
+        frequency_frame = self._panel(analytics_container, "Payment Frequency Distribution")
+        frequency_frame.grid(row=1, column=0, columnspan=2, sticky="ew", pady=(10, 0))
+        frequency_container = ctk.CTkFrame(frequency_frame, fg_color="transparent")
+        frequency_container.pack(fill="x", padx=20, pady=(0, 20))
+        self.frequencies = RowList(frequency_container, self.dashboard.create_frequency_card,
+                                   {'side': "left", 'padx': 10, 'fill': "x", 'expand': True},
+                                   "No payment frequency data available")
+    
+    def _panel(self, parent, title):
+        frame = ctk.CTkFrame(
             parent,
-            text="Locker Revenue Analytics",
-            font=ctk.CTkFont(size=20, weight="bold"),
+            fg_color="#f8fafc",
+            border_width=1,
+            border_color="#e2e8f0",
+            corner_radius=12
+        )
+        title_label = ctk.CTkLabel(
+            frame,
+            text=title,
+            font=ctk.CTkFont(size=16, weight="bold"),
             text_color="#0f172a"
         )
-        section_title.pack(anchor="w", pady=(0, 15), padx=20)
+        title_label.pack(pady=(20, 15), padx=20, anchor="w")
+        return frame
+    
+    def load(self):
+        return {
+            'trainers': self.db.get_members_by_trainer(),
+            'memberships': self.db.get_membership_type_distribution(),
+            'frequencies': self.db.get_payment_frequency_distribution(),
+        }
+    
+    def render(self, data):
+        self.trainers.update([(t['trainer_name'], f"{t['member_count']} members") for t in data['trainers']])
+        self.memberships.update([(m['membership_type'], f"{m['count']} members") for m in data['memberships']])
+        self.frequencies.update([(f['payment_frequency'], f"{f['count']}") for f in data['frequencies']])
+
+
+class RecentPaymentsSection(DashboardSection):
+    name = "recent_payments"
+    tables = ("payments", "members")
+    
+    def build(self, parent):
+        self.dashboard.create_section_title(parent, "Recent Payments")
+        
+        # Recent payments frame
+        payments_frame = ctk.CTkFrame(
+            parent,
+            fg_color="#f8fafc",
+            border_width=1,
+            border_color="#e2e8f0",
+            corner_radius=12
+        )
+        payments_frame.pack(fill="x", padx=20, pady=(0, 20))
+        
+        # Header row
+        self.header_frame = ctk.CTkFrame(payments_frame, fg_color="transparent")
+        headers = ["Date", "Member", "Amount", "Notes"]
+        for i, header in enumerate(headers):
+            header_label = ctk.CTkLabel(
+                self.header_frame,
+                text=header,
+                font=ctk.CTkFont(size=14, weight="bold"),
+                text_color="#64748b"
+            )
+            if i == 0:
+                header_label.pack(side="left", padx=(0, 20))
+            elif i == 1:
+                header_label.pack(side="left", padx=(0, 20), expand=True, fill="x")
+            elif i == 2:
+                header_label.pack(side="left", padx=(0, 20))
+            else:
+                header_label.pack(side="left")
+        
+        self.payments = RowList(payments_frame, self.dashboard.create_payment_row,
+                                {'fill': "x", 'padx': 20, 'pady': (0, 8)}, "No payments recorded yet")
+    
+    def load(self):
+        return self.db.get_recent_payments(limit=10)
+    
+    def render(self, recent_payments):
+        if recent_payments:
+            if not self.header_frame.winfo_manager():
+                # Only happens while there are no rows yet, so the placeholder is still shown
+                self.header_frame.pack(fill="x", padx=20, pady=(20, 10), before=self.payments.empty_label)
+        else:
+            self.header_frame.pack_forget()
+        self.payments.update([self._payment_texts(p) for p in recent_payments])
+    
+    def _payment_texts(self, payment_data: Dict) -> tuple:
+        payment_date = payment_data['payment_date']
+        if isinstance(payment_date, str):
+            payment_date = datetime.strptime(payment_date, '%Y-%m-%d').date()
+        notes_text = payment_data.get('notes', '') or 'N/A'
+        return (
+            payment_date.strftime('%d %b %Y'),
+            payment_data.get('member_name', 'N/A'),
+            f"₹{payment_data['amount']:,.2f}",
+            notes_text[:30] + ('...' if len(notes_text) > 30 else ''),
+        )
+
+
+class LockerRevenueSection(DashboardSection):
+    name = "locker_revenue"
+    tables = ("locker_payments",)
+    daily = True
+    
+    def build(self, parent):
+        self.dashboard.create_section_title(parent, "Locker Revenue Analytics")
         
         # Locker revenue cards container
         locker_revenue_frame = ctk.CTkFrame(parent, fg_color="transparent")
         locker_revenue_frame.pack(fill="x", padx=20, pady=(0, 30))
         
-        # Get locker revenue data
-        daily_locker_revenue = self.db.get_daily_locker_revenue()
-        monthly_locker_revenue = self.db.get_monthly_locker_revenue()
-        annual_locker_revenue = self.db.get_annual_locker_revenue()
-        ytd_locker_revenue = self.db.get_ytd_locker_revenue()
-        
-        # Calculate today's date for display
-        today = date.today()
-        current_month = today.strftime("%B %Y")
-        current_year = today.strftime("%Y")
-        
-        # Locker revenue cards
-        locker_revenue_cards = [
-            ("Daily Locker Revenue", f"₹{daily_locker_revenue:,.2f}", f"Today ({today.strftime('%d %b %Y')})", "#f59e0b"),
-            ("Monthly Locker Revenue", f"₹{monthly_locker_revenue:,.2f}", current_month, "#ec4899"),
-            ("Annual Locker Revenue", f"₹{annual_locker_revenue:,.2f}", current_year, "#14b8a6"),
-            ("Year-to-Date Locker Revenue", f"₹{ytd_locker_revenue:,.2f}", f"Jan 1 - {today.strftime('%d %b %Y')}", "#8b5cf6"),
-        ]
-        
-        for label, value, subtitle, color in locker_revenue_cards:
-            card = self.create_financial_card(locker_revenue_frame, label, value, subtitle, color)
+        self.cards = []
+        for label, color in (("Daily Locker Revenue", "#f59e0b"), ("Monthly Locker Revenue", "#ec4899"),
+                             ("Annual Locker Revenue", "#14b8a6"), ("Year-to-Date Locker Revenue", "#8b5cf6")):
+            card, value_label, subtitle_label = self.dashboard.create_financial_card(
+                locker_revenue_frame, label, "…", "", color)
             card.pack(side="left", padx=7, fill="both", expand=True)
-
+            self.cards.append((value_label, subtitle_label))
+    
+    def load(self):
+        return {
+            'today': date.today(),
+            'daily': self.db.get_daily_locker_revenue(),
+            'monthly': self.db.get_monthly_locker_revenue(),
+            'annual': self.db.get_annual_locker_revenue(),
+            'ytd': self.db.get_ytd_locker_revenue(),
+        }
+    
+    def render(self, data):
+        today = data['today']
+        values = [
+            (f"₹{data['daily']:,.2f}", f"Today ({today.strftime('%d %b %Y')})"),
+            (f"₹{data['monthly']:,.2f}", today.strftime("%B %Y")),
+            (f"₹{data['annual']:,.2f}", today.strftime("%Y")),
+            (f"₹{data['ytd']:,.2f}", f"Jan 1 - {today.strftime('%d %b %Y')}"),
+        ]
+        for (value_label, subtitle_label), (value, subtitle) in zip(self.cards, values):
+            value_label.configure(text=value)
+            subtitle_label.configure(text=subtitle)
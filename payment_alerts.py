@@ -6,8 +6,15 @@ import customtkinter as ctk
 from tkinter import ttk, messagebox
 from datetime import date, datetime
 from typing import List, Dict, Optional
+from events import MEMBER_EVENTS, subscribe_widget
+from tree_sync import sync_treeview
+from search_controller import SearchController
+from alert_snapshot import AlertRow, format_date
 
 class PaymentAlerts(ctk.CTkFrame):
+    follows_events = True  # Kept up to date by data change events while hidden
+    tables = ("members", "payments")  # Tables it shows
+    
     def __init__(self, parent, db):
         super().__init__(parent, fg_color="#ffffff")
         self.db = db
@@ -15,6 +22,7 @@ class PaymentAlerts(ctk.CTkFrame):
         self.current_filter = "all"  # "all", "overdue", "due_soon"
         self.setup_ui()
         self.refresh_data()
+        self.data_events = subscribe_widget(self.db.events, self, MEMBER_EVENTS, self.on_data_changed)
     
     def setup_ui(self):
         """Create the payment alerts UI"""
@@ -64,20 +72,16 @@ class PaymentAlerts(ctk.CTkFrame):
         self.summary_cards_frame = cards_frame  # Store reference
         
         # Get data for summary
-        overdue = self.db.get_overdue_members()
-        due_soon = self.db.get_due_soon_members()
-        
-        overdue_total = sum(m.get('fee_amount', 0) for m in overdue)
-        due_soon_total = sum(m.get('fee_amount', 0) for m in due_soon)
-        total_outstanding = overdue_total + due_soon_total
+        alerts = self.db.alerts.snapshot()
         
         cards = [
-            ("Overdue Payments", len(overdue), overdue_total, "#ef4444", "#fef2f2"),
-            ("Due Soon", len(due_soon), due_soon_total, "#f59e0b", "#fffbeb"),
-            ("Total Outstanding", len(overdue) + len(due_soon), total_outstanding, "#3b82f6", "#eff6ff"),
+            ("Overdue Payments", "#ef4444", "#fef2f2"),
+            ("Due Soon", "#f59e0b", "#fffbeb"),
+            ("Total Outstanding", "#3b82f6", "#eff6ff"),
         ]
         
-        for label, count, amount, color, bg_color in cards:
+        self.summary_labels = []  # (count label, amount label) per card
+        for (label, color, bg_color), (count, amount) in zip(cards, self._summary_values(alerts)):
             card = ctk.CTkFrame(
                 cards_frame,
                 fg_color=bg_color,
@@ -115,6 +119,23 @@ class PaymentAlerts(ctk.CTkFrame):
                 text_color=color
             )
             amount_label.pack(pady=(5, 10))
+            self.summary_labels.append((count_label, amount_label))
+    
+    def _summary_values(self, alerts):
+        """(count, amount) for the overdue, due soon and total cards"""
+        overdue, due_soon = len(alerts.overdue), len(alerts.due_soon)
+        overdue_total, due_soon_total = alerts.overdue_total, alerts.due_soon_total
+        return [
+            (overdue, overdue_total),
+            (due_soon, due_soon_total),
+            (overdue + due_soon, overdue_total + due_soon_total),
+        ]
+    
+    def update_summary_cards(self, alerts):
+        """Update the summary card numbers in place"""
+        for (count_label, amount_label), (count, amount) in zip(self.summary_labels, self._summary_values(alerts)):
+            count_label.configure(text=str(count))
+            amount_label.configure(text=f"₹{amount:,.2f}")
     
     def create_filter_tabs(self):
         """Create filter tabs (All, Overdue, Due Soon)"""
@@ -177,7 +198,10 @@ class PaymentAlerts(ctk.CTkFrame):
             width=300
         )
         self.search_entry.pack(side="left", fill="x", expand=True, padx=(0, 10))
-        self.search_entry.bind("<KeyRelease>", lambda e: self.refresh_table())
+        # Searches run once typing pauses, on a worker thread
+        self.search = SearchController(self, self._search_members, self._show_search_results,
+                                       get_query=self._search_query)
+        self.search_entry.bind("<KeyRelease>", self.search.schedule)
         
         # Export button
         export_btn = ctk.CTkButton(
@@ -322,131 +346,89 @@ class PaymentAlerts(ctk.CTkFrame):
         # if fixed_count > 0:
         #     messagebox.showinfo("Payment Dates Fixed", f"Fixed payment dates for {fixed_count} member(s)")
         
-        # Store reference to summary cards frame
-        if not hasattr(self, 'summary_cards_frame'):
-            # Find and store reference to summary cards frame
-            for widget in self.winfo_children():
-                if isinstance(widget, ctk.CTkFrame):
-                    children = widget.winfo_children()
-                    if len(children) == 3 and all(isinstance(c, ctk.CTkFrame) for c in children):
-                        self.summary_cards_frame = widget
-                        break
-        
-        # Recreate summary cards
-        if hasattr(self, 'summary_cards_frame'):
-            self.summary_cards_frame.destroy()
-        self.create_summary_cards()
-        
-        # Refresh table
-        self.refresh_table()
+        # Update summary cards and table from the same alert lists
+        alerts = self.db.alerts.snapshot()
+        self.update_summary_cards(alerts)
+        self.refresh_table(alerts)
     
-    def refresh_table(self):
-        """Refresh the table with current data"""
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # Get data based on filter
-        if self.current_filter == "overdue":
-            members = self.db.get_overdue_members()
-        elif self.current_filter == "due_soon":
-            members = self.db.get_due_soon_members()
-        else:  # all
-            overdue = self.db.get_overdue_members()
-            due_soon = self.db.get_due_soon_members()
-            members = overdue + due_soon
-        
-        # Apply search filter
-        search_term = self.search_entry.get().strip().lower()
+    def refresh(self):
+        """Reload alerts after data changed elsewhere"""
+        self.refresh_data()
+    
+    def on_data_changed(self, events):
+        """Update the counters and only the rows that changed"""
+        alerts = self.db.alerts.snapshot()
+        self.update_summary_cards(alerts)
+        self.refresh_table(alerts)
+    
+    def refresh_table(self, alerts=None):
+        """Refresh the table with current data (pass the alert snapshot if it was just fetched)"""
+        # A full reload covers any pending change events
+        if hasattr(self, 'data_events'):
+            self.data_events.discard()
+        
+        members = self._filtered_members(self._search_query(), alerts)
+        self._show_members(members)
+    
+    def _search_query(self):
+        """Current filter and search term, read on the UI thread"""
+        return self.current_filter, self.search_entry.get().strip().lower()
+    
+    def _search_members(self, query):
+        """Background search (runs on a worker thread)"""
+        return query, self._filtered_members(query)
+    
+    def _show_search_results(self, result):
+        """Show a finished background search (UI thread)"""
+        query, members = result
+        if query[0] != self.current_filter:
+            # The filter changed meanwhile and already refreshed the table
+            return
+        self._show_members(members)
+    
+    def _filtered_members(self, query, alerts=None):
+        """Alert rows for a (filter, search term) query, sorted by due date"""
+        current_filter, search_term = query
+        if alerts is None:
+            alerts = self.db.alerts.snapshot()
+        
+        # Overdue first, then due soon (the snapshot keeps both sorted)
+        rows = alerts.members(current_filter)
+        
+        # Apply search filter (ID, name, email or phone however it is written, via the member index).
+        # The index only matches inside words and numbers from 3 characters, and IDs whole; the
+        # alert list is short, so plain substring matches (e.g. "12" in ID 312) are kept as well
         if search_term:
-            members = [
-                m for m in members
-                if (search_term in str(m.get('id', '')).lower() or
-                    search_term in m.get('name', '').lower() or
-                    search_term in m.get('phone', '').lower())
-            ]
-        
-        # Sort by due date (overdue first, then due soon)
-        today = date.today()
-        members.sort(key=lambda m: (
-            date.fromisoformat(m['next_payment_date']) if isinstance(m['next_payment_date'], str) else m['next_payment_date']
-        ))
-        
-        # Populate table
-        for member in members:
-            self.add_member_to_table(member)
+            matches = {m['id'] for m in self.db.search_members(search_term, limit=None)}
+            rows = [row for row in rows if row.id in matches or row.contains(search_term)]
+        return rows
     
-    def add_member_to_table(self, member: Dict):
-        """Add a member row to the table"""
-        member_id = member['id']
-        name = member.get('name', 'N/A')
-        phone = member.get('phone', 'N/A')
-        amount = member.get('fee_amount', 0)
-        
-        # Handle due date
-        due_date_str = member.get('next_payment_date', '')
-        if isinstance(due_date_str, str):
-            due_date = date.fromisoformat(due_date_str)
-        else:
-            due_date = due_date_str
-        
-        # Calculate days overdue or days until
-        today = date.today()
-        if due_date < today:
-            days = (today - due_date).days
-            days_text = f"{days} days overdue"
-            row_color = "#fef2f2"  # Light red
-        else:
-            days = (due_date - today).days
-            days_text = f"Due in {days} days"
-            row_color = "#fffbeb"  # Light orange
-        
-        frequency = member.get('payment_frequency', 'Monthly')
-        
-        # Handle join date
-        join_date = member.get('join_date', 'N/A')
-        if join_date and join_date != 'N/A':
-            if isinstance(join_date, str):
-                try:
-                    join_date = date.fromisoformat(join_date).strftime('%Y-%m-%d')
-                except:
-                    pass
-            else:
-                join_date = join_date.strftime('%Y-%m-%d')
-        
-        # Handle last payment date
-        last_payment = member.get('last_payment_date', 'N/A')
-        if last_payment and last_payment != 'N/A':
-            if isinstance(last_payment, str):
-                try:
-                    last_payment = date.fromisoformat(last_payment).strftime('%Y-%m-%d')
-                except:
-                    pass
-            else:
-                last_payment = last_payment.strftime('%Y-%m-%d')
+    def _show_members(self, rows: List[AlertRow]):
+        """Show the given alert rows"""
+        # Members that left the list can't stay selected
+        self.selected_members &= {row.id for row in rows}
+        self.update_selected_count()
+        
+        # Update the table in place (only new or changed rows are touched)
+        sync_treeview(self.tree, [self._alert_row(row) for row in rows])
+    
+    def _alert_row(self, row: AlertRow):
+        """(key, values, tags) of a member's table row"""
+        member = row.record
+        member_id = row.id
         
-        # Insert row
-        item = self.tree.insert('', 'end', values=(
-            "☐",  # Checkbox placeholder
+        return member_id, (
+            "☑" if member_id in self.selected_members else "☐",  # Checkbox
             member_id,
-            name,
-            phone,
-            f"₹{amount:.2f}",
-            due_date.strftime('%Y-%m-%d'),
-            days_text,
-            frequency,
-            join_date if join_date != 'N/A' else 'N/A',
-            last_payment if last_payment != 'N/A' else 'N/A'
-        ), tags=(member_id,))
-        
-        # Tag for styling
-        self.tree.set(item, "Select", "☐")
-        
-        # Color code rows
-        if due_date < today:
-            self.tree.item(item, tags=(member_id, "overdue"))
-        else:
-            self.tree.item(item, tags=(member_id, "due_soon"))
+            row.name,
+            member.get('phone') or 'N/A',
+            f"₹{row.amount:.2f}",
+            row.due_date.strftime('%Y-%m-%d'),
+            row.days_text,
+            member.get('payment_frequency', 'Monthly'),
+            format_date(member.get('join_date')),
+            format_date(member.get('last_payment_date'))
+        ), (member_id, row.kind)
     
     def on_row_click(self, event):
         """Handle row click for checkbox selection"""
@@ -0,0 +1,58 @@
+"""
+Phone Numbers Module
+Normalizes the free-text phone numbers members give to E.164 (+919876543210),
+the form stored in members.phone_norm and used for messaging and lookups.
+Numbers without a country code are taken to be Indian (DEFAULT_COUNTRY_CODE).
+"""
+import re
+
+DEFAULT_COUNTRY_CODE = "91"
+NATIONAL_DIGITS = 10  # Length of a number without its country code
+
+
+def to_e164(phone, country_code: str = DEFAULT_COUNTRY_CODE) -> str:
+    """
+    E.164 form of a phone number, or "" if it doesn't look like one.
+    Accepts spaces, dashes, brackets, a leading + or 00, and a trunk 0. Without
+    + or 00 the number must be a national one (10 digits, or 11 with the trunk 0)
+    or start with country_code; anything else (e.g. 8 or 9 digits, a digit
+    missing) is rejected rather than guessed at.
+    """
+    text = str(phone or "").strip()
+    digits = re.sub(r"\D", "", text)
+    if text.startswith("+"):
+        pass  # Already has a country code
+    elif digits.startswith("00"):
+        digits = digits[2:]  # International prefix
+    elif len(digits) == NATIONAL_DIGITS + 1 and digits.startswith("0"):
+        digits = country_code + digits[1:]  # Trunk prefix, e.g. 09876543210
+    elif len(digits) == NATIONAL_DIGITS:
+        digits = country_code + digits
+    elif not (len(digits) == len(country_code) + NATIONAL_DIGITS and digits.startswith(country_code)):
+        return ""
+    # E.164 allows 15 digits; anything under 8 can't be a full number
+    if not 8 <= len(digits) <= 15 or digits.startswith("0"):
+        return ""
+    return "+" + digits
+
+
+def e164_prefix(query: str, country_code: str = DEFAULT_COUNTRY_CODE) -> str:
+    """
+    Start of the E.164 numbers a partly typed phone number can match ("" if the
+    query isn't a phone number): "98765" -> "+9198765", "+44 20" -> "+4420".
+    """
+    text = query.strip()
+    if not text or re.search(r"[^\d\s\-+()]", text):
+        return ""
+    digits = re.sub(r"\D", "", text)
+    if not digits:
+        return ""
+    if text.startswith("+"):
+        return "+" + digits
+    if digits.startswith("00"):
+        return "+" + digits[2:] if len(digits) > 2 else ""
+    if digits.startswith("0"):
+        digits = digits[1:]
+    if len(digits) > NATIONAL_DIGITS:
+        return "+" + digits  # Typed with its country code
+    return "+" + country_code + digits
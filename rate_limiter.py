@@ -0,0 +1,100 @@
+"""
+Rate Limiter Module
+Token bucket pacing for outgoing messages. AdaptiveRateLimiter speeds up
+while sends succeed quickly and backs off when they fail or slow down
+(additive-increase / multiplicative-decrease, like TCP congestion control).
+"""
+import threading
+import time
+from typing import Callable, Optional
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second on average, up to `burst` at once"""
+
+    def __init__(self, rate: float, burst: float = 1.0, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = burst
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self) -> float:
+        """Seconds until the next acquisition would go through (0 if it would now)"""
+        with self._lock:
+            self._refill()
+            return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+    def try_acquire(self) -> bool:
+        """Take a token if one is available"""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def acquire(self, should_stop: Optional[Callable[[], bool]] = None) -> bool:
+        """
+        Wait for a token and take it. Returns False without taking one if
+        should_stop() becomes true while waiting (checked at least once a second).
+        """
+        while not self.try_acquire():
+            if should_stop and should_stop():
+                return False
+            self.sleep(min(max(self.wait_time(), 0.01), 1.0))
+        return True
+
+
+class AdaptiveRateLimiter(TokenBucket):
+    def __init__(self, rate: float, min_rate: float, max_rate: float, burst: float = 1.0,
+                 increase: Optional[float] = None, decrease: float = 0.5,
+                 latency_target: Optional[float] = None, **kwargs):
+        """
+        Args:
+            rate: starting messages per second
+            min_rate, max_rate: limits the rate adapts between
+            increase: added to the rate after each quick success (default: a twentieth of the range)
+            decrease: rate multiplier after a failure
+            latency_target: sends slower than this (seconds, smoothed) also slow the rate down
+        """
+        super().__init__(rate, burst, **kwargs)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase if increase is not None else (max_rate - min_rate) / 20
+        self.decrease = decrease
+        self.latency_target = latency_target
+        self.latency = None  # Smoothed send latency in seconds
+
+    @classmethod
+    def for_transport(cls, transport) -> "AdaptiveRateLimiter":
+        """Limiter using the pacing a whatsapp_transport.Transport declares"""
+        return cls(transport.start_rate, transport.min_rate, transport.max_rate,
+                   burst=transport.burst, latency_target=transport.latency_target)
+
+    def _set_rate(self, rate: float):
+        with self._lock:
+            self._refill()  # Tokens earned so far count at the old rate
+            self.rate = min(self.max_rate, max(self.min_rate, rate))
+
+    def record_success(self, latency: float):
+        """A send took `latency` seconds and worked"""
+        self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+        if self.latency_target and self.latency > self.latency_target:
+            self._set_rate(self.rate * 0.9)  # The other end is slowing down: ease off
+        else:
+            self._set_rate(self.rate + self.increase)
+
+    def record_failure(self):
+        """A send failed: slow down and pause until a token is earned again"""
+        self._set_rate(self.rate * self.decrease)
+        with self._lock:
+            self._tokens = 0.0
@@ -0,0 +1,158 @@
+"""
+Readiness Module
+Wait for the browser to be ready instead of sleeping a fixed time. A probe is
+a callable answering True (ready), False (not yet) or None (can't tell on this
+machine); Readiness polls one until it is ready or its timeout runs out.
+ScriptedProbe and FakeClock let the browser driver be tested headlessly.
+"""
+import platform
+import shutil
+import subprocess
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Sequence
+
+
+@dataclass
+class Readiness:
+    probe: Callable[[], Optional[bool]]
+    timeout: float
+    interval: float = 0.25
+    fallback: float = 0.0  # Fixed wait used when the probe can't tell
+    clock: Callable[[], float] = field(default=time.monotonic, repr=False)
+    sleep: Callable[[float], None] = field(default=time.sleep, repr=False)
+
+    def wait(self) -> bool:
+        """Poll until ready; False if the timeout ran out first"""
+        reset = getattr(self.probe, "reset", None)
+        if reset:
+            reset()
+        deadline = self.clock() + self.timeout
+        while True:
+            ready = self.probe()
+            if ready:
+                return True
+            if ready is None:
+                self.sleep(min(self.fallback, self.timeout))
+                return True
+            remaining = deadline - self.clock()
+            if remaining <= 0:
+                return False
+            self.sleep(min(self.interval, remaining))
+
+
+def all_of(*probes):
+    """Ready when every probe that can tell says ready (None if none can tell)"""
+    def probe():
+        answers = [p() for p in probes]
+        if any(a is False for a in answers):
+            return False
+        return True if any(a for a in answers) else None
+
+    def reset():
+        for p in probes:
+            if hasattr(p, "reset"):
+                p.reset()
+
+    probe.reset = reset
+    return probe
+
+
+def active_window_title() -> Optional[str]:
+    """Title of the window in front (None if this platform can't say)"""
+    system = platform.system()
+    try:
+        if system == "Windows":
+            import pygetwindow
+            window = pygetwindow.getActiveWindow()
+            return window.title if window else None
+        if system == "Darwin":
+            script = ('tell application "System Events" to get name of front window of '
+                      '(first application process whose frontmost is true)')
+            result = subprocess.run(["osascript", "-e", script], capture_output=True, timeout=2)
+        elif shutil.which("xdotool"):
+            result = subprocess.run(["xdotool", "getactivewindow", "getwindowname"], capture_output=True, timeout=2)
+        else:
+            return None
+        return result.stdout.decode("utf-8", "replace").strip() if result.returncode == 0 else None
+    except Exception:
+        return None
+
+
+class WindowTitleProbe:
+    """Ready when the window in front has `text` in its title"""
+
+    def __init__(self, text: str, get_title: Callable[[], Optional[str]] = active_window_title):
+        self.text = text.lower()
+        self.get_title = get_title
+
+    def __call__(self) -> Optional[bool]:
+        title = self.get_title()
+        return None if title is None else self.text in title.lower()
+
+
+class ScreenChangeProbe:
+    """
+    Ready once a screen region has changed since the wait started and then
+    stayed the same for `stable_polls` polls (e.g. a page finished loading,
+    or a sent message moved from the input box into the chat).
+    """
+
+    def __init__(self, grab: Callable[[], Optional[bytes]], stable_polls: int = 2):
+        """grab returns the region's pixels (None if screenshots aren't possible)"""
+        self.grab = grab
+        self.stable_polls = stable_polls
+        self.reset()
+
+    def reset(self):
+        self._start = self._safe_grab()
+        self._last = self._start
+        self._changed = False
+        self._stable = 0
+
+    def _safe_grab(self) -> Optional[bytes]:
+        try:
+            return self.grab()
+        except Exception:
+            return None
+
+    def __call__(self) -> Optional[bool]:
+        pixels = self._safe_grab()
+        if pixels is None or self._start is None:
+            return None
+        self._changed = self._changed or pixels != self._start
+        self._stable = self._stable + 1 if pixels == self._last else 0
+        self._last = pixels
+        return self._changed and self._stable >= self.stable_polls
+
+
+class ScriptedProbe:
+    """Test double: answers from a script (the last answer repeats) and counts polls"""
+
+    def __init__(self, answers: Sequence[Optional[bool]]):
+        self.answers: List[Optional[bool]] = list(answers)
+        self.polls = 0
+        self.resets = 0
+
+    def reset(self):
+        self.resets += 1
+
+    def __call__(self) -> Optional[bool]:
+        answer = self.answers[min(self.polls, len(self.answers) - 1)]
+        self.polls += 1
+        return answer
+
+
+class FakeClock:
+    """Test double for Readiness.clock/sleep: sleeping just moves the time on"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+        self.slept += seconds
@@ -0,0 +1,138 @@
+"""
+Reminders Module
+Works out the WhatsApp payment reminders due (memberships and lockers) and
+queues them in the outbox. ReminderScheduler does this at set times of day on
+a background thread; send_reminders.py does it from cron or a systemd timer.
+Nothing here touches Tkinter.
+"""
+import os
+import threading
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Dict, List, Sequence
+
+from message_templates import DEFAULT_TEMPLATES, MessageTemplate, compile_template
+
+DAYS_AHEAD = 1  # Reminders go out the day before a payment is due
+DEFAULT_TIMES = ("09:00",)
+
+
+def parse_times(text: str) -> List[time]:
+    """Times of day from "09:00,18:30" (sorted, duplicates dropped)"""
+    times = set()
+    for part in text.replace(" ", ",").split(","):
+        if part:
+            times.add(datetime.strptime(part, "%H:%M").time())
+    return sorted(times)
+
+
+def configured_times() -> List[time]:
+    """Reminder times from REMINDER_TIMES (empty if it isn't set)"""
+    return parse_times(os.environ.get("REMINDER_TIMES", ""))
+
+
+def reminder_template(db, kind: str) -> MessageTemplate:
+    """Template for 'membership' or 'locker' reminders (the built-in one if it was deleted or is invalid)"""
+    name = f"{kind}_reminder"
+    text = db.get_template_text(name)
+    if text:
+        try:
+            return compile_template(text)
+        except ValueError as e:
+            print(f"Template '{name}' is invalid ({e}); using the built-in one")
+    return compile_template(DEFAULT_TEMPLATES[name])
+
+
+def reminder_messages(db, dues: List[Dict]) -> List[Dict]:
+    """Outbox messages for Database.get_due_on rows, rendered in one pass per template"""
+    messages = []
+    for kind in ('membership', 'locker'):
+        rows = [due for due in dues if due['kind'] == kind]
+        if rows:
+            messages += reminder_template(db, kind).messages(rows, f"{kind}_reminder", due_date=True)
+    return messages
+
+
+def reminder_day() -> date:
+    """Due date reminders are sent for today"""
+    return date.today() + timedelta(days=DAYS_AHEAD)
+
+
+def due_reminders(db, day: date = None) -> List[Dict]:
+    """Reminders for the memberships and lockers due on day (default: reminder_day())"""
+    return reminder_messages(db, db.get_due_on(day or reminder_day()))
+
+
+def queue_due_reminders(db, day: date = None) -> int:
+    """Queue the due reminders not sent before; returns how many were queued"""
+    return db.enqueue_messages(due_reminders(db, day))
+
+
+class ReminderScheduler:
+    def __init__(self, db, outbox, times: Sequence[time] = None,
+                 clock: Callable[[], datetime] = datetime.now):
+        """
+        Args:
+            outbox: outbox.OutboxDispatcher that sends what gets queued
+            times: times of day to queue reminders (default: DEFAULT_TIMES)
+        """
+        self.db = db
+        self.outbox = outbox
+        self.times = sorted(times) if times else parse_times(",".join(DEFAULT_TIMES))
+        self.clock = clock
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def next_run(self, after: datetime) -> datetime:
+        """First scheduled time later than `after`"""
+        for day in (after.date(), after.date() + timedelta(days=1)):
+            for at in self.times:
+                moment = datetime.combine(day, at)
+                if moment > after:
+                    return moment
+
+    def run_once(self) -> int:
+        """Queue the due reminders and start sending them; returns how many were queued"""
+        queued = queue_due_reminders(self.db)
+        if queued:
+            self.outbox.start()
+        return queued
+
+    def start(self):
+        """
+        Queue reminders at each scheduled time on a background thread. If today's
+        first time has already passed, runs straight away too (reminders already
+        sent are skipped, so this is harmless when the last run did happen).
+        """
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="reminders", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        now = self.clock()
+        due = now >= datetime.combine(now.date(), self.times[0])
+        while True:
+            if due:
+                try:
+                    queued = self.run_once()
+                    if queued:
+                        print(f"Queued {queued} payment reminder(s)")
+                except Exception as e:
+                    print(f"Reminder error: {e}")
+            next_at = self.next_run(self.clock())
+            # Wait at most an hour at a time so clock changes (sleep, DST) are noticed
+            while True:
+                remaining = (next_at - self.clock()).total_seconds()
+                if remaining <= 0:
+                    break
+                if self._stop.wait(min(remaining, 3600)):
+                    return
+            due = True
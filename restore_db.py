@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Restore the database from a backup snapshot
+Usage:
+    python3 restore_db.py --list
+    python3 restore_db.py --at 2025-12-01 --dry-run
+    python3 restore_db.py --snapshot backups/gym_snapshot_2025-12-01.db --tables payments
+    python3 restore_db.py --at 2025-12-01 --members 12,15
+"""
+import argparse
+import os
+import sys
+from datetime import datetime
+
+from backup_manager import BackupManager
+
+DB_PATH = "gym_management.db"
+
+
+def list_snapshots(manager: BackupManager):
+    """Show retained snapshots with their verification status"""
+    index = manager.load_verification_index()["snapshots"]
+    snapshots = manager.list_snapshots()
+    if not snapshots:
+        print("No snapshots found.")
+        return
+
+    print("\n" + "="*70)
+    print("SNAPSHOTS")
+    print("="*70)
+    for path in snapshots:
+        entry = index.get(os.path.basename(path), {})
+        status = entry.get("status", "not verified")
+        size_kb = os.path.getsize(path) / 1024
+        print(f"{os.path.basename(path):<32} {size_kb:>10.1f} KB   {status}")
+        if entry.get("schema_drift"):
+            print(f"{'':<32} (older schema - {entry['schema_drift']})")
+
+
+def print_report(report: dict, dry_run: bool):
+    """Print the per-table diff report"""
+    print("\n" + "="*70)
+    print("DRY RUN - no changes made" if dry_run else "RESTORE COMPLETE")
+    print("="*70)
+    print(f"{'Table':<20} {'Added':>10} {'Removed':>10} {'Changed':>10}   Changed IDs")
+    print("-"*70)
+    for table, diff in report.items():
+        sample = ", ".join(str(i) for i in diff["sample_ids"])
+        if diff["changed"] > len(diff["sample_ids"]):
+            sample += ", ..."
+        print(f"{table:<20} {diff['added']:>10} {diff['removed']:>10} {diff['changed']:>10}   {sample}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Restore the gym database from a backup snapshot")
+    parser.add_argument("--db", default=DB_PATH, help="Live database file")
+    parser.add_argument("--backup-dir", default="backups", help="Directory holding snapshots")
+    parser.add_argument("--list", action="store_true", help="List available snapshots")
+    parser.add_argument("--snapshot", help="Snapshot file to restore from")
+    parser.add_argument("--at", help="Restore the newest snapshot taken on or before this date (YYYY-MM-DD)")
+    parser.add_argument("--tables", nargs="+", help="Only restore these tables")
+    parser.add_argument("--members", help="Only restore rows for these member IDs (comma separated)")
+    parser.add_argument("--dry-run", action="store_true", help="Show what would change without restoring")
+    parser.add_argument("--yes", action="store_true", help="Don't ask for confirmation")
+    args = parser.parse_args()
+
+    manager = BackupManager(db_path=args.db, backup_dir=args.backup_dir)
+
+    if args.list:
+        list_snapshots(manager)
+        return
+
+    snapshot = args.snapshot
+    if not snapshot:
+        at_date = None
+        if args.at:
+            try:
+                at_date = datetime.strptime(args.at, '%Y-%m-%d').date()
+            except ValueError:
+                print("Invalid date! Use YYYY-MM-DD format.")
+                sys.exit(1)
+        snapshot = manager.find_snapshot(at_date)
+        if not snapshot:
+            print("No snapshot found for that point in time.")
+            sys.exit(1)
+
+    member_ids = None
+    if args.members:
+        try:
+            member_ids = [int(m) for m in args.members.split(",") if m.strip()]
+        except ValueError:
+            print("Invalid member IDs! Use comma separated numbers, e.g. 12,15")
+            sys.exit(1)
+
+    print(f"Snapshot: {snapshot}")
+    try:
+        # Always show the diff first
+        report = manager.restore(snapshot, args.tables, member_ids, dry_run=True)
+        print_report(report, dry_run=True)
+        if args.dry_run:
+            return
+
+        if not args.yes:
+            answer = input("\nRestore these changes? Type 'yes' to continue: ").strip().lower()
+            if answer != "yes":
+                print("Restore cancelled.")
+                return
+
+        report = manager.restore(snapshot, args.tables, member_ids)
+        print_report(report, dry_run=False)
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Search Controller Module
+Debounced search boxes that run their lookup on a worker thread and post
+the result back to the Tk loop, so typing never blocks the UI
+"""
+import queue
+import threading
+from typing import Any, Callable
+
+
+class SearchController:
+    def __init__(self, widget, lookup: Callable[[Any], Any], apply: Callable[[Any], None],
+                 get_query: Callable[[], Any], delay_ms: int = 250, poll_ms: int = 25):
+        """
+        Args:
+            widget: any widget of the page (used for after() scheduling)
+            lookup: lookup(query) runs on the worker thread and returns the result
+            apply: apply(result) runs on the Tk thread to show it
+            get_query: reads the current search input (called on the Tk thread)
+            delay_ms: quiet time after the last keystroke before searching
+        """
+        self.widget = widget
+        self.lookup = lookup
+        self.apply = apply
+        self.get_query = get_query
+        self.delay_ms = delay_ms
+        self.poll_ms = poll_ms
+
+        self._after_id = None
+        self._poll_id = None
+        self._generation = 0  # Bumped for every new query; older results are dropped
+        self._requests = queue.Queue()
+        self._results = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+
+    def schedule(self, event=None):
+        """Call on every keystroke; the search starts once typing pauses"""
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+        self._after_id = self.widget.after(self.delay_ms, self.search_now)
+
+    def search_now(self, event=None):
+        """Start a search for the current input right away"""
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+        if not self.widget.winfo_exists():
+            return
+
+        self._generation += 1
+        # Only the newest query matters; drop any that haven't started yet
+        while True:
+            try:
+                self._requests.get_nowait()
+            except queue.Empty:
+                break
+        self._requests.put((self._generation, self.get_query()))
+
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._work, daemon=True)
+                self._worker.start()
+        if self._poll_id is None:
+            self._poll_id = self.widget.after(self.poll_ms, self._poll)
+
+    def _work(self):
+        """Worker thread: run queued lookups, exiting after a while without any"""
+        while True:
+            try:
+                generation, query = self._requests.get(timeout=5)
+            except queue.Empty:
+                with self._worker_lock:
+                    if self._requests.empty():
+                        self._worker = None
+                        return
+                continue
+            if generation != self._generation:
+                continue  # A newer query is already waiting
+            try:
+                result = (True, self.lookup(query))
+            except Exception as e:
+                result = (False, e)
+            self._results.put((generation, result))
+
+    def _poll(self):
+        """Tk thread: show the result of the newest query when it arrives"""
+        self._poll_id = None
+        if not self.widget.winfo_exists():
+            return
+
+        latest = None
+        while True:
+            try:
+                generation, result = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if generation == self._generation:
+                latest = result
+
+        if latest is not None:
+            ok, value = latest
+            if ok:
+                self.apply(value)
+            else:
+                print(f"Search error: {value}")
+            return
+        self._poll_id = self.widget.after(self.poll_ms, self._poll)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Queue and send payment reminders without the app (for cron or a systemd timer)
+Usage:
+    python3 send_reminders.py --once                  # Queue today's reminders, send them, exit
+    python3 send_reminders.py --once --queue-only     # Queue only; the app sends them
+    python3 send_reminders.py --at 09:00 --at 18:00   # Keep running, queueing at these times
+Reminders already sent for a due date are skipped, so running this more than
+once a day (or alongside the app) doesn't send duplicates. Messages go through
+the HTTP API when WHATSAPP_API_TOKEN is set (see README), otherwise WhatsApp Web.
+Example crontab line:
+    0 9 * * * cd /path/to/gym && python3 send_reminders.py --once
+"""
+import argparse
+import signal
+import sys
+import time
+
+from database import Database
+from outbox import OutboxDispatcher
+from reminders import DEFAULT_TIMES, ReminderScheduler, configured_times, parse_times, queue_due_reminders
+from whatsapp_transport import create_transport
+
+DB_PATH = "gym_management.db"
+
+
+def wait_until_sent(dispatcher: OutboxDispatcher):
+    """Block while the outbox is sending (failed messages stay for the app's Retry Failed)"""
+    while dispatcher.running:
+        time.sleep(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Queue and send WhatsApp payment reminders")
+    parser.add_argument("--db", default=DB_PATH, help="Database file")
+    parser.add_argument("--once", action="store_true", help="Queue the due reminders, send them and exit")
+    parser.add_argument("--queue-only", action="store_true", help="With --once: queue without sending")
+    parser.add_argument("--at", action="append", metavar="HH:MM",
+                        help="Time of day to queue reminders (repeatable; default REMINDER_TIMES or "
+                             f"{', '.join(DEFAULT_TIMES)})")
+    args = parser.parse_args()
+
+    db = Database(args.db)
+    if args.once and args.queue_only:
+        print(f"Queued {queue_due_reminders(db)} reminder(s)")
+        db.close()
+        return
+
+    try:
+        transport = create_transport()
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if not transport.available:
+        print("Error: no way to send messages. Set WHATSAPP_API_TOKEN or install pywhatkit.")
+        sys.exit(1)
+    dispatcher = OutboxDispatcher(db, transport)
+
+    if args.once:
+        queued = queue_due_reminders(db)
+        pending = dispatcher.resume()
+        print(f"Queued {queued} reminder(s); sending {pending} message(s)...")
+        wait_until_sent(dispatcher)
+        counts = db.get_outbox_counts()
+        print(f"Done: {counts['sent']} sent, {counts['failed']} failed in total")
+        db.close()
+        return
+
+    times = parse_times(",".join(args.at)) if args.at else configured_times() or None
+    scheduler = ReminderScheduler(db, dispatcher, times)
+    print("Sending reminders at " + ", ".join(t.strftime("%H:%M") for t in scheduler.times) + " (Ctrl+C to stop)")
+    signal.signal(signal.SIGTERM, lambda *_: scheduler.stop())  # systemd stop
+    dispatcher.resume()
+    scheduler.start()
+    try:
+        while scheduler.running:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        scheduler.stop()
+    # Let the message being sent finish; the rest stays queued for next time
+    dispatcher.stop()
+    wait_until_sent(dispatcher)
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,14 +5,21 @@ Handles staff registration, removal, and viewing
 import customtkinter as ctk
 from tkinter import ttk, messagebox
 from datetime import date
+from tree_sync import sync_treeview
 
 class StaffManagement(ctk.CTkFrame):
+    tables = ("staff",)  # Reloaded when one of these changed while hidden
+    
     def __init__(self, parent, db):
         super().__init__(parent, fg_color="#ffffff")
         self.db = db
         self.setup_ui()
         self.refresh_staff_list()
     
+    def refresh(self):
+        """Reload staff after data changed elsewhere"""
+        self.refresh_staff_list()
+    
     def setup_ui(self):
         """Create the staff management UI"""
         # Title
@@ -203,12 +210,10 @@ class StaffManagement(ctk.CTkFrame):
     
     def refresh_staff_list(self):
         """Refresh the staff list"""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
         staff = self.db.get_all_staff()
-        for s in staff:
-            self.tree.insert('', 'end', values=(
+        # Update the table in place (only new or changed rows are touched)
+        sync_treeview(self.tree, [
+            (s['id'], (
                 s['id'],
                 s['name'],
                 s.get('email', ''),
@@ -216,7 +221,9 @@ class StaffManagement(ctk.CTkFrame):
                 s.get('position', ''),
                 s['hire_date'],
                 s.get('status', 'active').title()
-            ))
+            ), ())
+            for s in staff
+        ])
     
     def remove_staff(self):
         """Remove selected staff"""
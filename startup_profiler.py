@@ -0,0 +1,90 @@
+"""
+Startup Profiler Module
+Measures application startup time per phase and per import
+Enabled with: python main.py --profile-startup
+"""
+import builtins
+import sys
+import time
+from contextlib import contextmanager
+from typing import List, Tuple
+
+
+class StartupProfiler:
+    def __init__(self):
+        self.enabled = False
+        self.start_time = time.perf_counter()
+        self.phases: List[Tuple[str, float]] = []
+        self.imports: List[list] = []  # [depth, module, seconds] in import order
+        self._depth = 0
+        self._original_import = None
+
+    def enable(self):
+        """Start recording phases and hook imports"""
+        if self.enabled:
+            return
+        self.enabled = True
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def disable(self):
+        """Stop recording and restore the normal import function"""
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+        self.enabled = False
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        """Time imports of modules that are not loaded yet (time includes their own imports)"""
+        if level or name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        # Record the entry before importing so nested imports are listed under it
+        entry = [self._depth, name, 0.0]
+        self.imports.append(entry)
+        self._depth += 1
+        started = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            self._depth -= 1
+            entry[2] = time.perf_counter() - started
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a named startup phase"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self.enabled:
+                self.phases.append((name, time.perf_counter() - started))
+
+    def report(self, max_depth: int = 1, min_ms: float = 1.0) -> str:
+        """Build the timing breakdown"""
+        total = time.perf_counter() - self.start_time
+        lines = ["", "=" * 60, "STARTUP PROFILE", "=" * 60, f"{'Phase':<40} {'ms':>10}", "-" * 60]
+        for name, seconds in self.phases:
+            lines.append(f"{name:<40} {seconds * 1000:>10.1f}")
+        lines.append("-" * 60)
+        lines.append(f"{'Total (launch to first paint)':<40} {total * 1000:>10.1f}")
+
+        lines += ["", f"{'Import (includes nested imports)':<40} {'ms':>10}", "-" * 60]
+        for depth, name, seconds in self.imports:
+            if depth > max_depth or seconds * 1000 < min_ms:
+                continue
+            label = ("  " * depth) + name
+            lines.append(f"{label:<40} {seconds * 1000:>10.1f}")
+        lines.append("=" * 60)
+        return "\n".join(lines)
+
+    def print_report(self):
+        """Print the report and stop profiling"""
+        if not self.enabled:
+            return
+        print(self.report())
+        self.disable()
+
+
+# Shared profiler used by main.py
+profiler = StartupProfiler()
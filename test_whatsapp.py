@@ -7,6 +7,7 @@ before integrating into the main application.
 import pywhatkit as pwk
 from datetime import datetime, timedelta
 import time
+from phone_numbers import to_e164
 
 def send_whatsapp_message(phone_number: str, message: str):
     """
@@ -23,14 +24,10 @@ def send_whatsapp_message(phone_number: str, message: str):
         - The message will be sent automatically after a few seconds
     """
     try:
-        # Remove any spaces or dashes from phone number
-        phone_number = phone_number.replace(" ", "").replace("-", "").replace("+", "")
-        
-        # Ensure country code is included (add + if not present)
-        if not phone_number.startswith("+"):
-            # You may need to add your country code here
-            # For example, for India: phone_number = "+91" + phone_number
-            print(f"Warning: Phone number should include country code. Using: {phone_number}")
+        # E.164, e.g. +919876543210 (numbers without a country code are taken to be Indian)
+        phone_number = to_e164(phone_number)
+        if not phone_number:
+            raise ValueError("Invalid phone number")
         
         # Get current time and add 1 minute (pywhatkit needs time to open browser)
         now = datetime.now()
@@ -47,7 +44,7 @@ def send_whatsapp_message(phone_number: str, message: str):
         
         # Send message
         # Format: sendwhatmsg(phone_no, message, time_hour, time_min)
-        pwk.sendwhatmsg(f"+{phone_number}", message, hour, minute)
+        pwk.sendwhatmsg(phone_number, message, hour, minute)
         
         print("Message sent successfully!")
         
@@ -73,15 +70,16 @@ def send_whatsapp_instant(phone_number: str, message: str, wait_time: int = 15):
         This method opens WhatsApp Web and sends immediately
     """
     try:
-        # Remove any spaces or dashes from phone number
-        phone_number = phone_number.replace(" ", "").replace("-", "").replace("+", "")
+        phone_number = to_e164(phone_number)
+        if not phone_number:
+            raise ValueError("Invalid phone number")
         
         print(f"Opening WhatsApp Web for {phone_number}...")
         print(f"Message will be sent in {wait_time} seconds...")
         print("Please keep the browser window open and don't close it.")
         
         # Send message instantly
-        pwk.sendwhatmsg_instantly(f"+{phone_number}", message, wait_time=wait_time, tab_close=True)
+        pwk.sendwhatmsg_instantly(phone_number, message, wait_time=wait_time, tab_close=True)
         
         print("Message sent successfully!")
         
@@ -0,0 +1,28 @@
+"""
+Shared fixtures: an in-memory Database and a helper for adding members.
+The app's modules live in the repository root, so it is put on the import path.
+"""
+import os
+import sys
+from datetime import date
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    database = Database(":memory:")
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def add_member(db):
+    """add_member(name, phone, join_date=..., fee=500.0) -> member ID (monthly members)"""
+    def add(name, phone="98765 43210", join_date=date(2026, 1, 5), fee=500.0):
+        return db.add_member(name, f"{name.lower()}@example.com", phone, join_date, "Monthly", fee, "Monthly")
+    return add
@@ -0,0 +1,91 @@
+from datetime import date, timedelta
+
+import pytest
+
+from database import DEFAULT_DUE_SOON_DAYS, DUE_SOON_DAYS
+
+TODAY = date.today()
+
+
+@pytest.fixture
+def members(db):
+    """Active members of every frequency due from 40 days ago to 40 days ahead, plus an inactive one"""
+    frequencies = ["Daily", "Monthly", "Quarterly", "Yearly", "Weekly"]
+    for i, offset in enumerate(range(-40, 41, 3)):
+        frequency = frequencies[i % len(frequencies)]
+        member_id = db.add_member(f"Member {i}", "", "", TODAY, "Basic", 100.0 + i, "Monthly")
+        db.conn.execute("UPDATE members SET payment_frequency = ?, next_payment_date = ? WHERE id = ?",
+                        (frequency, (TODAY + timedelta(days=offset)).isoformat(), member_id))
+    db.conn.execute("UPDATE members SET status = 'inactive' WHERE id = 1")
+    db.conn.commit()
+    db.alerts.invalidate()
+
+
+def expected(db, kind):
+    """The lists worked out row by row, as the alert pages used to"""
+    rows = []
+    for member in db.get_all_members():
+        due = date.fromisoformat(member["next_payment_date"])
+        window = DUE_SOON_DAYS.get(member["payment_frequency"], DEFAULT_DUE_SOON_DAYS)
+        if (due < TODAY) if kind == "overdue" else (0 <= (due - TODAY).days <= window):
+            rows.append((due, member["id"]))
+    return [member_id for _, member_id in sorted(rows)]
+
+
+def ids(rows):
+    return [row["id"] for row in rows]
+
+
+def test_lists_match_the_frequency_rules(db, members):
+    assert expected(db, "overdue") and expected(db, "due_soon")
+    assert ids(db.get_overdue_members()) == expected(db, "overdue")
+    assert ids(db.get_due_soon_members()) == expected(db, "due_soon")
+    assert db.get_alert_counts() == {"overdue": len(expected(db, "overdue")),
+                                     "due_soon": len(expected(db, "due_soon"))}
+
+
+def test_fixed_window(db, members):
+    assert all(0 <= (date.fromisoformat(m["next_payment_date"]) - TODAY).days <= 3
+               for m in db.get_due_soon_members(days=3))
+
+
+def test_pages(db, members):
+    overdue = ids(db.get_overdue_members())
+    assert ids(db.get_overdue_members(limit=4)) == overdue[:4]
+    assert ids(db.get_overdue_members(limit=4, offset=4)) == overdue[4:8]
+    due_soon = ids(db.get_due_soon_members())
+    assert ids(db.get_due_soon_members(limit=2, offset=1)) == due_soon[1:3]
+
+
+def test_alert_queries_use_the_due_date_index(db):
+    for sql in ("SELECT * FROM members WHERE status = 'active' AND next_payment_date < '2026-01-01' "
+                "ORDER BY next_payment_date, id LIMIT 10",
+                "SELECT COUNT(*) FROM members WHERE status = 'active' AND next_payment_date <= '2026-01-01'"):
+        plan = " ".join(row[3] for row in db.conn.execute("EXPLAIN QUERY PLAN " + sql))
+        assert "idx_members_status_due" in plan
+        assert "TEMP B-TREE" not in plan
+
+
+def test_alert_service_pages_without_a_snapshot(db, members):
+    page = db.alerts.page("due_soon", 0, 3)
+    assert [row.id for row in page] == expected(db, "due_soon")[:3]
+    assert db.alerts._snapshot is None  # Nothing built just for the card
+    assert db.alerts.counts() == db.get_alert_counts()
+
+
+def test_alert_service_pages_from_the_snapshot(db, members):
+    snapshot = db.alerts.snapshot()
+    assert [row.id for row in snapshot.overdue] == expected(db, "overdue")
+    assert db.alerts.page("overdue", 2, 3) == list(snapshot.overdue[2:5])
+    assert db.alerts.counts() == {"overdue": len(snapshot.overdue), "due_soon": len(snapshot.due_soon)}
+    assert snapshot.overdue[0].days_text == f"{snapshot.overdue[0].days} days overdue"
+
+
+def test_alert_rows_match_substrings_of_id_name_and_phone(db, members):
+    db.conn.execute("UPDATE members SET phone = '98765 43210' WHERE id = 12")
+    db.conn.commit()
+    db.alerts.invalidate()
+    rows = {row.id: row for row in db.alerts.snapshot().members("All")}
+    assert rows[12].contains("12") and rows[12].contains("r 1") and rows[12].contains("65 4")
+    assert not rows[12].contains("13")
+    assert not rows[13].contains("98")  # No phone number
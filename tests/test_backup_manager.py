@@ -0,0 +1,150 @@
+import os
+import sqlite3
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from backup_manager import BackupManager, restore_snapshot, table_fingerprint
+from database import Database
+
+
+@pytest.fixture
+def gym(tmp_path):
+    """A database file with two members and a BackupManager for it"""
+    db_path = str(tmp_path / "gym.db")
+    db = Database(db_path)
+    db.add_member("Rahul", "rahul@example.com", "9876543210", date(2026, 1, 5), "Monthly", 500.0, "Monthly")
+    db.add_member("Asha", "asha@example.com", "9876500000", date(2026, 1, 6), "Monthly", 800.0, "Monthly")
+    db.close()
+    return BackupManager(db_path, str(tmp_path / "backups"))
+
+
+def checksum(conn):
+    return table_fingerprint(conn, "members")["checksum"]
+
+
+@pytest.mark.parametrize("edit", [
+    "UPDATE members SET name = 'Rohit' WHERE name = 'Rahul'",  # Same length
+    "UPDATE members SET phone = '9999999999' WHERE id = 1",
+    "UPDATE members SET fee_amount = CASE id WHEN 1 THEN 800.0 ELSE 500.0 END",  # Swapped between rows
+    "DELETE FROM members WHERE id = 2",
+])
+def test_checksum_changes_with_row_content(gym, edit):
+    conn = sqlite3.connect(gym.db_path)
+    before = checksum(conn)
+    conn.execute(edit)
+    assert checksum(conn) != before
+    conn.close()
+
+
+def test_checksum_does_not_depend_on_row_order(gym):
+    conn = sqlite3.connect(gym.db_path)
+    conn.execute("CREATE TABLE reversed AS SELECT * FROM members ORDER BY id DESC")
+    assert table_fingerprint(conn, "reversed")["checksum"] == checksum(conn)
+    conn.close()
+
+
+def test_snapshot_verifies_and_is_not_reread(gym, monkeypatch):
+    path = gym.create_snapshot()
+    index = gym.verify_backups()
+    name = os.path.basename(path)
+    assert index["snapshots"][name]["status"] == "ok"
+    assert index["latest_ok"] == name
+    assert gym.get_latest_restorable() == path
+
+    monkeypatch.setattr("backup_manager.verify_snapshot", lambda *args: pytest.fail("re-verified"))
+    gym.verify_backups()
+
+
+def test_edited_snapshot_fails_and_stays_failed(gym):
+    path = gym.create_snapshot()
+    conn = sqlite3.connect(path)
+    conn.execute("UPDATE members SET name = 'Rohit' WHERE name = 'Rahul'")
+    conn.commit()
+    conn.close()
+    for _ in range(2):  # A failed snapshot is checked again, not skipped
+        entry = gym.verify_backups()["snapshots"][os.path.basename(path)]
+        assert entry["status"] == "failed"
+        assert "changed since snapshot was taken: members" in entry["error"]
+    assert gym.get_latest_restorable() is None
+
+
+def test_schema_drift_is_reported_but_not_a_failure(gym):
+    path = gym.create_snapshot()
+    conn = sqlite3.connect(gym.db_path)
+    conn.execute("ALTER TABLE members ADD COLUMN nickname TEXT")
+    conn.execute("CREATE TABLE extras (id INTEGER PRIMARY KEY)")
+    conn.commit()
+    conn.close()
+    entry = gym.verify_backups()["snapshots"][os.path.basename(path)]
+    assert entry["status"] == "ok"
+    assert "tables added since: extras" in entry["schema_drift"]
+    assert "columns changed since: members" in entry["schema_drift"]
+
+
+def members(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = dict(conn.execute("SELECT id, name FROM members").fetchall())
+    conn.close()
+    return rows
+
+
+def edit_live(gym, *statements):
+    conn = sqlite3.connect(gym.db_path)
+    for statement in statements:
+        conn.execute(statement)
+    conn.commit()
+    conn.close()
+
+
+def test_dry_run_reports_without_changing_anything(gym):
+    snapshot = gym.create_snapshot()
+    edit_live(gym, "UPDATE members SET name = 'Rohit' WHERE id = 1", "DELETE FROM members WHERE id = 2")
+    report = gym.restore(snapshot, tables=["members"], dry_run=True)
+    assert report["members"] == {"added": 1, "removed": 0, "changed": 1, "sample_ids": [1]}
+    assert members(gym.db_path) == {1: "Rohit"}
+    assert not list(Path(gym.backup_dir).glob("gym_prerestore_*.db"))
+
+
+def test_restore_saves_a_copy_then_restores(gym):
+    snapshot = gym.create_snapshot()
+    edit_live(gym, "UPDATE members SET name = 'Rohit' WHERE id = 1")
+    gym.restore(snapshot, tables=["members"])
+    assert members(gym.db_path) == {1: "Rahul", 2: "Asha"}
+    [safety] = Path(gym.backup_dir).glob("gym_prerestore_*.db")
+    assert members(str(safety))[1] == "Rohit"
+
+
+def test_restore_only_chosen_members(gym):
+    snapshot = gym.create_snapshot()
+    edit_live(gym, "UPDATE members SET name = 'Rohit' WHERE id = 1", "UPDATE members SET name = 'Usha' WHERE id = 2")
+    restore_snapshot(gym.db_path, snapshot, member_ids=[2])
+    assert members(gym.db_path) == {1: "Rohit", 2: "Asha"}
+
+
+def test_restore_rejects_tables_that_are_not_member_scoped(gym):
+    snapshot = gym.create_snapshot()
+    with pytest.raises(ValueError, match="Cannot restore by member for: staff"):
+        restore_snapshot(gym.db_path, snapshot, tables=["staff"], member_ids=[1])
+    with pytest.raises(ValueError, match="not present in both databases: nope"):
+        restore_snapshot(gym.db_path, snapshot, tables=["nope"])
+
+
+def test_find_snapshot_for_a_date(gym):
+    older = gym.create_snapshot(gym.snapshot_path(date(2026, 1, 1)))
+    newer = gym.create_snapshot(gym.snapshot_path(date(2026, 2, 1)))
+    assert gym.find_snapshot(date(2026, 1, 15)) == older
+    assert gym.find_snapshot() == newer
+    assert gym.find_snapshot(date(2025, 12, 31)) is None
+
+
+def test_cleanup_prunes_old_snapshots_and_safety_copies(gym):
+    backups = Path(gym.backup_dir)
+    old = [backups / "gym_snapshot_2020-01-01.db", backups / "gym_prerestore_2020-01-01-101500.db"]
+    for path in old:
+        path.write_bytes(b"")
+    kept = gym.create_snapshot()
+    gym.cleanup_old_backups()
+    assert not any(path.exists() for path in old)
+    assert os.path.exists(kept)
@@ -0,0 +1,155 @@
+"""BrowserTransport driven headlessly: a recording keyboard, MemoryClipboard and scripted probes"""
+import pytest
+
+import whatsapp_transport
+from clipboard import MemoryClipboard
+from readiness import FakeClock, Readiness, ScriptedProbe
+from whatsapp_transport import BrowserProbes, BrowserTransport
+
+
+class RecordingKeyboard:
+    """Stands in for pyautogui and records what was typed and pressed"""
+
+    def __init__(self):
+        self.actions = []
+
+    def size(self):
+        return 1920, 1080
+
+    def hotkey(self, *keys):
+        self.actions.append(("hotkey",) + keys)
+
+    def write(self, text, interval=0.0):
+        self.actions.append(("write", text))
+
+    def press(self, key):
+        self.actions.append(("press", key))
+
+    def click(self, x, y):
+        self.actions.append(("click", x, y))
+
+
+def scripted_probes(clock, **answers):
+    """BrowserProbes that are ready straight away unless answers[step] says otherwise"""
+    def step(name, timeout):
+        return Readiness(ScriptedProbe(answers.get(name, [True])), timeout=timeout,
+                         clock=clock, sleep=clock.sleep)
+    return BrowserProbes(minimized=step("minimized", 0.5), whatsapp_loaded=step("whatsapp_loaded", 30),
+                         chat_loaded=step("chat_loaded", 20), browser_focused=step("browser_focused", 3),
+                         message_sent=step("message_sent", 10))
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    """URLs passed to webbrowser.open"""
+    urls = []
+    monkeypatch.setattr("webbrowser.open", urls.append)
+    return urls
+
+
+def make_transport(clipboard, clock, **answers):
+    transport = BrowserTransport(None, clipboard=clipboard, keyboard=RecordingKeyboard(),
+                                 probes=scripted_probes(clock, **answers))
+    transport.key_delay = 0
+    transport.focus_browser_window = lambda: True
+    return transport
+
+
+def test_first_message_opens_whatsapp_and_pastes(opened):
+    clipboard = MemoryClipboard()
+    clipboard.text = "what the user copied"
+    transport = make_transport(clipboard, FakeClock())
+    assert transport.send("+919876543210", "Hello ₹500")
+    assert opened == ["https://web.whatsapp.com/send?phone=919876543210"]
+    assert clipboard.copied == ["Hello ₹500"]
+    assert ("hotkey", transport.modifier, "v") in transport.keyboard.actions
+    assert not any(action[0] == "write" for action in transport.keyboard.actions)
+    transport.finish()
+    assert clipboard.text == "what the user copied"
+
+
+def test_later_messages_reuse_the_window(opened):
+    clipboard = MemoryClipboard()
+    transport = make_transport(clipboard, FakeClock())
+    transport.send("+919876543210", "First")
+    transport.send("+919811111111", "Second")
+    assert len(opened) == 1
+    assert clipboard.copied == ["First", "https://web.whatsapp.com/send?phone=919811111111", "Second"]
+
+
+def test_types_when_the_clipboard_is_unavailable(opened):
+    transport = make_transport(MemoryClipboard(available=False), FakeClock())
+    transport.send("+919876543210", "Hello")
+    assert ("write", "Hello") in transport.keyboard.actions
+    assert not any(action[0] == "hotkey" and action[-1] == "v" for action in transport.keyboard.actions)
+
+
+def test_types_when_copying_fails(opened):
+    clipboard = MemoryClipboard()
+
+    def broken_copy(text):
+        raise RuntimeError("clipboard locked")
+    clipboard.copy = broken_copy
+    transport = make_transport(clipboard, FakeClock())
+    transport.send("+919876543210", "Hello")
+    assert ("write", "Hello") in transport.keyboard.actions
+
+
+def test_empty_phone_number_is_rejected(opened):
+    transport = make_transport(MemoryClipboard(), FakeClock())
+    with pytest.raises(Exception, match="Phone number is empty"):
+        transport.send("", "Hello")
+    assert opened == []
+
+
+def test_whatsapp_not_loading_times_out(opened):
+    clock = FakeClock()
+    transport = make_transport(MemoryClipboard(), clock, whatsapp_loaded=[False])
+    with pytest.raises(Exception, match="WhatsApp Web did not finish loading"):
+        transport.send("+919876543210", "Hello")
+    assert clock.now == 30
+    assert not transport.browser_open
+
+
+def test_message_not_leaving_the_input_box_times_out(opened):
+    transport = make_transport(MemoryClipboard(), FakeClock(), message_sent=[False])
+    with pytest.raises(Exception, match="The message was not sent in time"):
+        transport.send("+919876543210", "Hello")
+
+
+def test_default_probes_fall_back_to_fixed_waits_without_a_display(monkeypatch):
+    class NoScreenshots(RecordingKeyboard):
+        def screenshot(self, region):
+            raise OSError("no display")
+    monkeypatch.setattr(whatsapp_transport, "WindowTitleProbe", lambda text: (lambda: None))
+    clock = FakeClock()
+    probes = BrowserProbes.default(NoScreenshots())
+    probes.message_sent.clock = clock
+    probes.message_sent.sleep = clock.sleep
+    assert probes.message_sent.wait()
+    assert clock.slept == probes.message_sent.fallback
+
+
+class RecordingRoot:
+    """Stands in for the Tk root window and records what was called directly vs scheduled"""
+
+    def __init__(self):
+        self.called, self.scheduled = [], []
+
+    def after(self, delay, callback):
+        self.scheduled.append(callback.__name__)
+
+    def iconify(self):
+        self.called.append("iconify")
+
+    def deiconify(self):
+        self.called.append("deiconify")
+
+
+def test_window_changes_are_scheduled_on_the_tk_thread(opened):
+    transport = make_transport(MemoryClipboard(), FakeClock())
+    transport.root = RecordingRoot()
+    transport.send("+919876543210", "Hello")
+    transport.finish()
+    assert transport.root.scheduled == ["iconify", "deiconify"]
+    assert transport.root.called == []  # Never touched from the sending thread
@@ -0,0 +1,62 @@
+from datetime import date
+
+from events import (EventBus, MemberAdded, MemberRemoved, MemberUpdated, PaymentRecorded, StaffChanged,
+                    TableVersions, affected_member_ids)
+
+
+def test_subscribers_get_the_event_types_they_asked_for():
+    bus = EventBus()
+    members, everything = [], []
+    bus.subscribe((MemberAdded, MemberUpdated), members.append)
+    bus.subscribe(object, everything.append)
+    bus.publish(MemberAdded(1))
+    bus.publish(StaffChanged(2))
+    assert members == [MemberAdded(1)]
+    assert everything == [MemberAdded(1), StaffChanged(2)]
+
+
+def test_unsubscribe():
+    bus = EventBus()
+    seen = []
+    unsubscribe = bus.subscribe(MemberAdded, seen.append)
+    unsubscribe()
+    unsubscribe()  # Harmless twice
+    bus.publish(MemberAdded(1))
+    assert seen == []
+
+
+def test_a_failing_subscriber_does_not_stop_the_others():
+    bus = EventBus()
+    seen = []
+
+    def broken(event):
+        raise RuntimeError("boom")
+    bus.subscribe(MemberAdded, broken)
+    bus.subscribe(MemberAdded, seen.append)
+    bus.publish(MemberAdded(1))
+    assert seen == [MemberAdded(1)]
+
+
+def test_table_versions_count_changes_per_table():
+    bus = EventBus()
+    versions = TableVersions(bus)
+    before = versions.snapshot(("members", "payments", "staff"))
+    bus.publish(PaymentRecorded(1, 500.0))
+    assert versions.snapshot(("members", "payments", "staff")) == (1, 1, 0)
+    assert versions.snapshot(("staff",)) == before[2:]
+
+
+def test_affected_member_ids():
+    events = [MemberAdded(1), MemberUpdated((2, 3)), MemberRemoved(4), StaffChanged(5)]
+    assert affected_member_ids(events) == {1, 2, 3, 4}
+
+
+def test_database_publishes_what_it_changed(db):
+    seen = []
+    db.events.subscribe(object, seen.append)
+    member_id = db.add_member("Asha", "", "9876543210", date(2026, 1, 5), "Monthly", 500.0, "Monthly")
+    db.record_payment(member_id, 500.0, date(2026, 2, 5))
+    # Recording a payment also moves the member's next payment date
+    assert [type(event) for event in seen] == [MemberAdded, MemberUpdated, PaymentRecorded]
+    assert seen[1].ids == (member_id,)
+    assert db.table_versions.snapshot(("members", "payments", "staff")) == (3, 1, 0)
@@ -0,0 +1,116 @@
+"""HttpTransport against the local stub server and a server that hangs up mid-request"""
+import socket
+import threading
+
+import pytest
+
+from whatsapp_stub_server import StubServer
+from whatsapp_transport import HttpTransport
+
+
+@pytest.fixture
+def server():
+    server = StubServer(token="secret").start()
+    yield server
+    server.stop()
+
+
+class HangUpServer:
+    """Reads each request in full, then closes the connection without answering"""
+
+    def __init__(self):
+        self.sock = socket.create_server(("127.0.0.1", 0))
+        self.requests = 0
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    @property
+    def url(self):
+        return "http://127.0.0.1:%d" % self.sock.getsockname()[1]
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            with conn:
+                data = b""
+                while b"\r\n\r\n" not in data:
+                    data += conn.recv(4096)
+                head, body = data.split(b"\r\n\r\n", 1)
+                length = int(next(line.split(b":")[1] for line in head.split(b"\r\n")
+                                  if line.lower().startswith(b"content-length")))
+                while len(body) < length:
+                    body += conn.recv(4096)
+                self.requests += 1
+
+
+class BrokenConnection:
+    """A keep-alive connection the server already closed: the request can't be written"""
+
+    def request(self, *args, **kwargs):
+        raise BrokenPipeError("connection closed by the server")
+
+    def close(self):
+        pass
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.delenv("WHATSAPP_API_TOKEN", raising=False)
+    monkeypatch.delenv("WHATSAPP_PHONE_ID", raising=False)
+    assert HttpTransport.from_env() is None
+    monkeypatch.setenv("WHATSAPP_API_TOKEN", "secret")
+    with pytest.raises(ValueError, match="WHATSAPP_PHONE_ID"):
+        HttpTransport.from_env()
+    monkeypatch.setenv("WHATSAPP_PHONE_ID", "12345")
+    monkeypatch.setenv("WHATSAPP_API_URL", "http://127.0.0.1:8099/v19.0")
+    transport = HttpTransport.from_env()
+    assert (transport.host, transport.path) == ("127.0.0.1:8099", "/v19.0/12345/messages")
+
+
+def test_sends_over_one_kept_alive_connection(server):
+    transport = HttpTransport(server.url, "secret", "12345")
+    ids = [transport.send("+919876543210", f"Hello {i} ₹500") for i in range(3)]
+    assert ids == ["wamid.stub1", "wamid.stub2", "wamid.stub3"]
+    assert server.messages[0] == {"to": "919876543210", "text": "Hello 0 ₹500"}
+    assert server.connections == 1
+
+
+def test_http_errors_raise_with_the_api_message(server):
+    transport = HttpTransport(server.url, "wrong", "12345")
+    with pytest.raises(Exception, match="HTTP 401: Invalid access token"):
+        transport.send("+919876543210", "Hello")
+    assert server.messages == []
+
+
+def test_empty_phone_number_is_rejected(server):
+    with pytest.raises(ValueError):
+        HttpTransport(server.url, "secret", "12345").send("", "Hello")
+    assert server.requests == 0
+
+
+def test_request_written_but_unanswered_is_not_posted_again():
+    server = HangUpServer()
+    transport = HttpTransport(server.url, "secret", "12345", timeout=5)
+    with pytest.raises(Exception):
+        transport.send("+919876543210", "Hello")
+    assert server.requests == 1  # Left to the outbox to retry after a backoff
+    server.sock.close()
+
+
+def test_reconnects_when_an_idle_connection_was_closed(server):
+    transport = HttpTransport(server.url, "secret", "12345")
+    transport._local.conn = BrokenConnection()
+    assert transport.send("+919876543210", "Hello") == "wamid.stub1"
+    assert len(server.messages) == 1
+
+
+def test_next_send_after_a_dropped_connection_opens_a_new_one(server):
+    transport = HttpTransport(server.url, "secret", "12345")
+    transport.send("+919876543210", "First")
+    transport._local.conn.sock.close()  # Lost the connection under the transport
+    with pytest.raises(Exception):
+        transport.send("+919876543210", "Second")
+    transport.send("+919876543210", "Third")
+    assert [m["text"] for m in server.messages][-1] == "Third"
+    assert server.connections == 2
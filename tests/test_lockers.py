@@ -0,0 +1,25 @@
+from datetime import date
+
+import pytest
+
+
+@pytest.fixture
+def lockers(db, add_member):
+    """Three members with one locker each, all on phone numbers starting with 9"""
+    for name, locker in [("Asha", "L7"), ("Ravi", "L9"), ("Mira", "L3")]:
+        db.assign_locker(add_member(name), locker, 100.0, "Monthly", date(2026, 1, 5))
+
+
+def numbers(rows):
+    return sorted(row["locker_number"] for row in rows)
+
+
+def test_short_numbers_match_member_ids_and_locker_numbers_only(db, lockers):
+    assert numbers(db.search_lockers("9")) == ["L9"]  # Not every number starting +919...
+    assert numbers(db.search_lockers("1")) == ["L7"]  # Member 1
+
+
+def test_phone_numbers_match_however_they_are_written(db, lockers):
+    assert numbers(db.search_lockers("98765 43210")) == ["L3", "L7", "L9"]
+    assert numbers(db.search_lockers("987654")) == ["L3", "L7", "L9"]
+    assert numbers(db.search_lockers("ravi")) == ["L9"]
@@ -0,0 +1,79 @@
+from member_index import RecordIndex
+
+PEOPLE = [
+    {"id": 1, "name": "Asha Rao", "email": "asha@example.com", "phone": "98765 43210", "status": "active"},
+    {"id": 2, "name": "Ravi Kumar", "email": "ravi@mail.in", "phone": "+91 99999 11111", "status": "active"},
+    {"id": 3, "name": "Rashmi", "email": "", "phone": None, "status": "inactive"},
+    {"id": 12, "name": "Dev Asher", "email": "dev@example.com", "phone": "9876500000", "status": "active"},
+]
+
+
+def make_index(records=PEOPLE):
+    records = {r["id"]: dict(r) for r in records}
+    return RecordIndex(lambda: list(records.values()), records.get), records
+
+
+def ids(results):
+    return [r["id"] for r in results]
+
+
+def test_exact_id_comes_first():
+    index, _ = make_index()
+    assert ids(index.search("12")) == [12]
+    assert ids(index.search("1"))[0] == 1
+
+
+def test_name_prefix_then_word_prefix():
+    index, _ = make_index()
+    assert ids(index.search("ra")) == [3, 2, 1]  # Names starting with it, then "Rao"
+    # "Asha Rao", the word "Asher", then names containing it
+    assert ids(index.search("ash")) == [1, 12, 3]
+
+
+def test_substring_matches_need_three_characters():
+    index, _ = make_index()
+    assert ids(index.search("example")) == [1, 12]
+    assert ids(index.search("shm")) == [3]
+    assert ids(index.search("sh")) == []
+
+
+def test_phone_numbers_match_however_they_are_written():
+    index, _ = make_index()
+    for query in ("9876543210", "+91 98765 43210", "09876543210"):
+        assert ids(index.search(query))[0] == 1
+    assert ids(index.search("+919999911111")) == [2]
+    assert ids(index.search("87650")) == [12]  # Part of a number, via trigrams
+
+
+def test_missing_phone_is_fine():
+    index, _ = make_index()
+    assert ids(index.search("rashmi")) == [3]
+
+
+def test_active_only_and_limit():
+    index, _ = make_index()
+    assert 3 not in ids(index.search("ra", active_only=True))
+    assert len(index.search("", limit=2)) == 2
+    assert ids(index.search("", limit=None, active_only=True)) == [1, 2, 12]
+
+
+def test_refresh_follows_changes():
+    index, records = make_index()
+    index.warm()
+    records[2]["name"] = "Kiran"
+    del records[12]
+    index.refresh([2, 12])
+    assert ids(index.search("kumar")) == []
+    assert ids(index.search("kiran")) == [2]
+    assert index.get(12) is None
+
+
+def test_member_index_follows_database_events(db, add_member):
+    assert db.search_members("asha") == []
+    asha = add_member("Asha", phone="98765 43210")
+    assert ids(db.search_members("asha")) == [asha]
+    db.update_member(asha, name="Usha")
+    assert ids(db.search_members("usha")) == [asha]
+    assert ids(db.search_members("+919876543210")) == [asha]
+    db.remove_member(asha)
+    assert db.search_members("usha") == []
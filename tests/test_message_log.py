@@ -0,0 +1,67 @@
+import sqlite3
+from datetime import date
+
+from database import Database
+
+
+def reminder(member_id, due_date="2026-02-05", kind="membership_reminder", **extra):
+    return dict(member_id=member_id, phone="9876543210", message="Your fee is due", kind=kind,
+                due_date=due_date, **extra)
+
+
+def test_reminder_is_queued_once_per_due_date(db, add_member):
+    asha = add_member("Asha")
+    assert db.enqueue_messages([reminder(asha)]) == 1
+    assert db.enqueue_messages([reminder(asha), reminder(asha)]) == 0
+    assert db.enqueue_messages([reminder(asha, due_date="2026-03-05")]) == 1
+    assert db.enqueue_messages([reminder(asha, kind="locker_reminder")]) == 1
+    assert db.get_outbox_counts()["queued"] == 3
+
+
+def test_filter_unsent_reminders(db, add_member):
+    asha, ravi = add_member("Asha"), add_member("Ravi")
+    db.enqueue_messages([reminder(asha)])
+    assert [m["member_id"] for m in db.filter_unsent_reminders([reminder(asha), reminder(ravi)])] == [ravi]
+
+
+def test_custom_messages_are_not_deduplicated(db, add_member):
+    asha = add_member("Asha")
+    message = {"member_id": asha, "phone": "9876543210", "message": "Closed today", "kind": "custom"}
+    assert db.enqueue_messages([message, message]) == 2
+
+
+def test_message_history_is_newest_first(db, add_member):
+    asha, ravi = add_member("Asha"), add_member("Ravi")
+    db.enqueue_messages([reminder(asha), reminder(ravi),
+                         {"member_id": asha, "phone": "9876543210", "message": "Closed today"}])
+    history = db.get_message_history(asha)
+    assert [(m["kind"], m["status"]) for m in history] == [("custom", "queued"), ("membership_reminder", "queued")]
+    assert len(db.get_message_history(asha, limit=1)) == 1
+
+
+def test_reminders_about_different_subjects_are_kept_apart(db, add_member):
+    asha = add_member("Asha")
+    lockers = [reminder(asha, kind="locker_reminder", subject_id=locker) for locker in (7, 8)]
+    assert db.enqueue_messages(lockers) == 2
+    assert db.enqueue_messages(lockers) == 0
+    assert db.filter_unsent_reminders(lockers + [reminder(asha, kind="locker_reminder", subject_id=9)]) \
+        == [reminder(asha, kind="locker_reminder", subject_id=9)]
+
+
+def test_message_log_migration_adds_the_subject(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE message_log (id INTEGER PRIMARY KEY AUTOINCREMENT, member_id INTEGER NOT NULL,
+                                  kind TEXT NOT NULL, due_date DATE NOT NULL, outbox_id INTEGER,
+                                  created_at TIMESTAMP NOT NULL);
+        CREATE UNIQUE INDEX idx_message_log_key ON message_log(member_id, kind, due_date);
+        INSERT INTO message_log (member_id, kind, due_date, created_at)
+        VALUES (1, 'locker_reminder', '2026-02-05', '2026-02-04 09:00:00');
+    """)
+    conn.close()
+    db = Database(path)
+    asha = db.add_member("Asha", "", "9876543210", date(2026, 1, 5), "Monthly", 500.0, "Monthly")
+    assert db.enqueue_messages([reminder(asha, kind="locker_reminder")]) == 0  # Logged before: subject 0
+    assert db.enqueue_messages([reminder(asha, kind="locker_reminder", subject_id=7)]) == 1
+    db.close()
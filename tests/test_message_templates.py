@@ -0,0 +1,50 @@
+import re
+
+import pytest
+
+from message_templates import DEFAULT_TEMPLATES, compile_template, template_fields
+
+
+def test_render_fills_placeholders():
+    template = compile_template("Hi {name}, ₹{amount} is due on {due_date}. {{ok}}")
+    record = {"id": 7, "name": "Asha", "fee_amount": 500, "next_payment_date": "2026-02-05"}
+    assert template.render(template_fields(record)) == "Hi Asha, ₹500.00 is due on 2026-02-05. {ok}"
+    assert template.placeholders == {"name", "amount", "due_date"}
+
+
+def test_compiled_templates_are_reused():
+    assert compile_template("Hello {name}") is compile_template("Hello {name}")
+
+
+@pytest.mark.parametrize("text, error", [
+    ("Hello {nmae}", "Unknown placeholder {nmae}"),
+    ("Due: {amount:.0f}", "Formatting like {amount:.0f} is not supported"),
+    ("Hello {name!r}", "Conversions like !r"),
+    ("Hello {name", "Invalid template"),
+    ("Hello name}", "Invalid template"),
+])
+def test_invalid_templates_are_rejected(text, error):
+    with pytest.raises(ValueError, match=re.escape(error)):
+        compile_template(text)
+
+
+def test_default_templates_compile():
+    for text in DEFAULT_TEMPLATES.values():
+        compile_template(text)
+
+
+def test_messages_for_due_payments():
+    template = compile_template(DEFAULT_TEMPLATES["locker_reminder"])
+    dues = [{"kind": "locker", "member_id": 3, "name": "Ravi", "phone": "+919876543210",
+             "fee_amount": 100.0, "next_payment_date": "2026-02-05", "locker_number": "L7"}]
+    [message] = template.messages(dues, "locker_reminder", due_date=True)
+    assert message["member_id"] == 3
+    assert message["phone"] == "+919876543210"
+    assert message["due_date"] == "2026-02-05"
+    assert "locker #L7 fee of ₹100.00 is due on 2026-02-05" in message["message"]
+
+
+def test_save_message_template_validates(db):
+    with pytest.raises(ValueError):
+        db.save_message_template("bad", "Hi {nmae}")
+    assert db.get_template_text("bad") is None
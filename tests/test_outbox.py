@@ -0,0 +1,140 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from outbox import OutboxDispatcher
+from rate_limiter import AdaptiveRateLimiter
+from readiness import FakeClock
+from whatsapp_transport import Transport
+
+
+class FakeTransport(Transport):
+    """Fails the first `failures` sends, then records what it sent"""
+    name = "fake"
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.sent = []
+
+    def send(self, phone_number, message):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("network down")
+        self.sent.append((phone_number, message))
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def dispatcher(db, transport, clock, **kwargs):
+    limiter = AdaptiveRateLimiter(rate=10.0, min_rate=1.0, max_rate=10.0, burst=10,
+                                  clock=clock, sleep=clock.sleep)
+    return OutboxDispatcher(db, transport, retry_delay=30.0, max_retry_delay=100.0, limiter=limiter, **kwargs)
+
+
+def deliver_next(outbox):
+    """Send the next due message on this thread (what each worker thread does in a loop)"""
+    message = outbox.db.claim_next_message(outbox.owner)
+    if message is not None:
+        outbox._deliver(message)
+    return message
+
+
+def outbox_row(db, message_id=1):
+    return dict(db.conn.execute("SELECT * FROM outbox WHERE id = ?", (message_id,)).fetchone())
+
+
+def make_due(db):
+    """Pretend the retry wait has passed"""
+    db.conn.execute("UPDATE outbox SET next_attempt_at = ?", (db._now_text(datetime.now() - timedelta(seconds=1)),))
+    db.conn.commit()
+
+
+def test_sends_queued_message(db, clock):
+    transport = FakeTransport()
+    outbox = dispatcher(db, transport, clock)
+    assert db.enqueue_messages([{"phone": "98765 43210", "message": "Hi"}]) == 1
+    deliver_next(outbox)
+    assert transport.sent == [("+919876543210", "Hi")]
+    row = outbox_row(db)
+    assert row["status"] == "sent"
+    assert row["attempts"] == 1
+    assert row["sent_at"]
+
+
+def test_failed_send_is_retried_after_a_backoff(db, clock):
+    transport = FakeTransport(failures=1)
+    outbox = dispatcher(db, transport, clock)
+    db.enqueue_messages([{"phone": "9876543210", "message": "Hi"}])
+    before = datetime.now()
+    deliver_next(outbox)
+    row = outbox_row(db)
+    assert row["status"] == "queued"
+    assert row["last_error"] == "network down"
+    retry_at = datetime.strptime(row["next_attempt_at"], "%Y-%m-%d %H:%M:%S")
+    assert timedelta(seconds=28) <= retry_at - before <= timedelta(seconds=32)
+    assert outbox.limiter.rate == 5.0  # Backed off
+
+    assert deliver_next(outbox) is None  # Not due yet
+    make_due(db)
+    deliver_next(outbox)
+    assert transport.sent == [("+919876543210", "Hi")]
+    assert outbox_row(db)["attempts"] == 2
+
+
+def test_gives_up_after_max_attempts(db, clock):
+    transport = FakeTransport(failures=5)
+    outbox = dispatcher(db, transport, clock, max_attempts=3)
+    db.enqueue_messages([{"phone": "9876543210", "message": "Hi"}])
+    for _ in range(3):
+        make_due(db)
+        deliver_next(outbox)
+    row = outbox_row(db)
+    assert row["status"] == "failed"
+    assert row["attempts"] == 3
+    assert db.get_outbox_counts()["failed"] == 1
+    assert db.retry_failed_messages() == 1
+    assert outbox_row(db)["status"] == "queued"
+
+
+def test_retry_delay_doubles_up_to_the_limit(db, clock):
+    outbox = dispatcher(db, FakeTransport(), clock)
+    assert [outbox.retry_delay_for(n) for n in range(1, 5)] == [30.0, 60.0, 100.0, 100.0]
+
+
+def test_worker_threads_send_everything(tmp_path):
+    from database import Database
+    db = Database(str(tmp_path / "gym.db"))  # Worker threads open their own connections
+    transport = FakeTransport()
+    transport.concurrency = 3
+    outbox = OutboxDispatcher(db, transport, limiter=AdaptiveRateLimiter(rate=1000, min_rate=1, max_rate=1000, burst=100))
+    db.enqueue_messages([{"phone": f"98765432{i:02d}", "message": f"Message {i}"} for i in range(20)])
+    outbox.start()
+    deadline = time.monotonic() + 10
+    while outbox.running and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert sorted(transport.sent) == sorted((f"+9198765432{i:02d}", f"Message {i}") for i in range(20))
+    assert db.get_outbox_counts()["sent"] == 20
+    db.close()
+
+
+def test_resume_leaves_another_process_sending_alone(db, clock):
+    db.enqueue_messages([{"phone": "9876543210", "message": "One"}, {"phone": "9876543211", "message": "Two"}])
+    mine = dispatcher(db, FakeTransport(), clock)
+    other = dispatcher(db, FakeTransport(), clock)
+    db.claim_next_message(mine.owner)  # Cut off when this process stopped
+    db.claim_next_message(other.owner)  # Still being sent by another process
+    assert db.requeue_interrupted_messages(mine.owner) == 1
+    assert [outbox_row(db, i)["status"] for i in (1, 2)] == ["queued", "sending"]
+    # A claim nobody has touched for longer than the lease is abandoned
+    assert db.requeue_interrupted_messages(mine.owner, stale_after=-60) == 1
+    assert outbox_row(db, 2)["status"] == "queued"
+
+
+def test_invalid_phone_numbers_are_failed_when_queued(db):
+    queued = db.enqueue_messages([{"phone": "12", "message": "Hi"}, {"phone": None, "message": "Hi"}])
+    assert queued == 0
+    assert [outbox_row(db, i)["last_error"] for i in (1, 2)] == ["Invalid phone number", "No phone number"]
@@ -0,0 +1,48 @@
+from datetime import date
+
+import pytest
+
+
+@pytest.fixture
+def payments(db, add_member):
+    """Two members with payments, several of them on the same day"""
+    asha, ravi = add_member("Asha"), add_member("Ravi")
+    for member_id, day in [(asha, 1), (ravi, 1), (asha, 2), (asha, 2), (ravi, 2), (ravi, 3), (asha, 4)]:
+        db.record_payment(member_id, 100.0 * day, date(2026, 3, day))
+    return asha, ravi
+
+
+def all_pages(db, limit, **filters):
+    """Walk query_payments page by page like the fee page does"""
+    rows, after = [], None
+    while True:
+        page = db.query_payments(limit=limit, after=after, **filters)
+        rows += page
+        if len(page) < limit:
+            return rows
+        after = (page[-1]["payment_date"], page[-1]["id"])
+
+
+def keys(rows):
+    return [(row["payment_date"], row["id"]) for row in rows]
+
+
+def test_newest_first(db, payments):
+    rows = db.query_payments(limit=100)
+    assert keys(rows) == sorted(keys(rows), reverse=True)
+    assert rows[0]["member_name"] == "Asha"
+
+
+def test_keyset_pages_cover_every_row_once(db, payments):
+    everything = db.query_payments(limit=100)
+    for limit in (1, 2, 3, 7):
+        assert keys(all_pages(db, limit)) == keys(everything)
+
+
+def test_filters(db, payments):
+    asha, ravi = payments
+    assert {row["member_id"] for row in db.query_payments(name_prefix="as")} == {asha}
+    assert {row["member_id"] for row in db.query_payments(member_id=ravi)} == {ravi}
+    in_range = db.query_payments(date_from=date(2026, 3, 2), date_to=date(2026, 3, 3))
+    assert sorted({row["payment_date"][:10] for row in in_range}) == ["2026-03-02", "2026-03-03"]
+    assert len(all_pages(db, 2, name_prefix="R")) == len(db.query_payments(member_id=ravi))
@@ -0,0 +1,49 @@
+import pytest
+
+from phone_numbers import e164_prefix, to_e164
+
+
+@pytest.mark.parametrize("phone, expected", [
+    ("9876543210", "+919876543210"),
+    ("98765 43210", "+919876543210"),
+    ("(987) 654-3210", "+919876543210"),
+    ("09876543210", "+919876543210"),
+    ("+91 98765 43210", "+919876543210"),
+    ("919876543210", "+919876543210"),
+    ("0044 20 7946 0958", "+442079460958"),
+    ("+44 20 7946 0958", "+442079460958"),
+])
+def test_to_e164_normalizes(phone, expected):
+    assert to_e164(phone) == expected
+
+
+@pytest.mark.parametrize("phone", [None, "", "   ", "12345", "not a number", "+1234567890123456",
+                                   "98765432", "987654321", "98765432101", "449876543210"])
+def test_to_e164_rejects_what_is_not_a_number(phone):
+    assert to_e164(phone) == ""
+
+
+def test_to_e164_uses_the_given_country_code():
+    assert to_e164("2079460958", country_code="44") == "+442079460958"
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("98765", "+9198765"),
+    ("098765", "+9198765"),
+    ("+44 20", "+4420"),
+    ("0044", "+44"),
+    ("919876543210", "+919876543210"),
+    ("asha", ""),
+    ("", ""),
+])
+def test_e164_prefix(query, expected):
+    assert e164_prefix(query) == expected
+
+
+def test_backfill_renormalizes_numbers_older_rules_accepted(db, add_member):
+    short, full = add_member("Asha", phone="98765432"), add_member("Ravi")
+    db.conn.execute("UPDATE members SET phone_norm = '+98765432' WHERE id = ?", (short,))
+    assert db.backfill_phone_norm() == 1
+    assert db.get_member(short)["phone_norm"] == ""
+    assert db.get_member(full)["phone_norm"] == "+919876543210"
+    assert db.backfill_phone_norm() == 0
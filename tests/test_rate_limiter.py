@@ -0,0 +1,52 @@
+from rate_limiter import AdaptiveRateLimiter, TokenBucket
+from readiness import FakeClock
+
+
+def test_token_bucket_paces_after_the_burst():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, burst=3, clock=clock, sleep=clock.sleep)
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+    assert bucket.wait_time() == 0.5
+    assert bucket.acquire()
+    assert clock.now == 0.5
+
+
+def test_token_bucket_acquire_gives_up_when_stopped():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=0.1, clock=clock, sleep=clock.sleep)
+    bucket.try_acquire()
+    assert not bucket.acquire(should_stop=lambda: clock.now >= 2)
+    assert clock.now < 10
+
+
+def limiter(clock, **kwargs):
+    return AdaptiveRateLimiter(rate=1.0, min_rate=0.5, max_rate=3.0, increase=0.5,
+                               clock=clock, sleep=clock.sleep, **kwargs)
+
+
+def test_speeds_up_on_success_up_to_max_rate():
+    rate_limiter = limiter(FakeClock())
+    rate_limiter.record_success(0.1)
+    assert rate_limiter.rate == 1.5
+    for _ in range(10):
+        rate_limiter.record_success(0.1)
+    assert rate_limiter.rate == 3.0
+
+
+def test_backs_off_on_failure_down_to_min_rate():
+    clock = FakeClock()
+    rate_limiter = limiter(clock)
+    rate_limiter.record_failure()
+    assert rate_limiter.rate == 0.5
+    rate_limiter.record_failure()
+    assert rate_limiter.rate == 0.5
+    # The failure also empties the bucket, so the next send waits a full interval
+    assert rate_limiter.wait_time() == 2.0
+
+
+def test_slows_down_when_sends_get_slow():
+    rate_limiter = limiter(FakeClock(), latency_target=1.0)
+    rate_limiter.record_success(0.5)
+    assert rate_limiter.rate == 1.5
+    rate_limiter.record_success(5.0)  # Smoothed latency 1.4s, over the target
+    assert rate_limiter.rate == 1.35
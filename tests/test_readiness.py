@@ -0,0 +1,48 @@
+from readiness import FakeClock, Readiness, ScriptedProbe, all_of
+
+
+def readiness(answers, timeout=5.0, **kwargs):
+    clock = FakeClock()
+    probe = ScriptedProbe(answers)
+    return Readiness(probe, timeout=timeout, clock=clock, sleep=clock.sleep, **kwargs), probe, clock
+
+
+def test_returns_as_soon_as_ready():
+    wait, probe, clock = readiness([False, False, True], interval=0.25)
+    assert wait.wait()
+    assert probe.polls == 3
+    assert probe.resets == 1
+    assert clock.now == 0.5
+
+
+def test_times_out():
+    wait, probe, clock = readiness([False], timeout=2.0, interval=0.25)
+    assert not wait.wait()
+    assert clock.now == 2.0
+    assert probe.polls == 9
+
+
+def test_falls_back_to_a_fixed_wait_when_the_probe_cannot_tell():
+    wait, probe, clock = readiness([None], fallback=3.0)
+    assert wait.wait()
+    assert probe.polls == 1
+    assert clock.slept == 3.0
+
+
+def test_fallback_wait_is_capped_by_the_timeout():
+    wait, _, clock = readiness([None], timeout=1.0, fallback=3.0)
+    assert wait.wait()
+    assert clock.slept == 1.0
+
+
+def test_all_of():
+    assert all_of(ScriptedProbe([True]), ScriptedProbe([None]))() is True
+    assert all_of(ScriptedProbe([True]), ScriptedProbe([False]))() is False
+    assert all_of(ScriptedProbe([None]), ScriptedProbe([None]))() is None
+
+
+def test_all_of_resets_every_probe():
+    probes = [ScriptedProbe([True]), ScriptedProbe([True])]
+    clock = FakeClock()
+    assert Readiness(all_of(*probes), timeout=1.0, clock=clock, sleep=clock.sleep).wait()
+    assert [p.resets for p in probes] == [1, 1]
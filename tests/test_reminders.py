@@ -0,0 +1,70 @@
+from datetime import date, datetime, time
+
+from reminders import ReminderScheduler, due_reminders, parse_times, queue_due_reminders
+
+DUE = date(2026, 2, 5)  # Members joining on 2026-01-05 pay monthly from here
+
+
+def test_queue_due_reminders_skips_ones_already_queued(db, add_member):
+    add_member("Asha")
+    add_member("Ravi", join_date=date(2026, 1, 6))  # Due the day after
+    assert queue_due_reminders(db, DUE) == 1
+    assert queue_due_reminders(db, DUE) == 0
+    assert queue_due_reminders(db, date(2026, 2, 6)) == 1
+
+
+def test_parse_times():
+    assert parse_times("18:30, 09:00,09:00") == [time(9), time(18, 30)]
+
+
+def test_scheduler_next_run():
+    scheduler = ReminderScheduler(None, None, parse_times("09:00,18:00"))
+    assert scheduler.next_run(datetime(2026, 2, 4, 8)) == datetime(2026, 2, 4, 9)
+    assert scheduler.next_run(datetime(2026, 2, 4, 9)) == datetime(2026, 2, 4, 18)
+    assert scheduler.next_run(datetime(2026, 2, 4, 19)) == datetime(2026, 2, 5, 9)
+
+
+def test_scheduler_run_once_starts_the_outbox_only_when_something_was_queued(db):
+    class Outbox:
+        started = 0
+
+        def start(self):
+            self.started += 1
+    outbox = Outbox()
+    scheduler = ReminderScheduler(db, outbox)
+    assert scheduler.run_once() == 0
+    assert outbox.started == 0
+
+
+def test_get_due_on_lists_memberships_and_lockers(db, add_member):
+    asha = add_member("Asha")
+    add_member("Ravi", join_date=date(2026, 1, 6))  # Due the day after
+    db.assign_locker(asha, "L7", 100.0, "Monthly", date(2026, 1, 5))
+    dues = db.get_due_on(DUE)
+    assert [(d["kind"], d["member_id"]) for d in dues] == [("locker", asha), ("membership", asha)]
+    assert dues[0]["locker_number"] == "L7"
+    assert dues[1]["phone"] == "+919876543210"
+    assert [d["kind"] for d in db.get_due_on(DUE, kinds=("membership",))] == ["membership"]
+    assert db.get_due_on(DUE, kinds=()) == []
+
+
+def test_get_due_on_skips_removed_members(db, add_member):
+    db.remove_member(add_member("Asha"))
+    assert db.get_due_on(DUE) == []
+
+
+def test_due_reminders_use_the_stored_templates(db, add_member):
+    add_member("Asha")
+    db.save_message_template("membership_reminder", "{name}: ₹{amount} on {due_date}")
+    [reminder] = due_reminders(db, DUE)
+    assert reminder["message"] == "Asha: ₹500.00 on 2026-02-05"
+    assert reminder["kind"] == "membership_reminder"
+
+
+def test_each_locker_due_the_same_day_gets_its_reminder(db, add_member):
+    asha = add_member("Asha")
+    db.assign_locker(asha, "L7", 100.0, "Monthly", date(2026, 1, 5))
+    db.assign_locker(asha, "L8", 100.0, "Monthly", date(2026, 1, 5))
+    assert queue_due_reminders(db, DUE) == 3
+    assert queue_due_reminders(db, DUE) == 0
+    assert db.filter_unsent_reminders(due_reminders(db, DUE)) == []
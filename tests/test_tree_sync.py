@@ -0,0 +1,102 @@
+"""sync_treeview against an in-memory stand-in for ttk.Treeview (no display needed)"""
+from tree_sync import sync_treeview
+
+
+class FakeTree:
+    """The parts of ttk.Treeview that sync_treeview uses, for a flat list"""
+
+    def __init__(self):
+        self.order = []
+        self.items = {}  # iid -> {"-values": ..., "-tags": ...}
+        self.tk = self
+        self.calls = []
+
+    # Tk interpreter calls used to read item options
+    def call(self, tree, command, iid, option):
+        return self.items[iid][option]
+
+    def splitlist(self, value):
+        return tuple(value)
+
+    def get_children(self, parent=""):
+        return tuple(self.order)
+
+    def insert(self, parent, index, iid, values, tags):
+        self.calls.append(("insert", iid))
+        self.order.insert(index, iid)
+        self.items[iid] = {"-values": tuple(values), "-tags": tuple(tags)}
+
+    def item(self, iid, values, tags):
+        self.calls.append(("item", iid))
+        self.items[iid] = {"-values": tuple(values), "-tags": tuple(tags)}
+
+    def move(self, iid, parent, index):
+        self.calls.append(("move", iid))
+        self.order.remove(iid)
+        self.order.insert(len(self.order) if index == "end" else index, iid)
+
+    def delete(self, iid):
+        self.calls.append(("delete", iid))
+        self.order.remove(iid)
+        del self.items[iid]
+
+    def rows(self):
+        return [(iid, self.items[iid]["-values"]) for iid in self.order]
+
+
+def rows(*names, tags=()):
+    return [(i, (name,), tags) for i, name in names]
+
+
+def test_first_sync_inserts_everything():
+    tree = FakeTree()
+    stats = sync_treeview(tree, rows((1, "Asha"), (2, "Ravi")))
+    assert stats == {"inserted": 2, "updated": 0, "moved": 0, "deleted": 0}
+    assert tree.rows() == [("1", ("Asha",)), ("2", ("Ravi",))]
+
+
+def test_unchanged_rows_are_not_touched():
+    tree = FakeTree()
+    sync_treeview(tree, rows((1, "Asha"), (2, "Ravi")))
+    tree.calls.clear()
+    assert sync_treeview(tree, rows((1, "Asha"), (2, "Ravi"))) == {"inserted": 0, "updated": 0, "moved": 0, "deleted": 0}
+    assert tree.calls == []
+
+
+def test_only_changed_rows_are_updated():
+    tree = FakeTree()
+    sync_treeview(tree, rows((1, "Asha"), (2, "Ravi"), (3, "Mira")))
+    tree.calls.clear()
+    stats = sync_treeview(tree, rows((1, "Asha"), (3, "Mira K"), (4, "Dev")))
+    assert stats == {"inserted": 1, "updated": 1, "moved": 0, "deleted": 1}
+    assert tree.rows() == [("1", ("Asha",)), ("3", ("Mira K",)), ("4", ("Dev",))]
+    assert sorted(tree.calls) == [("delete", "2"), ("insert", "4"), ("item", "3")]
+
+
+def test_values_are_compared_as_displayed_text():
+    tree = FakeTree()
+    sync_treeview(tree, [(1, (500.0, "007"), ())])
+    tree.items["1"]["-values"] = ("500.0", "007")  # What Tk hands back
+    assert sync_treeview(tree, [(1, (500.0, "007"), ())])["updated"] == 0
+
+
+def test_tag_changes_update_the_row():
+    tree = FakeTree()
+    sync_treeview(tree, rows((1, "Asha")))
+    assert sync_treeview(tree, rows((1, "Asha"), tags=("overdue",)))["updated"] == 1
+
+
+def test_reordering_moves_as_few_rows_as_possible():
+    tree = FakeTree()
+    sync_treeview(tree, rows(*[(i, f"Member {i}") for i in range(1, 7)]))
+    wanted = [6, 1, 2, 3, 4, 5]
+    stats = sync_treeview(tree, rows(*[(i, f"Member {i}") for i in wanted]))
+    assert stats["moved"] == 1
+    assert tree.order == [str(i) for i in wanted]
+
+
+def test_reversal_ends_in_the_right_order():
+    tree = FakeTree()
+    sync_treeview(tree, rows(*[(i, str(i)) for i in range(10)]))
+    sync_treeview(tree, rows(*[(i, str(i)) for i in reversed(range(10))]))
+    assert tree.order == [str(i) for i in reversed(range(10))]
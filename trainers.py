@@ -6,8 +6,11 @@ import customtkinter as ctk
 from tkinter import ttk, messagebox
 from datetime import date, datetime
 from typing import List, Dict, Optional
+from tree_sync import sync_treeview
 
 class Trainers(ctk.CTkFrame):
+    tables = ("staff", "members")  # Reloaded when one of these changed while hidden
+    
     def __init__(self, parent, db):
         super().__init__(parent, fg_color="#ffffff")
         self.db = db
@@ -240,20 +243,15 @@ class Trainers(ctk.CTkFrame):
     
     def refresh_table(self):
         """Refresh the members table"""
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
         if not self.current_trainer_id:
+            sync_treeview(self.tree, [])
             return
         
         # Get members for selected trainer
         members = self.db.get_members_for_trainer(self.current_trainer_id, active_only=True)
         
-        if not members:
-            return
-        
-        # Populate table
+        # Update the table in place (only new or changed rows are touched)
+        rows = []
         for member in members:
             values = (
                 member.get('id', ''),
@@ -268,7 +266,8 @@ class Trainers(ctk.CTkFrame):
                 member.get('next_payment_date', '') or 'N/A',
                 member.get('status', 'active').title()
             )
-            self.tree.insert("", "end", values=values)
+            rows.append((member['id'], values, ()))
+        sync_treeview(self.tree, rows)
     
     def refresh_data(self):
         """Refresh all data"""
@@ -276,3 +275,13 @@ class Trainers(ctk.CTkFrame):
         if self.current_trainer_id:
             self.refresh_table()
             self.update_summary()
+    
+    def refresh(self):
+        """Reload trainers and members after data changed elsewhere, keeping the selection"""
+        selected = self.trainer_combo.get()
+        self.load_trainers()
+        if selected not in self.trainer_combo.cget("values"):
+            selected = None
+        else:
+            self.trainer_combo.set(selected)
+        self.on_trainer_selected(selected)
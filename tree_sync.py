@@ -0,0 +1,109 @@
+"""
+Treeview Sync Module
+Keyed reconciliation for ttk.Treeview lists: instead of deleting every item and
+inserting them again, only the rows that were added, changed, moved or removed
+are touched. Items keep their IDs, so scroll position and selection survive.
+"""
+from typing import Dict, Iterable, Sequence, Tuple
+
+Row = Tuple[object, Sequence, Sequence]  # (key, values, tags)
+
+
+def _same(current: Sequence, wanted: Sequence) -> bool:
+    """Compare item values as the strings Tk displays"""
+    if len(current) != len(wanted):
+        return False
+    return all(str(a) == str(b) for a, b in zip(current, wanted))
+
+
+def _item_option(tree, iid: str, option: str) -> tuple:
+    """Raw item option from Tk; Treeview.item() would turn "007" into 7"""
+    return tree.tk.splitlist(tree.tk.call(tree, "item", iid, option))
+
+
+def item_matches(tree, iid: str, values: Sequence, tags: Sequence) -> bool:
+    """True if the item already shows these values and tags"""
+    return _same(_item_option(tree, iid, "-values"), values) and _same(_item_option(tree, iid, "-tags"), tags)
+
+
+def sync_treeview(tree, rows: Iterable[Row], parent: str = "") -> Dict[str, int]:
+    """
+    Make the children of `parent` match `rows`, in order.
+
+    Each row is (key, values, tags); the key becomes the item ID, so it must be
+    unique within the list. Returns how many items were inserted, updated, moved
+    and deleted.
+    """
+    rows = [(str(key), tuple(values), tuple(tags)) for key, values, tags in rows]
+    wanted = {iid for iid, _, _ in rows}
+    stats = {"inserted": 0, "updated": 0, "moved": 0, "deleted": 0}
+
+    # Delete items that are gone (including unkeyed items from an older refresh)
+    order = []
+    for item in tree.get_children(parent):
+        if item in wanted:
+            order.append(item)
+        else:
+            tree.delete(item)
+            stats["deleted"] += 1
+
+    # Items on the longest run already in the right relative order stay put;
+    # only the others are moved
+    position = {item: i for i, item in enumerate(order)}
+    stay = _longest_increasing_run([iid for iid, _, _ in rows if iid in position], position)
+
+    for index, (iid, values, tags) in enumerate(rows):
+        if iid not in position:
+            tree.insert(parent, index, iid=iid, values=values, tags=tags)
+            order.insert(index, iid)
+            stats["inserted"] += 1
+            continue
+
+        if not item_matches(tree, iid, values, tags):
+            tree.item(iid, values=values, tags=tags)
+            stats["updated"] += 1
+
+        if order[index] == iid:
+            continue
+        if iid in stay:
+            # Push the out-of-place items in front of it to the end; they are moved
+            # to their own place when their turn comes
+            while order[index] != iid:
+                blocker = order.pop(index)
+                tree.move(blocker, parent, "end")
+                order.append(blocker)
+                stats["moved"] += 1
+        else:
+            tree.move(iid, parent, index)
+            order.remove(iid)
+            order.insert(index, iid)
+            stats["moved"] += 1
+
+    return stats
+
+
+def _longest_increasing_run(items, position) -> set:
+    """Items forming the longest subsequence whose current positions increase"""
+    tails = []  # tails[k] = index into items of the smallest tail of a run of length k+1
+    previous = [None] * len(items)
+    for i, item in enumerate(items):
+        pos = position[item]
+        lo, hi = 0, len(tails)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if position[items[tails[mid]]] < pos:
+                lo = mid + 1
+            else:
+                hi = mid
+        previous[i] = tails[lo - 1] if lo else None
+        if lo == len(tails):
+            tails.append(i)
+        else:
+            tails[lo] = i
+
+    run = set()
+    i = tails[-1] if tails else None
+    while i is not None:
+        run.add(items[i])
+        i = previous[i]
+    return run
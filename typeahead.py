@@ -0,0 +1,145 @@
+"""
+Typeahead Module - CustomTkinter
+Search-as-you-type picker used instead of dropdowns that list every member
+or staff member. Each keystroke asks for the top few matches only.
+"""
+import tkinter as tk
+import customtkinter as ctk
+from typing import Callable, Dict, List, Optional
+from search_controller import SearchController
+
+
+class TypeaheadEntry(ctk.CTkFrame):
+    def __init__(self, master, search: Callable[[str, int], List[Dict]], format_item: Callable[[Dict], str],
+                 command: Optional[Callable[[Dict], None]] = None, limit: int = 12,
+                 placeholder_text: str = "Type to search...", **entry_kwargs):
+        """
+        Args:
+            search: search(query, limit) returns the best matching records (runs on a worker thread)
+            format_item: display text of a record
+            command: called with the record when one is picked
+            limit: most suggestions shown at once
+        """
+        super().__init__(master, fg_color="transparent")
+        self.search = search
+        self.format_item = format_item
+        self.command = command
+        self.limit = limit
+        self.selected: Optional[Dict] = None
+        self.results: List[Dict] = []
+        self._popup = None
+        self._listbox = None
+
+        self.entry = ctk.CTkEntry(self, placeholder_text=placeholder_text, **entry_kwargs)
+        self.entry.pack(fill="x")
+
+        self.controller = SearchController(self, lambda query: self.search(query, self.limit),
+                                           self._show_results, get_query=self.entry.get, delay_ms=120)
+
+        self.entry.bind("<KeyRelease>", self._on_key)
+        self.entry.bind("<Down>", lambda e: self._move(1))
+        self.entry.bind("<Up>", lambda e: self._move(-1))
+        self.entry.bind("<Return>", lambda e: self._choose())
+        self.entry.bind("<Escape>", lambda e: self.hide())
+        self.entry.bind("<FocusIn>", lambda e: self.controller.search_now())
+        # Let a click on a suggestion land before the list closes
+        self.entry.bind("<FocusOut>", lambda e: self.after(150, self.hide))
+
+    # Selection
+
+    def get(self) -> str:
+        """Display text of the picked record, or "" if nothing is picked"""
+        return self.format_item(self.selected) if self.selected else ""
+
+    def get_selected(self) -> Optional[Dict]:
+        """The picked record"""
+        return self.selected
+
+    def set(self, record: Optional[Dict]):
+        """Pick a record (None clears the picker)"""
+        self.selected = record
+        self.entry.delete(0, "end")
+        if record:
+            self.entry.insert(0, self.format_item(record))
+
+    def clear(self):
+        self.set(None)
+        self.hide()
+
+    # Suggestions
+
+    def _on_key(self, event):
+        if event.keysym in ("Up", "Down", "Return", "Escape", "Tab"):
+            return
+        if self.selected and self.entry.get() != self.format_item(self.selected):
+            self.selected = None  # Typing again starts a new search
+        self.controller.schedule()
+
+    def _show_results(self, results: List[Dict]):
+        if not self._has_focus():
+            return  # Focus moved on while the search ran
+        self.results = results
+        if not results:
+            self.hide()
+            return
+
+        if self._popup is None:
+            self._popup = tk.Toplevel(self)
+            self._popup.overrideredirect(True)
+            self._listbox = tk.Listbox(self._popup, activestyle="none", exportselection=False,
+                                       relief="flat", highlightthickness=1, highlightcolor="#cbd5e1",
+                                       selectbackground="#3b82f6", selectforeground="#ffffff",
+                                       font=("Segoe UI", 12))
+            self._listbox.pack(fill="both", expand=True)
+            self._listbox.bind("<ButtonRelease-1>", lambda e: self._choose())
+
+        self._listbox.delete(0, "end")
+        for record in results:
+            self._listbox.insert("end", self.format_item(record))
+        self._listbox.configure(height=len(results))
+        self._listbox.selection_set(0)
+
+        x = self.entry.winfo_rootx()
+        y = self.entry.winfo_rooty() + self.entry.winfo_height()
+        self._popup.geometry(f"{self.entry.winfo_width()}x{self._listbox.winfo_reqheight()}+{x}+{y}")
+        self._popup.deiconify()
+        self._popup.lift()
+
+    def _move(self, step: int):
+        """Move the highlighted suggestion"""
+        if not self._visible():
+            self.controller.search_now()
+            return "break"
+        current = self._listbox.curselection()
+        index = (current[0] + step) if current else 0
+        index = max(0, min(index, len(self.results) - 1))
+        self._listbox.selection_clear(0, "end")
+        self._listbox.selection_set(index)
+        self._listbox.see(index)
+        return "break"
+
+    def _choose(self):
+        """Pick the highlighted suggestion"""
+        if not self._visible():
+            return "break"
+        current = self._listbox.curselection()
+        if current and current[0] < len(self.results):
+            self.set(self.results[current[0]])
+            self.hide()
+            if self.command:
+                self.command(self.selected)
+        return "break"
+
+    def _has_focus(self) -> bool:
+        try:
+            focus = self.focus_get()
+        except KeyError:  # Focus is in a widget Tkinter doesn't know (e.g. a dialog)
+            return False
+        return focus is not None and str(focus).startswith(str(self.entry))
+
+    def _visible(self) -> bool:
+        return self._popup is not None and self._popup.winfo_viewable()
+
+    def hide(self):
+        if self._popup is not None and self._popup.winfo_exists():
+            self._popup.withdraw()
@@ -0,0 +1,179 @@
+"""
+Virtual List Module - CustomTkinter
+Checkbox list that keeps a fixed pool of row widgets and binds them to
+whichever records are scrolled into view. Building and scrolling cost
+depends on the number of visible rows, not on the number of records.
+"""
+import customtkinter as ctk
+from typing import Callable, Dict, List, Sequence, Tuple
+
+
+class VirtualCheckList(ctk.CTkFrame):
+    def __init__(self, master, row_key: Callable[[Dict], object], row_text: Callable[[Dict], Tuple[str, str]],
+                 height: int = 200, row_height: int = 36, empty_text: str = "No items found",
+                 stripe_colors: Sequence[str] = ("white", "#f8fafc"), **kwargs):
+        """
+        Args:
+            row_key: unique key of a record (what the selection holds)
+            row_text: (main text, side text) shown for a record
+            row_height: height of one row in pixels
+            empty_text: shown when there are no records
+        """
+        super().__init__(master, height=height, **kwargs)
+        self.row_key = row_key
+        self.row_text = row_text
+        self.row_height = row_height
+        self.stripe_colors = stripe_colors
+
+        self.records: List[Dict] = []
+        self.selected = set()  # Keys of checked records (kept when records change)
+        self.first_row = 0
+        self._visible_rows = max(1, height // row_height)
+        self._pool: List[dict] = []  # Row widgets plus what they currently show
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_propagate(False)
+
+        self.body = ctk.CTkFrame(self, fg_color="transparent")
+        self.body.grid(row=0, column=0, sticky="nsew", padx=(2, 0), pady=2)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.yview)
+        self.scrollbar.grid(row=0, column=1, sticky="ns", pady=2)
+
+        self.empty_label = ctk.CTkLabel(self.body, text=empty_text, font=ctk.CTkFont(size=13),
+                                        text_color="#64748b")
+
+        self.body.bind("<Configure>", self._on_configure)
+        self._bind_scrolling(self.body)
+
+    # Data
+
+    def set_rows(self, records: List[Dict]):
+        """Show a new list of records from the top"""
+        self.records = records
+        self.first_row = 0
+        self._render()
+
+    def select_all(self):
+        """Check every record currently in the list"""
+        self.selected.update(self.row_key(r) for r in self.records)
+        self._render()
+
+    def deselect_all(self):
+        """Uncheck everything, including records filtered out of view"""
+        self.selected.clear()
+        self._render()
+
+    # Drawing
+
+    def _make_row(self) -> dict:
+        frame = ctk.CTkFrame(self.body, corner_radius=4, height=self.row_height - 4)
+        slot = {'frame': frame, 'key': None, 'shown': None}
+        slot['checkbox'] = ctk.CTkCheckBox(frame, text="", width=20,
+                                           command=lambda: self._on_toggle(slot))
+        slot['checkbox'].pack(side="left", padx=10, pady=4)
+        slot['info'] = ctk.CTkLabel(frame, text="", font=ctk.CTkFont(size=12), text_color="#1e293b", anchor="w")
+        slot['info'].pack(side="left", padx=10, pady=4, fill="x", expand=True)
+        slot['side'] = ctk.CTkLabel(frame, text="", font=ctk.CTkFont(size=11), text_color="#64748b", anchor="e")
+        slot['side'].pack(side="right", padx=10, pady=4)
+        for widget in (frame, slot['checkbox'], slot['info'], slot['side']):
+            self._bind_scrolling(widget)
+        return slot
+
+    def _render(self):
+        total = len(self.records)
+        self.first_row = max(0, min(self.first_row, total - self._visible_rows))
+        count = max(0, min(self._visible_rows, total - self.first_row))
+
+        if total:
+            self.empty_label.pack_forget()
+        else:
+            self.empty_label.pack(pady=20)
+
+        while len(self._pool) < count:
+            self._pool.append(self._make_row())
+
+        for offset, slot in enumerate(self._pool):
+            if offset >= count:
+                if slot['shown'] is not None:
+                    slot['frame'].pack_forget()
+                    slot['shown'] = slot['key'] = None
+                continue
+
+            row = self.first_row + offset
+            record = self.records[row]
+            key = self.row_key(record)
+            info, side = self.row_text(record)
+            shown = (key, info, side, key in self.selected, row % len(self.stripe_colors))
+            if shown == slot['shown']:
+                continue  # Already showing this row
+
+            previous = slot['shown']
+            if previous is None:
+                slot['frame'].pack(fill="x", padx=5, pady=2)
+            if previous is None or previous[4] != shown[4]:
+                slot['frame'].configure(fg_color=self.stripe_colors[shown[4]])
+            if previous is None or previous[1:3] != (info, side):
+                slot['info'].configure(text=info)
+                slot['side'].configure(text=side)
+            if previous is None or previous[3] != shown[3]:
+                if shown[3]:
+                    slot['checkbox'].select()
+                else:
+                    slot['checkbox'].deselect()
+            slot['key'] = key
+            slot['shown'] = shown
+
+        self.scrollbar.set(*self._fraction())
+
+    def _on_toggle(self, slot: dict):
+        key = slot['key']
+        if key is None:
+            return
+        checked = bool(slot['checkbox'].get())
+        if checked:
+            self.selected.add(key)
+        else:
+            self.selected.discard(key)
+        slot['shown'] = slot['shown'][:3] + (checked,) + slot['shown'][4:]
+
+    def _on_configure(self, event):
+        """Fit the number of rows to the list height"""
+        visible = max(1, event.height // self.row_height)
+        if visible != self._visible_rows:
+            self._visible_rows = visible
+            self._render()
+
+    # Scrolling
+
+    def _fraction(self) -> Tuple[float, float]:
+        total = len(self.records)
+        if not total:
+            return 0.0, 1.0
+        return self.first_row / total, min(1.0, (self.first_row + self._visible_rows) / total)
+
+    def yview(self, *args):
+        """Scrollbar command"""
+        if args and args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * len(self.records)))
+        elif args and args[0] == "scroll":
+            amount = int(args[1])
+            if args[2] == "pages":
+                amount *= self._visible_rows
+            self.scroll_to(self.first_row + amount)
+
+    def scroll_to(self, first_row: int):
+        first_row = max(0, min(first_row, len(self.records) - self._visible_rows))
+        if first_row != self.first_row:
+            self.first_row = first_row
+            self._render()
+
+    def _bind_scrolling(self, widget):
+        widget.bind("<MouseWheel>", self._on_mousewheel, add="+")
+        widget.bind("<Button-4>", lambda e: self.scroll_to(self.first_row - 3), add="+")
+        widget.bind("<Button-5>", lambda e: self.scroll_to(self.first_row + 3), add="+")
+
+    def _on_mousewheel(self, event):
+        # Windows reports multiples of 120, macOS small deltas
+        step = -event.delta // 120 if abs(event.delta) >= 120 else -event.delta
+        self.scroll_to(self.first_row + step * 3)
@@ -0,0 +1,270 @@
+"""
+Virtual Table Module
+ttk.Treeview that only keeps the visible window of rows on screen.
+Rows are fetched in pages from a data source as the user scrolls, and the
+same Treeview items are reused for whichever rows are currently visible.
+"""
+from tkinter import ttk
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from tree_sync import item_matches
+
+
+class VirtualTreeview(ttk.Treeview):
+    def __init__(self, master, count_rows: Callable[[], int],
+                 fetch_rows: Callable[[int, int], List], row_key: Callable, row_values: Callable,
+                 stripe_tags: Sequence[str] = ("evenrow", "oddrow"), untracked_columns: Sequence[int] = (),
+                 overscan: int = 20, **kwargs):
+        """
+        Args:
+            count_rows: returns the total number of rows
+            fetch_rows: fetch_rows(offset, limit) returns that slice of row records
+            row_key: unique key of a record (also added as a row tag)
+            row_values: column values for a record, computed when the row is drawn
+            stripe_tags: alternating row tags by absolute row number
+            untracked_columns: column indexes whose changes don't count as edits (e.g. checkboxes)
+            overscan: extra rows fetched above and below the visible window
+        """
+        super().__init__(master, **kwargs)
+        self.count_rows = count_rows
+        self.fetch_rows = fetch_rows
+        self.row_key = row_key
+        self.row_values = row_values
+        self.stripe_tags = stripe_tags
+        self.untracked_columns = set(untracked_columns)
+        self.overscan = overscan
+
+        self.total_rows = 0
+        self.first_row = 0
+        self._visible_rows = int(kwargs.get("height", 10))
+        self._cache: Dict[int, object] = {}  # absolute row number -> record
+        self._slot_records: Dict[str, object] = {}  # Treeview item -> record drawn in it
+        self._edits: Dict[object, tuple] = {}  # row key -> edited values
+        self._selected_keys = set()
+        self._scrollbar = None
+        self._rendering = False
+
+        self.bind("<Configure>", self._on_configure, add="+")
+        self.bind("<<TreeviewSelect>>", self._on_select, add="+")
+        self.bind("<MouseWheel>", self._on_mousewheel, add="+")
+        self.bind("<Button-4>", lambda e: self._scroll_by(-3), add="+")
+        self.bind("<Button-5>", lambda e: self._scroll_by(3), add="+")
+        self.bind("<Up>", lambda e: self._on_arrow(-1), add="+")
+        self.bind("<Down>", lambda e: self._on_arrow(1), add="+")
+        self.bind("<Prior>", lambda e: self._scroll_by(-self._visible_rows), add="+")
+        self.bind("<Next>", lambda e: self._scroll_by(self._visible_rows), add="+")
+
+    # Data
+
+    def reload(self, keep_position: bool = True, prefetched: Optional[Tuple[int, List]] = None):
+        """
+        Re-count and re-fetch rows (edits are kept, see clear_edits).
+        prefetched=(total, first_rows) uses a count and leading rows that were already
+        fetched elsewhere (e.g. by a background search) instead of querying again.
+        """
+        self._cache.clear()
+        if prefetched is not None:
+            self.total_rows, first_rows = prefetched
+            self._cache.update(enumerate(first_rows))
+        else:
+            self.total_rows = self.count_rows()
+        if not keep_position:
+            self.first_row = 0
+            self._selected_keys.clear()
+        self._render()
+
+    def first_page_size(self) -> int:
+        """How many leading rows to prefetch for reload(prefetched=...)"""
+        return self._visible_rows + 2 * self.overscan
+
+    def redraw(self):
+        """Redraw the visible rows from cached records (e.g. after checkbox state changed)"""
+        self._render()
+
+    def _ensure_cached(self, start: int, end: int):
+        """Fetch the rows start..end (plus overscan) that aren't cached yet"""
+        if all(i in self._cache for i in range(start, end)):
+            return
+        offset = max(0, start - self.overscan)
+        limit = (end - start) + 2 * self.overscan
+        for i, record in enumerate(self.fetch_rows(offset, limit)):
+            self._cache[offset + i] = record
+
+        # Only keep a few windows' worth of rows around
+        keep = 4 * (self._visible_rows + 2 * self.overscan)
+        if len(self._cache) > keep:
+            for i in [i for i in self._cache if abs(i - start) > keep // 2]:
+                del self._cache[i]
+
+    # Drawing
+
+    def _render(self):
+        self.first_row = max(0, min(self.first_row, self.total_rows - self._visible_rows))
+        count = max(0, min(self._visible_rows, self.total_rows - self.first_row))
+        self._ensure_cached(self.first_row, self.first_row + count)
+
+        self._rendering = True
+        try:
+            # Reuse existing items; only add or remove items when the window size changes
+            slots = list(self.get_children())
+            for item in slots[count:]:
+                self.delete(item)
+                self._slot_records.pop(item, None)
+            slots = slots[:count]
+            while len(slots) < count:
+                slots.append(self.insert("", "end"))
+
+            selected = []
+            for offset, item in enumerate(slots):
+                row = self.first_row + offset
+                record = self._cache.get(row)
+                if record is None:
+                    continue
+                key = self.row_key(record)
+                self._slot_records[item] = record
+                values = self._display_values(record, key)
+                tags = (self.stripe_tags[row % len(self.stripe_tags)], str(key))
+                # Only touch rows whose content changed
+                if not item_matches(self, item, values, tags):
+                    super().item(item, values=values, tags=tags)
+                if key in self._selected_keys:
+                    selected.append(item)
+            self.selection_set(selected)
+        finally:
+            self._rendering = False
+        self._update_scrollbar()
+
+    def _display_values(self, record, key) -> tuple:
+        """Row values with any unsaved edits applied"""
+        values = self.row_values(record)
+        edited = self._edits.get(key)
+        if edited is None:
+            return values
+        if not self._differs(edited, values):
+            # The saved data caught up with the edit
+            del self._edits[key]
+            return values
+        return tuple(values[i] if i in self.untracked_columns else edited[i] for i in range(len(values)))
+
+    # Scrolling
+
+    def attach_scrollbar(self, scrollbar):
+        """Drive a vertical scrollbar from the virtual position (use instead of yscrollcommand)"""
+        self._scrollbar = scrollbar
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        if self._scrollbar is not None:
+            self._scrollbar.set(*self.yview())
+
+    def yview(self, *args):
+        """Scrollbar command; with no arguments returns the visible fraction like Treeview.yview"""
+        if not args:
+            if not self.total_rows:
+                return (0.0, 1.0)
+            return (self.first_row / self.total_rows,
+                    min(1.0, (self.first_row + self._visible_rows) / self.total_rows))
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * self.total_rows))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            if args[2] == "pages":
+                amount *= self._visible_rows
+            self._scroll_by(amount)
+
+    def scroll_to(self, first_row: int):
+        """Show rows starting at first_row"""
+        first_row = max(0, min(first_row, self.total_rows - self._visible_rows))
+        if first_row != self.first_row:
+            # Let the owner close in-place editors before rows move under them
+            self.event_generate("<<VirtualTreeviewScroll>>")
+            self.first_row = first_row
+            self._render()
+
+    def _scroll_by(self, rows: int):
+        self.scroll_to(self.first_row + rows)
+        return "break"
+
+    def _on_mousewheel(self, event):
+        # Windows reports multiples of 120, macOS small deltas
+        step = -event.delta // 120 if abs(event.delta) >= 120 else -event.delta
+        return self._scroll_by(step * 3)
+
+    def _on_arrow(self, direction: int):
+        """Scroll when the arrow keys move past the first or last visible row"""
+        slots = self.get_children()
+        focus = self.focus()
+        if not slots or focus not in slots:
+            return None
+        index = slots.index(focus)
+        if (direction < 0 and index > 0) or (direction > 0 and index < len(slots) - 1):
+            return None  # Normal Treeview navigation inside the window
+        before = self.first_row
+        self.scroll_to(self.first_row + direction)
+        if self.first_row != before:
+            item = self.get_children()[index]
+            self._selected_keys = {self.row_key(self._slot_records[item])}
+            self._render()
+            self.focus(item)
+        return "break"
+
+    def _on_configure(self, event=None):
+        """Fit the number of materialized rows to the widget height"""
+        height = self.winfo_height()
+        if height <= 1:
+            return
+        style = ttk.Style()
+        rowheight = int(style.lookup(self.cget("style") or "Treeview", "rowheight") or 20)
+        slots = self.get_children()
+        bbox = self.bbox(slots[0]) if slots else None
+        if bbox:
+            heading = bbox[1]
+        else:
+            # Measure the heading once a row has been drawn
+            heading = rowheight + 8
+            self.after_idle(self._on_configure)
+        visible = max(1, (height - heading) // rowheight)
+        if visible != self._visible_rows:
+            self._visible_rows = visible
+            self._render()
+
+    # Selection and edits
+
+    def _on_select(self, event=None):
+        if self._rendering:
+            return
+        # Selection is remembered by row key so it survives scrolling
+        visible_keys = {self.row_key(r) for r in self._slot_records.values()}
+        self._selected_keys -= visible_keys
+        self._selected_keys.update(self.row_key(self._slot_records[i]) for i in self.selection()
+                                   if i in self._slot_records)
+
+    def key_for_item(self, item):
+        """Row key of the record drawn in a Treeview item"""
+        record = self._slot_records.get(item)
+        return self.row_key(record) if record is not None else None
+
+    def item(self, item, option=None, **kw):
+        """Treeview.item that remembers edited values for the row, so edits survive scrolling"""
+        if "values" in kw and not self._rendering and item in self._slot_records:
+            record = self._slot_records[item]
+            key = self.row_key(record)
+            original = self.row_values(record)
+            values = tuple(kw["values"])
+            if self._differs(values, original):
+                self._edits[key] = values
+            else:
+                self._edits.pop(key, None)
+        return super().item(item, option, **kw)
+
+    def _differs(self, values, original) -> bool:
+        """True if values differ from original outside the untracked columns"""
+        return any(str(values[i]) != str(original[i])
+                   for i in range(min(len(values), len(original)))
+                   if i not in self.untracked_columns)
+
+    def edited_rows(self) -> Dict[object, tuple]:
+        """Unsaved edited values by row key"""
+        return dict(self._edits)
+
+    def clear_edits(self):
+        self._edits.clear()
@@ -5,35 +5,24 @@ and custom messages to selected members
 """
 import customtkinter as ctk
 from tkinter import ttk, messagebox, scrolledtext
-from datetime import date, datetime, timedelta
-import threading
-import time
-
-try:
-    import pywhatkit as pwk
-    import pyautogui
-    PYWHAKIT_AVAILABLE = True
-except ImportError:
-    PYWHAKIT_AVAILABLE = False
-    print("Warning: pywhatkit or pyautogui not installed. Browser-based WhatsApp functionality disabled.")
-    print("Install with: pip install pywhatkit pyautogui")
-
-try:
-    import subprocess
-    import platform
-    SUBPROCESS_AVAILABLE = True
-except ImportError:
-    SUBPROCESS_AVAILABLE = False
-
+from search_controller import SearchController
+from virtual_list import VirtualCheckList
+from typeahead import TypeaheadEntry
+from reminders import reminder_day, reminder_messages
+from message_templates import PLACEHOLDERS, compile_template
 
 
 class WhatsAppManagement(ctk.CTkFrame):
-    def __init__(self, parent, db):
+    tables = ("members", "lockers")  # Reloaded when one of these changed while hidden
+    
+    def __init__(self, parent, db, outbox):
+        """outbox: the app's OutboxDispatcher, which sends what this page queues"""
         super().__init__(parent, fg_color="#ffffff")
         self.db = db
-        self.selected_members = {}  # Dictionary to track selected members {member_id: checkbox_var}
+        self.outbox = outbox
         self.setup_ui()
         self.refresh_member_list()
+        self.update_outbox_status()
     
     def setup_ui(self):
         """Setup the UI for WhatsApp management"""
@@ -52,7 +41,43 @@ class WhatsAppManagement(ctk.CTkFrame):
             font=ctk.CTkFont(size=14),
             text_color="#64748b"
         )
-        subtitle_label.pack(pady=(0, 30), padx=35, anchor="w")
+        subtitle_label.pack(pady=(0, 10), padx=35, anchor="w")
+        
+        # Outbox status (messages are queued and sent in the background)
+        outbox_frame = ctk.CTkFrame(self, fg_color="transparent")
+        outbox_frame.pack(fill="x", padx=35, pady=(0, 20))
+        
+        self.outbox_label = ctk.CTkLabel(
+            outbox_frame,
+            text="",
+            font=ctk.CTkFont(size=13),
+            text_color="#64748b"
+        )
+        self.outbox_label.pack(side="left")
+        
+        self.retry_btn = ctk.CTkButton(
+            outbox_frame,
+            text="Retry Failed",
+            font=ctk.CTkFont(size=12),
+            height=28,
+            width=100,
+            fg_color="#64748b",
+            hover_color="#475569",
+            command=self.retry_failed_messages
+        )
+        self._outbox_poll = None
+        
+        history_btn = ctk.CTkButton(
+            outbox_frame,
+            text="Message History",
+            font=ctk.CTkFont(size=12),
+            height=28,
+            width=120,
+            fg_color="#2563eb",
+            hover_color="#1d4ed8",
+            command=self.show_message_history
+        )
+        history_btn.pack(side="right")
         
         # Method selection and warnings
         # method_frame = ctk.CTkFrame(self, fg_color="transparent")
@@ -121,7 +146,7 @@ class WhatsAppManagement(ctk.CTkFrame):
         # Description
         desc_label = ctk.CTkLabel(
             parent,
-            text="Send reminders to members whose fees are due in 1 day",
+            text="Send reminders to members whose membership or locker fees are due in 1 day",
             font=ctk.CTkFont(size=13),
             text_color="#64748b"
         )
@@ -147,7 +172,7 @@ class WhatsAppManagement(ctk.CTkFrame):
         # Info label
         self.automated_info_label = ctk.CTkLabel(
             parent,
-            text="No members with fees due in 1 day",
+            text="No payments due in 1 day",
             font=ctk.CTkFont(size=13),
             text_color="#64748b"
         )
@@ -217,7 +242,11 @@ class WhatsAppManagement(ctk.CTkFrame):
             height=35
         )
         self.search_entry.grid(row=0, column=1, sticky="ew")
-        self.search_entry.bind("<KeyRelease>", lambda e: self.refresh_member_list())
+        # Only the custom list follows the search box; searches run once typing
+        # pauses, on a worker thread
+        self.search = SearchController(self, self.search_custom_members, self.show_custom_list,
+                                       get_query=lambda: self.search_entry.get().lower().strip())
+        self.search_entry.bind("<KeyRelease>", self.search.schedule)
         
         # Select all/none buttons
         select_frame = ctk.CTkFrame(scrollable_content, fg_color="transparent")
@@ -251,17 +280,19 @@ class WhatsAppManagement(ctk.CTkFrame):
         list_frame = ctk.CTkFrame(scrollable_content, fg_color="transparent")
         list_frame.pack(fill="both", expand=True, padx=20, pady=(0, 10))
         
-        # Scrollable frame for members (nested scrollable for member list)
-        scrollable_frame = ctk.CTkScrollableFrame(
+        # Member list: a fixed pool of rows reused while scrolling (selection is kept
+        # as a set of member IDs)
+        self.recipient_list = VirtualCheckList(
             list_frame,
+            row_key=lambda m: m['id'],
+            row_text=lambda m: (f"{m['name']} (ID: {m['id']})", f"Phone: {m.get('phone') or 'N/A'}"),
+            empty_text="No members found",
             fg_color="white",
             border_width=1,
             border_color="#e2e8f0",
             height=200  # Fixed height for member list
         )
-        scrollable_frame.pack(fill="both", expand=True)
-        
-        self.custom_list_frame = scrollable_frame
+        self.recipient_list.pack(fill="both", expand=True)
         
         # Message input label
         message_label = ctk.CTkLabel(
@@ -272,6 +303,39 @@ class WhatsAppManagement(ctk.CTkFrame):
         )
         message_label.pack(anchor="w", pady=(10, 5), padx=20)
         
+        # Saved templates: picking one fills in the message box
+        template_frame = ctk.CTkFrame(scrollable_content, fg_color="transparent")
+        template_frame.pack(fill="x", padx=20, pady=(0, 5))
+        
+        self.template_menu = ctk.CTkOptionMenu(
+            template_frame,
+            values=["Templates..."],
+            font=ctk.CTkFont(size=12),
+            height=30,
+            command=self.load_template
+        )
+        self.template_menu.pack(side="left", fill="x", expand=True, padx=(0, 5))
+        
+        save_template_btn = ctk.CTkButton(
+            template_frame,
+            text="Save as Template",
+            font=ctk.CTkFont(size=12),
+            height=30,
+            width=120,
+            fg_color="#64748b",
+            hover_color="#475569",
+            command=self.save_template
+        )
+        save_template_btn.pack(side="left")
+        
+        placeholder_label = ctk.CTkLabel(
+            scrollable_content,
+            text="Personalize with: " + " ".join(f"{{{name}}}" for name in PLACEHOLDERS),
+            font=ctk.CTkFont(size=11),
+            text_color="#64748b"
+        )
+        placeholder_label.pack(anchor="w", pady=(0, 5), padx=20)
+        
         # Message text box
         self.message_text = ctk.CTkTextbox(
             scrollable_content,
@@ -281,7 +345,8 @@ class WhatsAppManagement(ctk.CTkFrame):
             border_color="#e2e8f0"
         )
         self.message_text.pack(fill="x", padx=20, pady=(0, 20))
-        self.message_text.insert("1.0", "Hello! This is a message from Luwang Fitness. ")
+        self.message_text.insert("1.0", "Hello {name}! This is a message from Luwang Fitness. ")
+        self.refresh_templates()
         
         # Send button - always visible at bottom (outside scrollable area)
         send_custom_btn = ctk.CTkButton(
@@ -295,31 +360,9 @@ class WhatsAppManagement(ctk.CTkFrame):
         )
         send_custom_btn.grid(row=1, column=0, sticky="ew", pady=(0, 20), padx=20)
     
-    def get_members_due_in_one_day(self):
-        """Get members whose fees are due in exactly 1 day"""
-        today = date.today()
-        tomorrow = today + timedelta(days=1)
-        
-        # Get all active members
-        all_members = self.db.get_all_members(active_only=True)
-        
-        # Filter members whose next_payment_date is tomorrow
-        due_members = []
-        for member in all_members:
-            next_payment = member.get('next_payment_date')
-            if next_payment:
-                if isinstance(next_payment, str):
-                    try:
-                        next_payment_date = date.fromisoformat(next_payment)
-                        if next_payment_date == tomorrow:
-                            due_members.append(member)
-                    except ValueError:
-                        continue
-                elif isinstance(next_payment, date):
-                    if next_payment == tomorrow:
-                        due_members.append(member)
-        
-        return due_members
+    def get_due_payments(self):
+        """Memberships and lockers with a payment due in 1 day"""
+        return self.db.get_due_on(reminder_day())
     
     def refresh_automated_list(self):
         """Refresh the automated reminders list"""
@@ -327,16 +370,16 @@ class WhatsAppManagement(ctk.CTkFrame):
         for widget in self.automated_list_frame.winfo_children():
             widget.destroy()
         
-        due_members = self.get_members_due_in_one_day()
+        due_payments = self.get_due_payments()
         
-        if not due_members:
-            self.automated_info_label.configure(text="No members with fees due in 1 day")
+        if not due_payments:
+            self.automated_info_label.configure(text="No payments due in 1 day")
             return
         
-        self.automated_info_label.configure(text=f"Found {len(due_members)} member(s) with fees due tomorrow")
+        self.automated_info_label.configure(text=f"Found {len(due_payments)} payment(s) due tomorrow")
         
         # Display members
-        for idx, member in enumerate(due_members):
+        for idx, due in enumerate(due_payments):
             member_frame = ctk.CTkFrame(
                 self.automated_list_frame,
                 fg_color="white" if idx % 2 == 0 else "#f8fafc",
@@ -345,7 +388,7 @@ class WhatsAppManagement(ctk.CTkFrame):
             member_frame.pack(fill="x", padx=5, pady=2)
             
             # Member info
-            info_text = f"{member['name']} (ID: {member['id']}) - Phone: {member.get('phone', 'N/A')}"
+            info_text = f"{due['name']} (ID: {due['member_id']}) - Phone: {due.get('phone') or 'N/A'}"
             info_label = ctk.CTkLabel(
                 member_frame,
                 text=info_text,
@@ -356,7 +399,8 @@ class WhatsAppManagement(ctk.CTkFrame):
             info_label.pack(side="left", padx=10, pady=8, fill="x", expand=True)
             
             # Payment info
-            payment_text = f"Due: {member.get('next_payment_date', 'N/A')} | Amount: ₹{member.get('fee_amount', 0):.2f}"
+            fee = "Membership" if due['kind'] == 'membership' else f"Locker #{due.get('locker_number') or due['locker_id']}"
+            payment_text = f"{fee} | Due: {due['next_payment_date']} | Amount: ₹{due.get('fee_amount') or 0:.2f}"
             payment_label = ctk.CTkLabel(
                 member_frame,
                 text=payment_text,
@@ -371,370 +415,70 @@ class WhatsAppManagement(ctk.CTkFrame):
         self.refresh_automated_list()
         self.refresh_custom_list()
     
+    def refresh(self):
+        """Reload member lists after data changed elsewhere"""
+        self.refresh_member_list()
+        self.update_outbox_status()
+    
     def refresh_custom_list(self):
         """Refresh the custom message member list"""
-        # Clear existing widgets
-        for widget in self.custom_list_frame.winfo_children():
-            widget.destroy()
-        
-        # Get search term
-        search_term = self.search_entry.get().lower().strip()
-        
-        # Get all active members
-        all_members = self.db.get_all_members(active_only=True)
-        
-        # Filter by search term
-        if search_term:
-            filtered_members = []
-            for member in all_members:
-                name = member.get('name', '').lower()
-                phone = member.get('phone', '').lower()
-                email = member.get('email', '').lower()
-                if (search_term in name or search_term in phone or search_term in email):
-                    filtered_members.append(member)
-            members = filtered_members
-        else:
-            members = all_members
-        
-        if not members:
-            no_results_label = ctk.CTkLabel(
-                self.custom_list_frame,
-                text="No members found",
-                font=ctk.CTkFont(size=13),
-                text_color="#64748b"
-            )
-            no_results_label.pack(pady=20)
-            return
-        
-        # Display members with checkboxes
-        for idx, member in enumerate(members):
-            member_id = member['id']
-            
-            # Create checkbox variable if not exists
-            if member_id not in self.selected_members:
-                var = ctk.BooleanVar(value=False)
-                self.selected_members[member_id] = {'var': var, 'member': member}
-            else:
-                var = self.selected_members[member_id]['var']
-            
-            member_frame = ctk.CTkFrame(
-                self.custom_list_frame,
-                fg_color="white" if idx % 2 == 0 else "#f8fafc",
-                corner_radius=4
-            )
-            member_frame.pack(fill="x", padx=5, pady=2)
-            
-            # Checkbox
-            checkbox = ctk.CTkCheckBox(
-                member_frame,
-                text="",
-                variable=var,
-                width=20
-            )
-            checkbox.pack(side="left", padx=10, pady=8)
-            
-            # Member info
-            info_text = f"{member['name']} (ID: {member['id']})"
-            info_label = ctk.CTkLabel(
-                member_frame,
-                text=info_text,
-                font=ctk.CTkFont(size=12),
-                text_color="#1e293b",
-                anchor="w"
-            )
-            info_label.pack(side="left", padx=10, pady=8, fill="x", expand=True)
-            
-            # Phone number
-            phone_text = f"Phone: {member.get('phone', 'N/A')}"
-            phone_label = ctk.CTkLabel(
-                member_frame,
-                text=phone_text,
-                font=ctk.CTkFont(size=11),
-                text_color="#64748b",
-                anchor="e"
-            )
-            phone_label.pack(side="right", padx=10, pady=8)
+        self.show_custom_list(self.search_custom_members(self.search_entry.get().lower().strip()))
+    
+    def search_custom_members(self, search_term):
+        """Active members matching the search term (safe to call from a worker thread)"""
+        # Name, email, ID or phone number however it is written, from the member index
+        return self.db.search_members(search_term, limit=None, active_only=True)
+    
+    def show_custom_list(self, members):
+        """Show members in the custom message list"""
+        self.recipient_list.set_rows(members)
     
     def select_all_members(self):
-        """Select all visible members"""
-        for member_id, data in self.selected_members.items():
-            data['var'].set(True)
+        """Select all members matching the search"""
+        self.recipient_list.select_all()
     
     def deselect_all_members(self):
         """Deselect all members"""
-        for member_id, data in self.selected_members.items():
-            data['var'].set(False)
-    
-    def focus_browser_window(self):
-        """Focus the browser window using OS-specific commands"""
-        import platform
-        system = platform.system()
-        
-        try:
-            if system == "Darwin":  # macOS
-                # Use AppleScript to focus Chrome/Safari/Edge
-                scripts = [
-                    'tell application "Google Chrome" to activate',
-                    'tell application "Safari" to activate',
-                    'tell application "Microsoft Edge" to activate',
-                    'tell application "Firefox" to activate'
-                ]
-                for script in scripts:
-                    try:
-                        subprocess.run(['osascript', '-e', script], 
-                                     capture_output=True, timeout=2)
-                        time.sleep(0.5)
-                        return True
-                    except:
-                        continue
-            elif system == "Windows":
-                # Use PowerShell to focus browser
-                try:
-                    subprocess.run(['powershell', '-Command', 
-                                  'Get-Process | Where-Object {$_.MainWindowTitle -like "*WhatsApp*" -or $_.ProcessName -like "*chrome*" -or $_.ProcessName -like "*msedge*"} | ForEach-Object {[Microsoft.VisualBasic.Interaction]::AppActivate($_.Id)}'],
-                                 timeout=2)
-                    time.sleep(0.5)
-                    return True
-                except:
-                    pass
-            # For Linux, try using wmctrl if available
-            elif system == "Linux":
-                try:
-                    subprocess.run(['wmctrl', '-a', 'WhatsApp'], timeout=2)
-                    time.sleep(0.5)
-                    return True
-                except:
-                    pass
-        except Exception as e:
-            print(f"Could not focus browser: {e}")
-        
-        return False
-    
-    def send_whatsapp(self, phone_number: str, message: str, wait_time: int = 15, is_first_message: bool = False):
-        """
-        Send WhatsApp message using browser automation (FREE method)
-        Works with dual monitor setups
-        Reuses the same browser window for multiple messages
-        
-        Args:
-            phone_number: Phone number with country code (without +)
-            message: Message text
-            wait_time: Seconds to wait before typing the message (only used for first message)
-            is_first_message: True if this is the first message (opens browser), False to reuse existing window
-        """
-        if not PYWHAKIT_AVAILABLE:
-            raise ImportError("pywhatkit or pyautogui is not installed")
-        
-        # Get the main window to minimize it during sending
-        main_window = None
-        try:
-            # Try to get the root window
-            widget = self
-            while widget.master:
-                widget = widget.master
-            main_window = widget
-            # Minimize the window to prevent focus stealing
-            main_window.iconify()
-            time.sleep(0.5)  # Give time for window to minimize
-        except:
-            pass  # If we can't minimize, continue anyway
-        
-        try:
-            # Clean phone number
-            phone_number = phone_number.replace(" ", "").replace("-", "").replace("+", "")
-            
-            if not phone_number:
-                raise ValueError("Phone number is empty")
-            
-            screen_width, screen_height = pyautogui.size()
-            
-            # Use WhatsApp Web URL to navigate to contact (more reliable than clicking search)
-            from urllib.parse import quote
-            whatsapp_url = f"https://web.whatsapp.com/send?phone={phone_number}"
-            
-            if is_first_message:
-                # First message: Open WhatsApp Web in browser
-                import webbrowser
-                webbrowser.open(whatsapp_url)
-                # Wait for WhatsApp Web to fully load
-                time.sleep(wait_time)
-            else:
-                # Subsequent messages: Navigate to new contact in same browser window
-                # Use keyboard shortcut to focus address bar and navigate
-                self.focus_browser_window()
-                time.sleep(0.5)
-                
-                # Focus address bar: Cmd+L (Mac) or Ctrl+L (Windows/Linux)
-                if platform.system() == "Darwin":
-                    pyautogui.hotkey('command', 'l')
-                else:
-                    pyautogui.hotkey('ctrl', 'l')
-                time.sleep(0.3)
-                
-                # Type the new URL
-                pyautogui.write(whatsapp_url, interval=0.05)
-                time.sleep(0.3)
-                
-                # Press Enter to navigate
-                pyautogui.press('enter')
-                # Wait longer for page to load and chat to open
-                time.sleep(8)
-            
-            # Try to focus browser window using OS-specific commands
-            self.focus_browser_window()
-            time.sleep(1)
-            
-            # Try clicking in multiple locations to find the input field
-            # WhatsApp input is usually at bottom center, but on dual monitors it might be on either screen
-            click_positions = [
-                (screen_width // 2, screen_height - 150),  # Primary monitor center-bottom
-                (screen_width // 2, screen_height - 100),  # Primary monitor slightly higher
-                (screen_width // 2, screen_height - 200),   # Primary monitor slightly lower
-                (screen_width // 2, screen_height - 120),   # Another position
-                (screen_width // 2, screen_height - 180),   # Another position
-            ]
-            
-            # If there's a second monitor, try positions there too
-            try:
-                # Try to detect second monitor (rough estimate)
-                second_monitor_x = screen_width + (screen_width // 2)
-                click_positions.extend([
-                    (second_monitor_x, screen_height - 150),
-                    (second_monitor_x, screen_height - 100),
-                    (second_monitor_x, screen_height - 120),
-                ])
-            except:
-                pass
-            
-            # Try multiple times to click on the message input area
-            input_clicked = False
-            for attempt in range(3):  # Try up to 3 times
-                for x, y in click_positions:
-                    try:
-                        pyautogui.click(x, y)
-                        time.sleep(0.5)
-                        # Try typing a test character to see if input is focused
-                        # If it works, we'll continue, otherwise try next position
-                        input_clicked = True
-                        break
-                    except:
-                        continue
-                if input_clicked:
-                    break
-                # If didn't work, wait a bit more and try again
-                time.sleep(1)
-            
-            # Additional wait to ensure input field is ready
-            time.sleep(1)
-            
-            # Try pressing Tab to navigate to input field if clicking didn't work
-            if not input_clicked:
-                pyautogui.press('tab')
-                time.sleep(0.5)
-            
-            # Clear any existing text in input field (in case there's leftover text)
-            pyautogui.hotkey('command', 'a') if platform.system() == "Darwin" else pyautogui.hotkey('ctrl', 'a')
-            time.sleep(0.2)
-            
-            # Type the message
-            pyautogui.write(message, interval=0.05)  # Type message directly
-            
-            # Wait a bit for typing to complete
-            time.sleep(1.5)
-            
-            # Before pressing Enter, click again to ensure focus
-            pyautogui.click(screen_width // 2, screen_height - 150)
-            time.sleep(0.5)
-            
-            # Press Enter to send the message
-            pyautogui.press('enter')
-            
-            # Wait a bit more to ensure message is sent
-            time.sleep(3)
-            
-            return True
-        except Exception as e:
-            raise Exception(f"Failed to send message: {str(e)}")
-        finally:
-            # Don't restore window until all messages are done (handled in calling function)
-            pass
+        self.recipient_list.deselect_all()
     
     def send_automated_reminders(self):
-        """Send automated reminders to members with fees due in 1 day"""
-        if not PYWHAKIT_AVAILABLE:
-            messagebox.showerror("Error", "pywhatkit is not installed. Please install it with: pip install pywhatkit")
+        """Send automated reminders for membership and locker fees due in 1 day"""
+        if not self.transport_ready():
             return
         
-        due_members = self.get_members_due_in_one_day()
+        due_payments = self.get_due_payments()
         
-        if not due_members:
-            messagebox.showinfo("Info", "No members with fees due in 1 day.")
+        if not due_payments:
+            messagebox.showinfo("Info", "No membership or locker fees due in 1 day.")
             return
         
-        # Confirm before sending
-        confirm_msg = f"Send payment reminders to {len(due_members)} member(s)?\n\n"
-        confirm_msg += "IMPORTANT:\n"
-        confirm_msg += "1. Make sure WhatsApp Web is open and you are logged in\n"
-        confirm_msg += "2. DO NOT click on this application window while messages are sending\n"
-        confirm_msg += "3. Keep the browser window visible and active\n\n"
-        confirm_msg += "Click OK to start sending..."
-        if not messagebox.askyesno("Confirm", confirm_msg):
+        # Queue the reminders; the outbox sends them in the background and retries failures
+        messages = reminder_messages(self.db, due_payments)
+        
+        # Each member gets one reminder per due date, however often this is clicked
+        unsent = self.db.filter_unsent_reminders(messages)
+        if not unsent:
+            messagebox.showinfo("Info", f"All {len(messages)} payment(s) due in 1 day have already been reminded.")
             return
         
-        # Send messages in a separate thread to avoid blocking UI
-        def send_thread():
-            success_count = 0
-            failed_count = 0
-            is_first_message = True
-            
-            for member in due_members:
-                phone = member.get('phone', '').strip()
-                if not phone:
-                    failed_count += 1
-                    continue
-                
-                # Create reminder message
-                member_name = member.get('name', 'Member')
-                next_payment = member.get('next_payment_date', 'soon')
-                fee_amount = member.get('fee_amount', 0)
-                
-                message = f"Hello {member_name}! This is a reminder from Luwang Fitness. "
-                message += f"Your membership fee of ₹{fee_amount:.2f} is due on {next_payment}. "
-                message += "Please make the payment to avoid any inconvenience. Thank you!"
-                
-                try:
-                    # For first message, open WhatsApp Web. For subsequent messages, reuse the same window
-                    self.send_whatsapp(phone, message, wait_time=10, is_first_message=is_first_message)
-                    is_first_message = False
-                    success_count += 1
-                    time.sleep(8)  # Wait between messages to avoid rate limiting and allow sending
-                except Exception as e:
-                    failed_count += 1
-                    print(f"Failed to send to {member['name']}: {str(e)}")
-            
-            # Show results (delayed to avoid focus issues)
-            result_msg = f"Reminders sent!\n\nSuccess: {success_count}\nFailed: {failed_count}"
-            # Delay the popup to avoid stealing focus during sending
-            self.after(5000, lambda: messagebox.showinfo("Complete", result_msg))
-            self.after(5000, self.refresh_automated_list)
+        question = f"Send {len(unsent)} payment reminder(s)?"
+        if len(unsent) < len(messages):
+            question += f"\n({len(messages) - len(unsent)} already reminded will be skipped)"
         
-        # Start thread
-        thread = threading.Thread(target=send_thread, daemon=True)
-        thread.start()
+        # Confirm before sending
+        if not self.confirm_send(question):
+            return
         
-        # Removed popup to prevent focus stealing - messages are being sent in background
+        self.queue_messages(unsent)
     
     def send_custom_messages(self):
         """Send custom messages to selected members"""
-        if not PYWHAKIT_AVAILABLE:
-            messagebox.showerror("Error", "pywhatkit is not installed. Please install it with: pip install pywhatkit")
+        if not self.transport_ready():
             return
         
         # Get selected members
-        selected = []
-        for member_id, data in self.selected_members.items():
-            if data['var'].get():
-                selected.append(data['member'])
+        members = (self.db.member_index.get(member_id) for member_id in sorted(self.recipient_list.selected))
+        selected = [m for m in members if m]
         
         if not selected:
             messagebox.showwarning("No Selection", "Please select at least one member.")
@@ -745,66 +489,170 @@ class WhatsAppManagement(ctk.CTkFrame):
         if not message:
             messagebox.showwarning("No Message", "Please enter a message.")
             return
+        try:
+            template = compile_template(message)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
         
         # Confirm before sending
-        confirm_msg = f"Send custom message to {len(selected)} selected member(s)?\n\n"
-        confirm_msg += "IMPORTANT:\n"
-        confirm_msg += "1. Make sure WhatsApp Web is open and you are logged in\n"
-        confirm_msg += "2. DO NOT click on this application window while messages are sending\n"
-        confirm_msg += "3. Keep the browser window visible and active\n\n"
-        confirm_msg += "Click OK to start sending..."
-        if not messagebox.askyesno("Confirm", confirm_msg):
+        if not self.confirm_send(f"Send custom message to {len(selected)} selected member(s)?"):
             return
         
-        # Send messages in a separate thread
-        def send_thread():
-            success_count = 0
-            failed_count = 0
-            main_window = None
-            
-            try:
-                # Get main window to minimize
-                widget = self
-                while widget.master:
-                    widget = widget.master
-                main_window = widget
-                main_window.iconify()
-                time.sleep(0.5)
-            except:
-                pass
-            
-            try:
-                for idx, member in enumerate(selected):
-                    phone = member.get('phone', '').strip()
-                    if not phone:
-                        failed_count += 1
-                        continue
-                    
-                    try:
-                        # First message opens browser, subsequent ones reuse it
-                        is_first = (idx == 0)
-                        self.send_whatsapp(phone, message, wait_time=10, is_first_message=is_first)
-                        success_count += 1
-                        time.sleep(5)  # Wait between messages (reduced since we're reusing window)
-                    except Exception as e:
-                        failed_count += 1
-                        print(f"Failed to send to {member['name']}: {str(e)}")
-                
-                # Show results (delayed to avoid focus issues)
-                result_msg = f"Messages sent!\n\nSuccess: {success_count}\nFailed: {failed_count}"
-                # Delay the popup to avoid stealing focus during sending
-                self.after(5000, lambda: messagebox.showinfo("Complete", result_msg))
-            finally:
-                # Restore window after all messages are sent
-                if main_window:
-                    try:
-                        main_window.deiconify()
-                    except:
-                        pass
-        
-        # Start thread
-        thread = threading.Thread(target=send_thread, daemon=True)
-        thread.start()
-        
-        # Removed popup to prevent focus stealing - messages are being sent in background
-
+        # Personalized for each member in one pass
+        self.queue_messages(template.messages(selected, 'custom'))
+    
+    def refresh_templates(self):
+        """Reload the template menu"""
+        self.templates = {t['name']: t['body'] for t in self.db.get_message_templates()}
+        self.template_menu.configure(values=list(self.templates) or ["No templates"])
+        self.template_menu.set("Templates...")
+    
+    def load_template(self, name):
+        """Put the chosen template in the message box"""
+        if name in self.templates:
+            self.message_text.delete("1.0", "end")
+            self.message_text.insert("1.0", self.templates[name])
+    
+    def save_template(self):
+        """Save the message box as a named template (reminder templates change the automated reminders)"""
+        body = self.message_text.get("1.0", "end-1c").strip()
+        if not body:
+            messagebox.showwarning("No Message", "Please enter a message.")
+            return
+        dialog = ctk.CTkInputDialog(text="Template name:", title="Save Template")
+        name = (dialog.get_input() or "").strip()
+        if not name:
+            return
+        if name in self.templates and not messagebox.askyesno("Confirm", f"Replace the template '{name}'?"):
+            return
+        try:
+            self.db.save_message_template(name, body)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self.refresh_templates()
+    
+    def transport_ready(self) -> bool:
+        """Check messages can be sent with the configured transport (explains why not)"""
+        if not self.outbox.transport.available:
+            messagebox.showerror("Error", "pywhatkit is not installed. Please install it with: pip install pywhatkit")
+            return False
+        return True
+    
+    def confirm_send(self, question: str) -> bool:
+        """Ask before sending (browser sending needs the user to keep their hands off)"""
+        confirm_msg = f"{question}\n\n"
+        if self.outbox.transport.name == "browser":
+            confirm_msg += "IMPORTANT:\n"
+            confirm_msg += "1. Make sure WhatsApp Web is open and you are logged in\n"
+            confirm_msg += "2. DO NOT click on this application window while messages are sending\n"
+            confirm_msg += "3. Keep the browser window visible and active\n\n"
+        confirm_msg += "Click OK to start sending..."
+        return messagebox.askyesno("Confirm", confirm_msg)
+    
+    def queue_messages(self, messages):
+        """Add messages to the outbox and start sending (progress shows in the outbox status line)"""
+        self.db.enqueue_messages(messages)
+        self.outbox.start()
+        self.update_outbox_status()
+    
+    def retry_failed_messages(self):
+        """Queue failed messages again"""
+        if self.db.retry_failed_messages():
+            self.outbox.start()
+        self.update_outbox_status()
+    
+    def update_outbox_status(self):
+        """Show the outbox counts; polls while messages are being sent"""
+        if self._outbox_poll is not None:
+            self.after_cancel(self._outbox_poll)
+            self._outbox_poll = None
+        counts = self.db.get_outbox_counts()
+        pending = counts['queued'] + counts['sending']
+        text = f"Outbox: {pending} waiting • {counts['sent']} sent • {counts['failed']} failed"
+        if pending and self.outbox.running:
+            text += f" • sending ~{self.outbox.limiter.rate * 60:.0f}/min"
+        self.outbox_label.configure(text=text, text_color="#dc2626" if counts['failed'] else "#64748b")
+        if counts['failed']:
+            self.retry_btn.pack(side="left", padx=(10, 0))
+        else:
+            self.retry_btn.pack_forget()
+        if pending or self.outbox.running:
+            self._outbox_poll = self.after(2000, self.update_outbox_status)
+    
+    def show_message_history(self):
+        """Show the messages sent to a member"""
+        history_window = ctk.CTkToplevel(self)
+        history_window.title("Message History")
+        history_window.geometry("900x500")
+        
+        title = ctk.CTkLabel(
+            history_window,
+            text="Message History",
+            font=ctk.CTkFont(size=20, weight="bold"),
+            text_color="#0f172a"
+        )
+        title.pack(pady=(20, 10))
+        
+        tree_frame = ctk.CTkFrame(history_window, fg_color="transparent")
+        
+        def show_history(member):
+            history_tree.delete(*history_tree.get_children())
+            history = self.db.get_message_history(member['id'])
+            title.configure(text=f"Message History - {member['name']} ({len(history)} messages)")
+            for entry in history:
+                history_tree.insert('', 'end', values=(
+                    entry['sent_at'] or entry['created_at'],
+                    entry['kind'].replace('_', ' ').title(),
+                    entry['status'].title(),
+                    entry['attempts'],
+                    entry['message'],
+                    entry['last_error'] or ''
+                ))
+        
+        member_picker = TypeaheadEntry(
+            history_window,
+            search=lambda query, limit: self.db.search_members(query, limit),
+            format_item=lambda m: f"{m['name']} (ID: {m['id']})",
+            command=show_history,
+            placeholder_text="Search member (Name/ID/Phone/Email)...",
+            height=35,
+            font=ctk.CTkFont(size=14),
+            border_width=1,
+            border_color="#cbd5e1"
+        )
+        member_picker.pack(fill="x", padx=20, pady=(0, 10))
+        
+        # Treeview for the member's messages
+        tree_frame.pack(fill="both", expand=True, padx=20, pady=(0, 20))
+        tree_frame.grid_rowconfigure(0, weight=1)
+        tree_frame.grid_columnconfigure(0, weight=1)
+        
+        v_scrollbar = ttk.Scrollbar(tree_frame, orient="vertical")
+        v_scrollbar.grid(row=0, column=1, sticky="ns")
+        
+        history_tree = ttk.Treeview(
+            tree_frame,
+            columns=("Date", "Kind", "Status", "Attempts", "Message", "Error"),
+            show="headings",
+            yscrollcommand=v_scrollbar.set,
+            height=15
+        )
+        
+        v_scrollbar.config(command=history_tree.yview)
+        
+        columns = {
+            "Date": 140,
+            "Kind": 140,
+            "Status": 80,
+            "Attempts": 70,
+            "Message": 320,
+            "Error": 150
+        }
+        
+        for col, width in columns.items():
+            history_tree.heading(col, text=col)
+            history_tree.column(col, width=width, anchor="w" if col in ("Message", "Error") else "center")
+        
+        history_tree.grid(row=0, column=0, sticky="nsew")
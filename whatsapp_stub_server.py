@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the WhatsApp Cloud API, for trying out and benchmarking
+HttpTransport without a network or an API account
+Usage:
+    python3 whatsapp_stub_server.py --port 8099
+    python3 whatsapp_stub_server.py --latency 0.05 --fail-rate 0.1
+    python3 whatsapp_stub_server.py --bench 500 --concurrency 8
+Point the app at it with:
+    WHATSAPP_API_URL=http://127.0.0.1:8099 WHATSAPP_API_TOKEN=test python3 main.py
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+
+class StubServer:
+    """Accepts POST /<phone id>/messages like the Cloud API and remembers what was sent"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 fail_rate: float = 0.0, token: Optional[str] = None):
+        """
+        Args:
+            port: 0 picks a free port (see url)
+            latency: seconds each request takes
+            fail_rate: share of requests answered with HTTP 503
+            token: if given, requests must carry it as their Bearer token
+        """
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.token = token
+        self.messages: List[Dict] = []  # Accepted message payloads, in arrival order
+        self.requests = 0
+        self.connections = 0  # TCP connections opened (keep-alive keeps this low)
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubServer":
+        """Serve on a background thread"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep connections open between requests
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with server._lock:
+                    server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+
+                if server.token and self.headers.get("Authorization") != f"Bearer {server.token}":
+                    return self._reply(401, {"error": {"message": "Invalid access token"}})
+                if not self.path.endswith("/messages"):
+                    return self._reply(404, {"error": {"message": "Unknown endpoint"}})
+                try:
+                    payload = json.loads(body)
+                    to, text = payload["to"], payload["text"]["body"]
+                except (ValueError, KeyError, TypeError):
+                    return self._reply(400, {"error": {"message": "Invalid message payload"}})
+                if server.fail_rate and random.random() < server.fail_rate:
+                    return self._reply(503, {"error": {"message": "Service temporarily unavailable"}})
+
+                with server._lock:
+                    server.messages.append({"to": to, "text": text})
+                    message_id = f"wamid.stub{len(server.messages)}"
+                self._reply(200, {"messaging_product": "whatsapp", "contacts": [{"wa_id": to}],
+                                  "messages": [{"id": message_id}]})
+
+            def _reply(self, status: int, data: Dict):
+                body = json.dumps(data).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Keep benchmark output readable
+
+        return Handler
+
+
+def run_benchmark(server: StubServer, count: int, concurrency: int):
+    """Send count messages through HttpTransport and the outbox against the stub"""
+    import os
+    import tempfile
+    from database import Database
+    from outbox import OutboxDispatcher
+    from whatsapp_transport import HttpTransport
+
+    with tempfile.TemporaryDirectory() as folder:
+        db = Database(os.path.join(folder, "bench.db"))
+        transport = HttpTransport(server.url, server.token or "test", "bench", concurrency=concurrency)
+        dispatcher = OutboxDispatcher(db, transport, retry_delay=0.5)
+        db.enqueue_messages([{"phone": f"9198765{i:05d}", "message": f"Benchmark message {i} ₹500.00"}
+                             for i in range(count)])
+
+        started = time.perf_counter()
+        dispatcher.start()
+        while dispatcher.running:
+            time.sleep(0.05)
+        elapsed = time.perf_counter() - started
+
+        counts = db.get_outbox_counts()
+        db.close()
+
+    print(f"Sent {counts['sent']} / {count} messages in {elapsed:.2f}s "
+          f"({counts['sent'] / elapsed:.0f} msg/s, concurrency {concurrency})")
+    print(f"Requests: {server.requests}, connections opened: {server.connections}, failed: {counts['failed']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the WhatsApp Cloud API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds each request takes")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Share of requests that fail (0-1)")
+    parser.add_argument("--token", help="Only accept this Bearer token")
+    parser.add_argument("--bench", type=int, metavar="N", help="Send N messages through the outbox and exit")
+    parser.add_argument("--concurrency", type=int, default=8, help="Parallel sends for --bench")
+    args = parser.parse_args()
+
+    server = StubServer(args.host, 0 if args.bench else args.port, args.latency, args.fail_rate, args.token)
+    if args.bench:
+        server.start()
+        try:
+            run_benchmark(server, args.bench, args.concurrency)
+        finally:
+            server.stop()
+        return
+
+    print(f"WhatsApp API stub listening on {server.url} (Ctrl+C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\nStopped. {len(server.messages)} message(s) received.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,406 @@
+"""
+WhatsApp Transport Module
+Sends WhatsApp messages for the outbox. Two backends:
+- BrowserTransport drives WhatsApp Web with keystrokes (pywhatkit/pyautogui),
+  one message at a time, reusing one browser window per run
+- HttpTransport posts to a WhatsApp Business Cloud-style HTTP API over
+  keep-alive connections, several messages at once
+create_transport() picks the HTTP API when WHATSAPP_API_TOKEN is set.
+"""
+import http.client
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from importlib.util import find_spec
+from typing import Optional
+from urllib.parse import urlsplit
+
+from clipboard import Clipboard, system_clipboard
+from readiness import Readiness, ScreenChangeProbe, WindowTitleProbe, all_of
+
+# Only check that pywhatkit/pyautogui are installed; pyautogui probes the display
+# on import, so it is imported when the first message is sent
+PYWHAKIT_AVAILABLE = find_spec("pywhatkit") is not None and find_spec("pyautogui") is not None
+if not PYWHAKIT_AVAILABLE:
+    print("Warning: pywhatkit or pyautogui not installed. Browser-based WhatsApp functionality disabled.")
+    print("Install with: pip install pywhatkit pyautogui")
+
+try:
+    import subprocess
+    import platform
+    SUBPROCESS_AVAILABLE = True
+except ImportError:
+    SUBPROCESS_AVAILABLE = False
+
+
+class Transport:
+    """
+    Sends one WhatsApp message per send() call. The outbox runs `concurrency`
+    sends at once, paced by a rate limiter between `min_rate` and `max_rate`
+    messages per second (see rate_limiter.py), and calls finish() once it has
+    nothing left to send. send() raises an exception on failure.
+    """
+    name = "transport"
+    available = True
+    concurrency = 1
+    # Pacing, in messages per second
+    start_rate = 1.0
+    min_rate = 0.1
+    max_rate = 10.0
+    burst = 1
+    latency_target = None  # Smoothed send time (seconds) above which sending slows down
+    
+    def send(self, phone_number: str, message: str):
+        raise NotImplementedError
+    
+    def finish(self):
+        pass
+
+
+@dataclass
+class BrowserProbes:
+    """What the browser driver waits for at each step"""
+    minimized: Readiness  # The app window is out of the way
+    whatsapp_loaded: Readiness  # WhatsApp Web finished loading in a new browser window
+    chat_loaded: Readiness  # A chat opened after entering its URL
+    browser_focused: Readiness  # The browser is the window in front
+    message_sent: Readiness  # The message left the input box
+    
+    @classmethod
+    def default(cls, keyboard, first_wait: float = 30) -> "BrowserProbes":
+        """
+        Probes watching the window title and the screen. Where this machine can't
+        report those, the steps fall back to the fixed waits the driver used before.
+        """
+        width, height = keyboard.size()
+        
+        def grab(region):
+            return lambda: keyboard.screenshot(region=region).tobytes()
+        
+        whatsapp_window = WindowTitleProbe("WhatsApp")
+        page = (width // 4, height // 4, width // 2, height // 2)  # Middle of the screen
+        input_box = (width // 4, height - 250, width // 2, 200)  # Message box and the latest messages
+        return cls(
+            minimized=Readiness(lambda: None, timeout=0.5, fallback=0.5),
+            whatsapp_loaded=Readiness(all_of(whatsapp_window, ScreenChangeProbe(grab(page), stable_polls=4)),
+                                      timeout=first_wait, interval=0.5, fallback=10),
+            chat_loaded=Readiness(all_of(whatsapp_window, ScreenChangeProbe(grab(page))),
+                                  timeout=20, fallback=8),
+            browser_focused=Readiness(whatsapp_window, timeout=3, interval=0.1, fallback=1),
+            message_sent=Readiness(ScreenChangeProbe(grab(input_box)), timeout=10, fallback=3),
+        )
+
+
+class BrowserTransport(Transport):
+    """Sends through WhatsApp Web in the default browser (FREE method)"""
+    name = "browser"
+    available = PYWHAKIT_AVAILABLE
+    # At most one message every 2s (starting at one every 5s); typing one takes longer anyway
+    start_rate = 0.2
+    min_rate = 1 / 60
+    max_rate = 0.5
+    
+    key_delay = 0.1  # Lets the browser handle a keystroke or click before the next one
+    
+    def __init__(self, root, first_wait: int = 30, clipboard: Clipboard = None, keyboard=None,
+                 probes: "BrowserProbes" = None):
+        """
+        Args:
+            root: application window, minimized while messages are typed (None when run headless)
+            first_wait: longest wait (seconds) for WhatsApp Web to load when the browser is opened
+            clipboard: used to paste the URL and message (default: the system clipboard)
+            keyboard: object with pyautogui's hotkey/write/press/click/size (default: pyautogui)
+            probes: what each step waits for (default: BrowserProbes.default)
+        """
+        self.root = root
+        self.first_wait = first_wait
+        self.clipboard = clipboard or system_clipboard()
+        self.keyboard = keyboard
+        self.probes = probes
+        self.modifier = 'command' if platform.system() == "Darwin" else 'ctrl'
+        self.browser_open = False  # Later messages reuse the window the first one opened
+        self._saved_clipboard = None  # What the user had copied before the run
+    
+    def run_on_ui_thread(self, method: str) -> bool:
+        """
+        Call a method of the application window (e.g. "iconify") on the Tk event loop.
+        Sends run on outbox worker threads and Tk isn't thread-safe, so the call is
+        scheduled with after() rather than made here. False if there is no window.
+        """
+        if self.root is None:
+            return False
+        try:
+            self.root.after(0, getattr(self.root, method))
+            return True
+        except Exception:
+            return False
+    
+    def enter_text(self, text: str):
+        """
+        Put text into the focused field. Pasting takes a fraction of a second whatever
+        the length and keeps characters like ₹ intact; typing is the fallback.
+        """
+        keyboard = self.keyboard
+        if self.clipboard.available:
+            try:
+                if self._saved_clipboard is None:
+                    try:
+                        self._saved_clipboard = self.clipboard.paste()
+                    except Exception:
+                        self._saved_clipboard = ""
+                self.clipboard.copy(text)
+                keyboard.hotkey(self.modifier, 'v')
+                time.sleep(self.key_delay)  # Let the paste land
+                return
+            except Exception as e:
+                print(f"Clipboard paste failed, typing instead: {e}")
+        keyboard.write(text, interval=0.05)
+        time.sleep(self.key_delay)
+    
+    def focus_browser_window(self):
+        """Focus the browser window using OS-specific commands (probes.browser_focused waits for it)"""
+        system = platform.system()
+        
+        try:
+            if system == "Darwin":  # macOS
+                # Use AppleScript to focus Chrome/Safari/Edge
+                scripts = [
+                    'tell application "Google Chrome" to activate',
+                    'tell application "Safari" to activate',
+                    'tell application "Microsoft Edge" to activate',
+                    'tell application "Firefox" to activate'
+                ]
+                for script in scripts:
+                    try:
+                        subprocess.run(['osascript', '-e', script], 
+                                     capture_output=True, timeout=2)
+                        return True
+                    except:
+                        continue
+            elif system == "Windows":
+                # Use PowerShell to focus browser
+                try:
+                    subprocess.run(['powershell', '-Command', 
+                                  'Get-Process | Where-Object {$_.MainWindowTitle -like "*WhatsApp*" -or $_.ProcessName -like "*chrome*" -or $_.ProcessName -like "*msedge*"} | ForEach-Object {[Microsoft.VisualBasic.Interaction]::AppActivate($_.Id)}'],
+                                 timeout=2)
+                    return True
+                except:
+                    pass
+            # For Linux, try using wmctrl if available
+            elif system == "Linux":
+                try:
+                    subprocess.run(['wmctrl', '-a', 'WhatsApp'], timeout=2)
+                    return True
+                except:
+                    pass
+        except Exception as e:
+            print(f"Could not focus browser: {e}")
+        
+        return False
+    
+    def send(self, phone_number: str, message: str):
+        """
+        Send WhatsApp message using browser automation (FREE method)
+        The first message of a run opens WhatsApp Web, later ones reuse that window.
+        Each step waits on a readiness probe (see BrowserProbes) rather than a fixed time.
+        
+        Args:
+            phone_number: E.164 phone number (normalized when the message was queued)
+            message: Message text
+        """
+        if self.keyboard is None:
+            if not PYWHAKIT_AVAILABLE:
+                raise ImportError("pywhatkit or pyautogui is not installed")
+            import pyautogui
+            self.keyboard = pyautogui
+        pyautogui = self.keyboard
+        if self.probes is None:
+            self.probes = BrowserProbes.default(pyautogui, self.first_wait)
+        probes = self.probes
+        is_first_message = not self.browser_open
+        
+        # Minimize the window to prevent focus stealing (if we can't, continue anyway)
+        if self.run_on_ui_thread("iconify"):
+            probes.minimized.wait()
+        
+        try:
+            if not phone_number:
+                raise ValueError("Phone number is empty")
+            
+            screen_width, screen_height = pyautogui.size()
+            
+            # Use WhatsApp Web URL to navigate to contact (more reliable than clicking search)
+            whatsapp_url = f"https://web.whatsapp.com/send?phone={phone_number.lstrip('+')}"
+            
+            if is_first_message:
+                # First message: Open WhatsApp Web in browser and wait for it to load
+                import webbrowser
+                webbrowser.open(whatsapp_url)
+                if not probes.whatsapp_loaded.wait():
+                    raise TimeoutError("WhatsApp Web did not finish loading")
+            else:
+                # Subsequent messages: Navigate to new contact in same browser window
+                self.focus_browser_window()
+                probes.browser_focused.wait()
+                
+                # Focus address bar: Cmd+L (Mac) or Ctrl+L (Windows/Linux)
+                pyautogui.hotkey(self.modifier, 'l')
+                time.sleep(self.key_delay)
+                
+                # Enter the new URL and wait for the chat to open
+                self.enter_text(whatsapp_url)
+                pyautogui.press('enter')
+                if not probes.chat_loaded.wait():
+                    raise TimeoutError("The chat did not open")
+            
+            # Bring the browser to the front
+            self.focus_browser_window()
+            probes.browser_focused.wait()
+            
+            # Click the message box (bottom center of the chat)
+            pyautogui.click(screen_width // 2, screen_height - 150)
+            time.sleep(self.key_delay)
+            
+            # Clear any existing text in input field (in case there's leftover text)
+            pyautogui.hotkey(self.modifier, 'a')
+            time.sleep(self.key_delay)
+            
+            # Enter the message and send it
+            self.enter_text(message)
+            pyautogui.press('enter')
+            
+            # Wait until the message has left the input box
+            if not probes.message_sent.wait():
+                raise TimeoutError("The message was not sent in time")
+            
+            self.browser_open = True
+            return True
+        except Exception as e:
+            raise Exception(f"Failed to send message: {str(e)}")
+    
+    def finish(self):
+        """End of a run: restore the application window; the next run opens a fresh chat window"""
+        self.browser_open = False
+        if self._saved_clipboard is not None:
+            # Give the user back what they had copied
+            try:
+                self.clipboard.copy(self._saved_clipboard)
+            except Exception:
+                pass
+            self._saved_clipboard = None
+        self.run_on_ui_thread("deiconify")
+    
+
+
+class HttpTransport(Transport):
+    """Sends through a WhatsApp Business Cloud-style HTTP API"""
+    name = "http"
+    # The Cloud API allows about 80 messages per second per sender number
+    start_rate = 10.0
+    min_rate = 0.5
+    max_rate = 80.0
+    latency_target = 2.0
+    
+    def __init__(self, base_url: str, token: str, phone_number_id: str, concurrency: int = 8,
+                 timeout: float = 15.0):
+        """
+        Args:
+            base_url: API root, e.g. https://graph.facebook.com/v19.0 (or a local stub server)
+            token: access token sent as a Bearer token
+            phone_number_id: sender phone number ID; messages go to {base_url}/{id}/messages
+            concurrency: messages sent at once (each sending thread keeps one open connection)
+        """
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme or "https"
+        self.host = parts.netloc
+        self.path = f"{parts.path.rstrip('/')}/{phone_number_id}/messages"
+        self.token = token
+        self.concurrency = concurrency
+        self.burst = concurrency
+        self.timeout = timeout
+        self._local = threading.local()  # One keep-alive connection per sending thread
+    
+    @classmethod
+    def from_env(cls) -> Optional["HttpTransport"]:
+        """
+        Transport configured by WHATSAPP_API_URL / _TOKEN / _PHONE_ID (None if no token is set).
+        Raises ValueError if the token is set without a phone number ID.
+        """
+        token = os.environ.get("WHATSAPP_API_TOKEN")
+        if not token:
+            return None
+        phone_number_id = os.environ.get("WHATSAPP_PHONE_ID", "").strip()
+        if not phone_number_id:
+            raise ValueError("WHATSAPP_API_TOKEN is set but WHATSAPP_PHONE_ID is not. "
+                             "Set it to the sender's phone number ID from the WhatsApp Business settings.")
+        return cls(os.environ.get("WHATSAPP_API_URL", "https://graph.facebook.com/v19.0"), token,
+                   phone_number_id, concurrency=int(os.environ.get("WHATSAPP_API_CONCURRENCY", "8")))
+    
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn_class = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+            conn = conn_class(self.host, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+    
+    def _drop_connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+    
+    def send(self, phone_number: str, message: str):
+        if not phone_number:
+            raise ValueError("Phone number is empty")
+        body = json.dumps({
+            "messaging_product": "whatsapp",
+            "to": phone_number.lstrip("+"),
+            "type": "text",
+            "text": {"body": message},
+        }).encode("utf-8")
+        headers = {
+            "Authorization": f"Bearer {self.token}",
+            "Content-Type": "application/json",
+        }
+        
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request("POST", self.path, body=body, headers=headers)
+                break
+            except (ConnectionResetError, BrokenPipeError):
+                # The server closed an idle keep-alive connection before the request
+                # got through, so it can't have been sent: reconnect once
+                self._drop_connection()
+                if attempt:
+                    raise
+            except Exception:
+                self._drop_connection()
+                raise
+        try:
+            response = conn.getresponse()
+            data = response.read()
+        except Exception:
+            # The request went out and the server may have sent the message, so don't
+            # post it again here; the outbox retries it later (after a backoff)
+            self._drop_connection()
+            raise
+        if response.will_close:
+            self._drop_connection()
+        
+        if response.status >= 300:
+            try:
+                error = json.loads(data)["error"]["message"]
+            except (ValueError, KeyError, TypeError):
+                error = data.decode("utf-8", "replace")[:200]
+            raise Exception(f"Failed to send message: HTTP {response.status}: {error}")
+        # Message ID given by the API
+        return (json.loads(data or b"{}").get("messages") or [{}])[0].get("id")
+
+
+def create_transport(root=None) -> Transport:
+    """HTTP API transport if one is configured, otherwise the browser driver"""
+    return HttpTransport.from_env() or BrowserTransport(root)